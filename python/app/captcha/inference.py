@@ -0,0 +1,265 @@
+import base64
+import importlib
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from io import BytesIO
+from queue import Queue, Empty
+from typing import List
+
+from app.metrics.redis_client import incr_worker_counter, observe_worker_histogram
+from app.config.settings import settings
+from app.utils.logger import logger
+
+# Модули моделей: в каждом MODEL_CLASS, MODEL_PATH, transform и CHARS
+MODELS = {
+    "blue": "app.captcha.ocr_model_blue_integration",
+    "yellow": "app.captcha.orc_model_yellow_integration",
+}
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+CONFIDENCE_BUCKETS = (0.3, 0.5, 0.7, 0.8, 0.9, 0.95, 0.99, 1)
+
+
+@dataclass
+class CaptchaResult:
+    text: str
+    confidence: List[float] = field(default_factory=list)
+
+
+def ctc_decode(preds, probs, chars):
+    """
+    Жадное декодирование CTC: повторы подряд схлопываются, пустой класс (len(chars)) разделяет символы.
+    Уверенность символа — наибольшая вероятность среди его кадров
+    """
+    blank = len(chars)
+    text, confidence = [], []
+    prev = -1
+    for pred, prob in zip(preds, probs):
+        if pred != blank:
+            if pred != prev:
+                text.append(chars[pred])
+                confidence.append(prob)
+            else:
+                confidence[-1] = max(confidence[-1], prob)
+        prev = pred
+    return CaptchaResult("".join(text), [round(c, 4) for c in confidence])
+
+
+# torch импортируется в функциях: клиенту сервера распознавания (CAPTCHA_INFERENCE=socket) он не нужен
+def device():
+    import torch
+    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+def load_crnn(model_cls, path, chars):
+    """Модель распознавания с весами из path, на CAPTCHA_TORCH_THREADS потоках torch"""
+    import torch
+    torch.set_num_threads(settings.CAPTCHA_TORCH_THREADS)
+    model = model_cls(len(chars)).to(device())
+    model.load_state_dict(torch.load(path, map_location=device()))
+    model.eval()
+    return model
+
+def predict_batch(model, transform, images, chars):
+    """Пакет картинок одним проходом модели: CaptchaResult или исключение (картинка не читается) для каждой"""
+    import torch
+    from PIL import Image
+    results = [None] * len(images)
+    tensors, indexes = [], []
+    for index, png_data in enumerate(images):
+        try:
+            tensors.append(transform(Image.open(BytesIO(png_data)).convert("RGB")))
+            indexes.append(index)
+        except Exception as e:
+            results[index] = e
+    if tensors:
+        with torch.no_grad():
+            output = torch.nn.functional.softmax(model(torch.stack(tensors).to(device())), dim=2)
+            probs, preds = output.max(dim=2)
+        for row, index in enumerate(indexes):
+            results[index] = ctc_decode(preds[row].tolist(), probs[row].tolist(), chars)
+    return results
+
+
+class CaptchaBatcher:
+    """
+    Распознавание одной моделью для всех потоков процесса. Запросы, пришедшие за window секунд
+    после первого, проходят через модель одним пакетом (не больше max_batch картинок).
+    """
+    def __init__(self, name, predict_batch, max_batch=None, window=None):
+        self.name = name
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch or settings.CAPTCHA_BATCH_SIZE
+        self.window = settings.CAPTCHA_BATCH_WINDOW / 1000 if window is None else window
+        self._queue = Queue()
+        self._thread = threading.Thread(target=self._run, name=f"captcha-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, image_bytes):
+        future = Future()
+        self._queue.put((image_bytes, future))
+        return future
+
+    def predict(self, image_bytes):
+        return self.submit(image_bytes).result(settings.CAPTCHA_TIMEOUT)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except Empty:
+                break
+        return batch
+
+    def _run(self):
+        # Любая ошибка пакета достаётся только его запросам: поток не должен завершиться, иначе распознавание
+        # в процессе остановится до перезапуска воркера
+        while True:
+            batch = self._collect()
+            try:
+                self._process(batch)
+            except BaseException as e:
+                logger.exception(f"[CaptchaBatcher] Ошибка распознавания пакета {self.name} ({len(batch)} шт.): {e!r}")
+                incr_worker_counter(f"captcha_{self.name}_batch_errors_total")
+                error = e if isinstance(e, Exception) else RuntimeError(f"Ошибка распознавания: {e!r}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+
+    def _process(self, batch):
+        start_time = time.monotonic()
+        results = self.predict_batch([image for image, _ in batch])
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+        observe_worker_histogram(f"captcha_{self.name}_batch_size", len(batch), buckets=BATCH_BUCKETS)
+        observe_worker_histogram(f"captcha_{self.name}_forward_seconds", time.monotonic() - start_time, buckets=LATENCY_BUCKETS)
+
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+def get_batcher(name):
+    with _batchers_lock:
+        if name not in _batchers:
+            module = importlib.import_module(MODELS[name])
+            model = load_crnn(module.MODEL_CLASS, module.MODEL_PATH, module.CHARS)
+            _batchers[name] = CaptchaBatcher(name, lambda images: predict_batch(model, module.transform, images, module.CHARS))
+        return _batchers[name]
+
+
+class CaptchaClient:
+    """Клиент сервера распознавания на локальном сокете: у каждого потока своё соединение"""
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _stream(self):
+        stream = getattr(self._local, "stream", None)
+        if stream is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(settings.CAPTCHA_TIMEOUT)
+            sock.connect(self.path)
+            stream = self._local.stream = sock.makefile("rwb")
+            self._local.sock = sock
+        return stream
+
+    def _close(self):
+        for name in ("stream", "sock"):
+            resource = getattr(self._local, name, None)
+            if resource is not None:
+                resource.close()
+                setattr(self._local, name, None)
+
+    def predict(self, name, image_bytes):
+        stream = self._stream()
+        try:
+            stream.write(json.dumps({"model": name, "image": base64.b64encode(image_bytes).decode()}).encode() + b"\n")
+            stream.flush()
+            line = stream.readline()
+        except OSError:
+            self._close()
+            raise
+        if not line:
+            self._close()
+            raise ConnectionError("Сервер распознавания закрыл соединение")
+        answer = json.loads(line)
+        if "error" in answer:
+            raise RuntimeError(answer["error"])
+        return CaptchaResult(answer["text"], answer["confidence"])
+
+
+_client = None
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = CaptchaClient(settings.CAPTCHA_SOCKET)
+    return _client
+
+def predict(name, image_bytes):
+    """
+    Распознавание капчи моделью name (blue, yellow): текст и уверенность по символам.
+    CAPTCHA_INFERENCE=socket — через сервер хоста (python -m app.captcha.inference), если он недоступен,
+    и CAPTCHA_INFERENCE=local — общим для потоков процесса CaptchaBatcher
+    """
+    start_time = time.monotonic()
+    result = None
+    if settings.CAPTCHA_INFERENCE == "socket":
+        try:
+            result = get_client().predict(name, image_bytes)
+        except OSError as e:
+            logger.warning(f"[captcha_inference] Сервер распознавания {settings.CAPTCHA_SOCKET} недоступен, распознавание в процессе: {e}")
+            incr_worker_counter("captcha_socket_fallback_total")
+    if result is None:
+        result = get_batcher(name).predict(image_bytes)
+    observe_worker_histogram(f"captcha_{name}_latency_seconds", time.monotonic() - start_time, buckets=LATENCY_BUCKETS)
+    if result.confidence:
+        observe_worker_histogram(f"captcha_{name}_confidence", min(result.confidence), buckets=CONFIDENCE_BUCKETS)
+    return result
+
+
+class CaptchaRequestHandler(socketserver.StreamRequestHandler):
+    """Запросы JSON-строками {"model", "image" (base64)}, ответы {"text", "confidence"} или {"error"}"""
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                result = get_batcher(request["model"]).predict(base64.b64decode(request["image"]))
+                answer = {"text": result.text, "confidence": result.confidence}
+            except Exception as e:
+                answer = {"error": str(e)}
+            self.wfile.write(json.dumps(answer, ensure_ascii=False).encode() + b"\n")
+
+
+def create_server(path=None):
+    path = path or settings.CAPTCHA_SOCKET
+    if os.path.exists(path):
+        os.unlink(path)
+    server = socketserver.ThreadingUnixStreamServer(path, CaptchaRequestHandler)
+    server.daemon_threads = True
+    return server
+
+def serve(path=None):
+    """Сервер распознавания для всех воркеров хоста: модели загружаются один раз, запросы объединяются в пакеты"""
+    for name in MODELS:
+        get_batcher(name)
+    server = create_server(path)
+    logger.info(f"[captcha_inference] Сервер распознавания капчи слушает {server.server_address}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    serve()
@@ -8,8 +8,6 @@ os.environ["ATEN_NO_MKLDNN"] = "1"
 import torch
 torch.backends.mkldnn.enabled = False
 from torchvision import transforms
-from PIL import Image
-from io import BytesIO
 required_version = "1.8.2+cpu"
 if torch.__version__ != required_version:
     raise RuntimeError(f"Найдена torch {torch.__version__}, требуется {required_version}")
@@ -17,15 +15,10 @@ if torch.__version__ != required_version:
 print("Версия PyTorch ок:", torch.__version__)
 
 from app.captcha.model_def_yellow import BetterCRNN, CHARS
+from app.captcha.inference import predict
 
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-
-num_classes = len(CHARS)
-model = BetterCRNN(num_classes).to(device)
-
-model_path = os.path.join(os.path.dirname(__file__), "..", "models", "model_yellow.pt")
-model.load_state_dict(torch.load(model_path, map_location=device))
-model.eval()
+MODEL_CLASS = BetterCRNN
+MODEL_PATH = os.path.join(os.path.dirname(__file__), "..", "models", "model_yellow.pt")
 
 transform = transforms.Compose([
     transforms.Grayscale(),
@@ -34,19 +27,4 @@ transform = transforms.Compose([
 ])
 
 def predict_captcha_from_bytes(png_data: bytes) -> str:
-    image = Image.open(BytesIO(png_data)).convert("RGB")
-    image = transform(image).unsqueeze(0).to(device)
-
-    with torch.no_grad():
-        output = model(image)
-        output = torch.nn.functional.log_softmax(output, dim=2)
-        preds = torch.argmax(output, dim=2)[0].tolist()
-
-    decoded = []
-    prev = -1
-    for p in preds:
-        if p != prev and p != num_classes:
-            decoded.append(CHARS[p])
-        prev = p
-
-    return "".join(decoded)
+    return predict("yellow", png_data).text
@@ -1,5 +1,8 @@
+import threading
 from celery import Celery
+from celery.signals import worker_init, worker_shutdown
 from app.config.settings import settings
+from app.utils.logger import logger
 from kombu import Queue
 
 # Создаем экземпляр Celery
@@ -29,3 +32,44 @@ celery_app.conf.update(
     worker_max_tasks_per_child=1000,
 )
 
+
+@worker_init.connect
+def check_settings(**kwargs):
+    """Предупреждает о настройках, которые не действуют вместе"""
+    if settings.INCREMENTAL_CHECKS and settings.RESULT_FORMAT != "records":
+        logger.warning(f"[check_settings] INCREMENTAL_CHECKS действует только при RESULT_FORMAT=records, "
+                       f"при RESULT_FORMAT={settings.RESULT_FORMAT} суды проверяются полностью")
+
+@worker_init.connect
+def warm_browser(sender=None, **kwargs):
+    """Запускает браузеры воркера заранее, в фоне, чтобы не задерживать старт"""
+    from app.services.browser import get_driver_pool, get_shared_browser
+    if settings.BROWSER_MODE == "pool":
+        concurrency = getattr(sender, "concurrency", None) or settings.DRIVER_POOL_SIZE
+        threading.Thread(target=get_driver_pool().warm, args=(concurrency,), daemon=True).start()
+    if settings.BROWSER_MODE == "shared" or settings.ASYNC_COURT_TYPES:
+        threading.Thread(target=get_shared_browser().start, daemon=True).start()
+
+@worker_shutdown.connect
+def close_browser(**kwargs):
+    from app.services.browser import get_driver_pool, get_shared_browser
+    if settings.BROWSER_MODE == "pool":
+        get_driver_pool().close()
+    if settings.BROWSER_MODE == "shared" or settings.ASYNC_COURT_TYPES:
+        get_shared_browser().close()
+
+
+def progress_reporter(task):
+    """
+    set_status для парсеров: статус задачи PROGRESS с текстом и судом. id задачи запоминается сразу:
+    request Celery привязан к потоку, а set_status вызывается и из потоков проверки серверов yellow
+    и асинхронного движка, где task.request.id — None
+    """
+    task_id = task.request.id
+    def set_status(text, court_name):
+        task.update_state(
+            task_id=task_id,
+            state='PROGRESS',
+            meta={'status': text, 'court_name': court_name}
+        )
+    return set_status
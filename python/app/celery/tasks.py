@@ -1,7 +1,13 @@
 from celery import shared_task
-from app.celery.celery_app import celery_app
+from app.celery.celery_app import celery_app, progress_reporter
 from app.parsers.courts.core import parse_courts
 from app.parsers.courts.utils import get_court_info
+from app.parsers.courts.yellow import get_court_type as get_yellow_court_type
+from app.services.browser import lease_driver
+from app.services.checkpoints import Checkpoint
+from app.services.circuit_breaker import CourtUnavailable
+from app.services.result_cache import store_result
+from app.services.waits import track_sleep
 from app.utils.logger import logger
 from app.schemas.schemas import PersonInitials
 from app.config.settings import settings
@@ -10,24 +16,29 @@ from app.metrics.redis_client import (increment_court_check_size,
                                       increment_court_verify_size,
                                       decrement_court_verify_size)
 
-@celery_app.task(queue='court_checks', bind=True, name="check_court")
+@celery_app.task(queue='court_checks', bind=True, name="check_court", max_retries=settings.CHECK_COURT_MAX_RETRIES)
 def check_court_task(self, address: str, fullname_data: dict):
     """
-    Задача для проверки одного суда.
+    Задача для проверки одного суда. Готовые категории сохраняются в Checkpoint, поэтому
+    повтор после ошибки (или повторная отправка тех же данных) проверяет только оставшиеся.
     """
-    def set_status(text, court_name):
-        self.update_state(
-            state='PROGRESS',
-            meta={'status': text, 'court_name': court_name}
-        )
+    set_status = progress_reporter(self)
+    checkpoint = Checkpoint.for_check(address, fullname_data)
     try:
         fullname = PersonInitials(**fullname_data)
         increment_court_check_size()
-        result = parse_courts(address, fullname, set_status, headless=settings.HEADLESS)
+        with track_sleep("check_court") as sleeping:
+            result = parse_courts(address, fullname, set_status, checkpoint=checkpoint)
+        logger.info(f"[Celery] Паузы при проверке {address}: {sleeping.total:.1f} с")
         decrement_court_check_size()
+        checkpoint.clear()
+        store_result(address, fullname_data, result)
         return {"address": address, "result": result, "status": "success"}
     except Exception as e:
         decrement_court_check_size()
+        if self.request.retries < self.max_retries and checkpoint.units:
+            logger.warning(f"[Celery] Проверка {address} прервана ({e}), повтор с сохранённого прогресса: {len(checkpoint.units)} единиц")
+            raise self.retry(countdown=settings.CHECK_COURT_RETRY_DELAY)
         raise RuntimeError(f"Ошибка проверки суда ({address}): {e}")
 
 @celery_app.task(queue='court_verifications', bind=True, name="verify_court")
@@ -68,6 +79,14 @@ def verify_court_task(self, address: str):
             'result': result,
             'task_id': self.request.id
         }
+    except CourtUnavailable as e:
+        logger.warning(f"[Celery] Сайт суда недоступен: {address}: {e}")
+        decrement_court_verify_size()
+        return {
+            'status': 'unavailable',
+            'result': str(e),
+            'task_id': self.request.id
+        }
     except Exception as e:
         logger.error(f"[Celery] Ошибка в задаче {self.request.id}: {e}")
         decrement_court_verify_size()
@@ -75,4 +94,21 @@ def verify_court_task(self, address: str):
             state='FAILURE',
             meta={'error': str(e)}
         )
-        raise
\ No newline at end of file
+        raise
+
+@celery_app.task(queue='court_verifications', name="revalidate_court")
+def revalidate_court_task(address: str):
+    """
+    Фоновая перепроверка записи реестра судов: тип, название и (для yellow) вёрстка сайта
+    """
+    logger.info(f"[Celery] Перепроверка суда в реестре: {address}")
+    try:
+        with lease_driver() as driver:
+            court_info = get_court_info(address, driver, refresh=True)
+            layout = None
+            if court_info.type == "yellow":
+                layout = get_yellow_court_type(driver, address, refresh=True)
+    except CourtUnavailable as e:
+        logger.warning(f"[Celery] Перепроверка {address} отложена: {e}")
+        return {"address": address, "status": "unavailable", "error": str(e)}
+    return {"address": address, "type": court_info.type, "layout": layout if isinstance(layout, str) else None}
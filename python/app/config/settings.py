@@ -35,6 +35,127 @@ class Settings:
     DEBUG = os.getenv("DEBUG", "0") == "1"
     HEADLESS = os.getenv("HEADLESS", "True").lower() == "true"
 
+    # Пул браузеров воркера
+    DRIVER_POOL_ENABLED: bool = os.getenv("DRIVER_POOL_ENABLED", "True").lower() == "true"
+    DRIVER_POOL_SIZE: int = int(os.getenv("DRIVER_POOL_SIZE", "10"))
+    DRIVER_POOL_MAX_USES: int = int(os.getenv("DRIVER_POOL_MAX_USES", "20"))
+    DRIVER_POOL_MAX_AGE: int = int(os.getenv("DRIVER_POOL_MAX_AGE", "1800"))
+    DRIVER_POOL_LEASE_TIMEOUT: int = int(os.getenv("DRIVER_POOL_LEASE_TIMEOUT", "600"))
+
+    # Режим браузера воркера: pool (пул драйверов), shared (один Chromium и отдельный контекст на задачу) или single
+    BROWSER_MODE: str = os.getenv("BROWSER_MODE", "pool" if DRIVER_POOL_ENABLED else "single")
+    CHROMIUM_BINARY: str = os.getenv("CHROME_BIN", "/usr/bin/chromium")
+    CHROMEDRIVER_PATH: str = os.getenv("CHROMEDRIVER", "/usr/bin/chromedriver")
+
+    # Стратегия загрузки страниц Chrome: none — переход не ждёт загрузки страницы, парсеры ждут свои условия
+    # готовности (PAGE_READY в scripts.py) не дольше PAGE_READY_TIMEOUT секунд; eager/normal — как раньше
+    PAGE_LOAD_STRATEGY: str = os.getenv("PAGE_LOAD_STRATEGY", "none")
+    PAGE_READY_TIMEOUT: float = float(os.getenv("PAGE_READY_TIMEOUT", "30"))
+    # Сколько ждать начала перехода после клика (click_and_wait), прежде чем считать, что клик страницу не открыл
+    CLICK_NAVIGATION_TIMEOUT: float = float(os.getenv("CLICK_NAVIGATION_TIMEOUT", "3"))
+
+    # Блокировка ресурсов в браузере: default (картинки, шрифты, медиа, счётчики), strict (ещё и CSS) или none
+    RESOURCE_POLICY: str = os.getenv("RESOURCE_POLICY", "default")
+    RESOURCE_POLICY_STATS: bool = os.getenv("RESOURCE_POLICY_STATS", "True").lower() == "true"
+
+    # Движок проверки судов msudrf ("blue"): http или selenium
+    BLUE_ENGINE: str = os.getenv("BLUE_ENGINE", "http")
+    BLUE_HTTP_TIMEOUT: int = int(os.getenv("BLUE_HTTP_TIMEOUT", "30"))
+    BLUE_HTTP_POOL_SIZE: int = int(os.getenv("BLUE_HTTP_POOL_SIZE", "20"))
+    # Браузерная проверка blue: каждая категория в своей вкладке, поиски идут одновременно
+    BLUE_PARALLEL_TABS: bool = os.getenv("BLUE_PARALLEL_TABS", "False").lower() == "true"
+    # Капча blue загружается запросом /captcha.php из страницы (False — снимком элемента, он же запасной путь)
+    CAPTCHA_FETCH: bool = os.getenv("CAPTCHA_FETCH", "True").lower() == "true"
+    # Распознавание капчи: local — одна модель на процесс, запросы всех потоков за CAPTCHA_BATCH_WINDOW мс
+    # проходят через неё пакетом до CAPTCHA_BATCH_SIZE картинок; socket — через сервер хоста на CAPTCHA_SOCKET
+    # (python -m app.captcha.inference), при его недоступности — как local
+    CAPTCHA_INFERENCE: str = os.getenv("CAPTCHA_INFERENCE", "local")
+    CAPTCHA_SOCKET: str = os.getenv("CAPTCHA_SOCKET", "/tmp/captcha-inference.sock")
+    CAPTCHA_BATCH_WINDOW: float = float(os.getenv("CAPTCHA_BATCH_WINDOW", "5"))
+    CAPTCHA_BATCH_SIZE: int = int(os.getenv("CAPTCHA_BATCH_SIZE", "16"))
+    CAPTCHA_TORCH_THREADS: int = int(os.getenv("CAPTCHA_TORCH_THREADS", "1"))
+    CAPTCHA_TIMEOUT: int = int(os.getenv("CAPTCHA_TIMEOUT", "30"))
+    # Страницы результатов 2..N загружаются HTTP-запросами с cookies браузера, параллельно (0 — через браузер по одной)
+    PAGE_FETCH_PER_HOST: int = int(os.getenv("PAGE_FETCH_PER_HOST", "4"))
+
+    # Ограничение запросов к одному сайту суда, общее для всех воркеров (Redis): токен-бакет HOST_RATE запросов/с
+    # с запасом HOST_BURST и не больше HOST_MAX_INFLIGHT запросов одновременно. Ошибки 502/503 снижают скорость
+    # в HOST_RATE_DECREASE раз (не ниже HOST_RATE_MIN), успешные ответы возвращают её на HOST_RATE_INCREASE
+    HOST_GOVERNOR_ENABLED: bool = os.getenv("HOST_GOVERNOR_ENABLED", "True").lower() == "true"
+    HOST_RATE: float = float(os.getenv("HOST_RATE", "5"))
+    HOST_BURST: int = int(os.getenv("HOST_BURST", "10"))
+    HOST_MAX_INFLIGHT: int = int(os.getenv("HOST_MAX_INFLIGHT", "6"))
+    HOST_RATE_MIN: float = float(os.getenv("HOST_RATE_MIN", "0.2"))
+    HOST_RATE_INCREASE: float = float(os.getenv("HOST_RATE_INCREASE", "0.1"))
+    HOST_RATE_DECREASE: float = float(os.getenv("HOST_RATE_DECREASE", "0.5"))
+    HOST_SLOT_TIMEOUT: int = int(os.getenv("HOST_SLOT_TIMEOUT", "60"))
+    HOST_LEASE_TTL: int = int(os.getenv("HOST_LEASE_TTL", "120"))
+
+    # Выключатель сайта суда (Redis): BREAKER_THRESHOLD ошибок 5xx или "Информация временно недоступна"
+    # за BREAKER_WINDOW секунд — проверки сайта сразу завершаются на BREAKER_COOLDOWN секунд, затем одна пробная
+    BREAKER_ENABLED: bool = os.getenv("BREAKER_ENABLED", "True").lower() == "true"
+    BREAKER_THRESHOLD: int = int(os.getenv("BREAKER_THRESHOLD", "5"))
+    BREAKER_WINDOW: int = int(os.getenv("BREAKER_WINDOW", "120"))
+    BREAKER_COOLDOWN: int = int(os.getenv("BREAKER_COOLDOWN", "300"))
+    BREAKER_PROBE_TIMEOUT: int = int(os.getenv("BREAKER_PROBE_TIMEOUT", "120"))
+
+    # Ожидания в парсерах: опрос условия готовности страницы с растущими паузами (WAIT_POLL_INTERVAL..WAIT_POLL_MAX)
+    # и повторы после 502/503 с паузами WAIT_BACKOFF_BASE, 2·WAIT_BACKOFF_BASE... до WAIT_BACKOFF_CAP.
+    # Таймауты ожиданий — перцентиль WAIT_PERCENTILE последних WAIT_LATENCY_WINDOW задержек сайта × WAIT_TIMEOUT_FACTOR
+    ADAPTIVE_WAITS: bool = os.getenv("ADAPTIVE_WAITS", "True").lower() == "true"
+    WAIT_POLL_INTERVAL: float = float(os.getenv("WAIT_POLL_INTERVAL", "0.05"))
+    WAIT_POLL_MAX: float = float(os.getenv("WAIT_POLL_MAX", "1"))
+    WAIT_BACKOFF_BASE: float = float(os.getenv("WAIT_BACKOFF_BASE", "1"))
+    WAIT_BACKOFF_CAP: float = float(os.getenv("WAIT_BACKOFF_CAP", "15"))
+    WAIT_LATENCY_WINDOW: int = int(os.getenv("WAIT_LATENCY_WINDOW", "200"))
+    WAIT_MIN_SAMPLES: int = int(os.getenv("WAIT_MIN_SAMPLES", "20"))
+    WAIT_PERCENTILE: float = float(os.getenv("WAIT_PERCENTILE", "95"))
+    WAIT_TIMEOUT_FACTOR: float = float(os.getenv("WAIT_TIMEOUT_FACTOR", "3"))
+    WAIT_TIMEOUT_MIN: float = float(os.getenv("WAIT_TIMEOUT_MIN", "5"))
+    WAIT_TIMEOUT_MAX: float = float(os.getenv("WAIT_TIMEOUT_MAX", "120"))
+
+    # Серверы multi-суда yellow проверяются одновременно в отдельных драйверах (1 — по очереди в одном)
+    YELLOW_SERVER_WORKERS: int = int(os.getenv("YELLOW_SERVER_WORKERS", "4"))
+    YELLOW_SERVER_LEASE_TIMEOUT: int = int(os.getenv("YELLOW_SERVER_LEASE_TIMEOUT", "30"))
+
+    # Асинхронный движок (DevTools + asyncio): типы судов через запятую (blue,yellow,spb), остальные проверяются синхронно
+    ASYNC_COURT_TYPES: list = [t.strip() for t in os.getenv("ASYNC_COURT_TYPES", "").split(",") if t.strip()]
+    ASYNC_MAX_SESSIONS: int = int(os.getenv("ASYNC_MAX_SESSIONS", "30"))
+
+    # Извлечение таблиц и категорий скриптами в странице (False — через page_source и BeautifulSoup)
+    IN_PAGE_EXTRACTION: bool = os.getenv("IN_PAGE_EXTRACTION", "True").lower() == "true"
+
+    # Заполнение полей форм одним скриптом вместо посимвольного ввода. FORM_FILL_KEYSTROKES — поля,
+    # которым нужны настоящие нажатия клавиш, через запятую в виде сайт.поле (например spb.id_date_from)
+    FAST_FORM_FILL: bool = os.getenv("FAST_FORM_FILL", "True").lower() == "true"
+    FORM_FILL_KEYSTROKES: list = [f.strip() for f in os.getenv("FORM_FILL_KEYSTROKES", "").split(",") if f.strip()]
+
+    # Формат результатов задач: html (объединённые таблицы сайта) или records (записи дел, HTML строится в API
+    # по запросу; колонки, не попавшие в поля записи, хранятся в extra)
+    RESULT_FORMAT: str = os.getenv("RESULT_FORMAT", "html")
+
+    # Прогресс проверки суда в Redis: готовые категории не проверяются повторно при повторе задачи
+    CHECKPOINT_ENABLED: bool = os.getenv("CHECKPOINT_ENABLED", "True").lower() == "true"
+    CHECKPOINT_TTL: int = int(os.getenv("CHECKPOINT_TTL", str(6 * 3600)))
+    CHECK_COURT_MAX_RETRIES: int = int(os.getenv("CHECK_COURT_MAX_RETRIES", "2"))
+    CHECK_COURT_RETRY_DELAY: int = int(os.getenv("CHECK_COURT_RETRY_DELAY", "10"))
+
+    # Кэш результатов проверок: суд + ФИО, используется, если запрос передал max_age
+    RESULT_CACHE_ENABLED: bool = os.getenv("RESULT_CACHE_ENABLED", "True").lower() == "true"
+    RESULT_CACHE_TTL: int = int(os.getenv("RESULT_CACHE_TTL", str(24 * 3600)))
+
+    # Инкрементальная проверка (только RESULT_FORMAT=records): поиск с даты последнего известного дела
+    # или до страницы, целиком состоящей из известных дел. Полная проверка единицы — раз в INCREMENTAL_FULL_RECHECK.
+    # При RESULT_FORMAT=html история дел не ведётся и суды проверяются полностью (воркер предупреждает при старте)
+    INCREMENTAL_CHECKS: bool = os.getenv("INCREMENTAL_CHECKS", "True").lower() == "true"
+    INCREMENTAL_FULL_RECHECK: int = int(os.getenv("INCREMENTAL_FULL_RECHECK", str(7 * 24 * 3600)))
+    CASE_HISTORY_TTL: int = int(os.getenv("CASE_HISTORY_TTL", str(90 * 24 * 3600)))
+
+    # Реестр судов в Redis: тип, название, вёрстка и адреса страниц по хосту суда
+    COURT_REGISTRY_ENABLED: bool = os.getenv("COURT_REGISTRY_ENABLED", "True").lower() == "true"
+    COURT_REGISTRY_TTL: int = int(os.getenv("COURT_REGISTRY_TTL", str(30 * 24 * 3600)))
+    COURT_REGISTRY_REVALIDATE: int = int(os.getenv("COURT_REGISTRY_REVALIDATE", str(24 * 3600)))
+
     # Redis настройки
     REDIS_HOST: str = os.getenv("REDIS_HOST", "redis")
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", "6379"))
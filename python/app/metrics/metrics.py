@@ -1,6 +1,9 @@
 import asyncio
 import prometheus_client
-from app.metrics.redis_client import get_queue_size_redis,reset_metrics_timer,reset_courts_queue_count
+from prometheus_client.core import GaugeMetricFamily
+from app.metrics.redis_client import (get_queue_size_redis,reset_metrics_timer,reset_courts_queue_count,
+                                      get_worker_counters, get_worker_gauges)
+from app.services.circuit_breaker import get_breaker_states
 
 from app.utils.logger import logger
 
@@ -9,6 +12,29 @@ redis_queue_size = prometheus_client.Gauge(
     'Current size of the task queue',
 )
 
+class WorkerMetricsCollector:
+    """Отдаёт в Prometheus метрики воркеров Celery, накопленные в Redis"""
+    def collect(self):
+        counters = GaugeMetricFamily('worker_counter', 'Counters and histograms reported by Celery workers', labels=['name', 'le'])
+        gauges = GaugeMetricFamily('worker_gauge', 'Gauges reported by Celery workers', labels=['worker', 'name'])
+        breakers = GaugeMetricFamily('court_breaker', 'Court sites with an open or half-open circuit breaker', labels=['host', 'state'])
+        try:
+            for field, value in get_worker_counters().items():
+                name, _, le = field.partition("|le=")
+                counters.add_metric([name, le], value)
+            for worker, values in get_worker_gauges().items():
+                for name, value in values.items():
+                    gauges.add_metric([worker, name], value)
+            for host, state in get_breaker_states().items():
+                breakers.add_metric([host, state], 1)
+        except Exception as e:
+            logger.error(f"Ошибка при получении метрик воркеров: {e}")
+        yield counters
+        yield gauges
+        yield breakers
+
+prometheus_client.REGISTRY.register(WorkerMetricsCollector())
+
 async def monitor_queue_size():
     while True:
         try:
@@ -25,4 +51,4 @@ async def start_queue_monitor():
 async def start_metrics():
     reset_courts_queue_count()
     await start_queue_monitor()
-    asyncio.create_task(reset_metrics_timer(28800))  # Сброс каждые 28800 секунд
\ No newline at end of file
+    asyncio.create_task(reset_metrics_timer(28800))  # Сброс каждые 28800 секунд
@@ -1,6 +1,7 @@
 import asyncio
 import redis
 import os
+import socket
 from app.config.settings import settings
 from app.utils.logger import logger
 
@@ -15,6 +16,13 @@ KEY_QUEUE_DEPTH_VERIFY = "metrics:queues:verify_court:depth"
 KEY_RUNNING_CHECK  = "metrics:running:check_court"
 KEY_RUNNING_VERIFY = "metrics:running:verify_court"
 
+# Метрики воркеров: счётчики общие для всех процессов, gauge-метрики — свои у каждого процесса
+KEY_WORKER_COUNTERS = "metrics:worker:counters"
+KEY_WORKER_GAUGES = "metrics:worker:gauges"
+WORKER_GAUGES_TTL = 300
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}"
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
 def get_queue_size_redis(queue_name):
     return r.llen(queue_name)
 
@@ -66,4 +74,43 @@ async def reset_metrics_timer(timer):
     while True:
         await asyncio.sleep(timer)
         reset_check_time_metrics()
-        logger.info("Метрики времени проверок судов сброшены")
\ No newline at end of file
+        logger.info("Метрики времени проверок судов сброшены")
+
+def incr_worker_counter(name, amount=1):
+    try:
+        r.hincrbyfloat(KEY_WORKER_COUNTERS, name, amount)
+    except Exception as e:
+        logger.warning(f"[incr_worker_counter] Не удалось обновить метрику {name}: {e}")
+
+def set_worker_gauge(name, value):
+    key = f"{KEY_WORKER_GAUGES}:{WORKER_ID}"
+    try:
+        pipe = r.pipeline()
+        pipe.hset(key, name, value)
+        pipe.expire(key, WORKER_GAUGES_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"[set_worker_gauge] Не удалось обновить метрику {name}: {e}")
+
+def observe_worker_histogram(name, value, buckets=DEFAULT_BUCKETS):
+    try:
+        pipe = r.pipeline()
+        for bucket in buckets:
+            if value <= bucket:
+                pipe.hincrbyfloat(KEY_WORKER_COUNTERS, f"{name}_bucket|le={bucket}", 1)
+        pipe.hincrbyfloat(KEY_WORKER_COUNTERS, f"{name}_bucket|le=+Inf", 1)
+        pipe.hincrbyfloat(KEY_WORKER_COUNTERS, f"{name}_sum", value)
+        pipe.hincrbyfloat(KEY_WORKER_COUNTERS, f"{name}_count", 1)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"[observe_worker_histogram] Не удалось обновить метрику {name}: {e}")
+
+def get_worker_counters():
+    return {name: float(value) for name, value in r.hgetall(KEY_WORKER_COUNTERS).items()}
+
+def get_worker_gauges():
+    result = {}
+    for key in r.scan_iter(f"{KEY_WORKER_GAUGES}:*"):
+        worker = key.split(":", 3)[-1]
+        result[worker] = {name: float(value) for name, value in r.hgetall(key).items()}
+    return result
@@ -3,8 +3,8 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from app.parsers.courts.scripts import fill_input, wait_for, open_url
 from app.utils.logger import logger
-import time
 
 link = "https://www.gosuslugi.ru/pay?tab=STATE_DUTY"
 
@@ -16,20 +16,20 @@ def check_gos_uslugi_gosposhl(inn: str, driver) -> str:
     logger.success(f"[check_gos_uslugi_gosposhl] Формат ИНН корректный")
     try:
         logger.info(f"[check_gos_uslugi_gosposhl] Проверка формата ИНН")
-        driver.get(link)
+        open_url(driver, link)
         wait = WebDriverWait(driver, 10)
         
         inn_tab = wait.until(EC.element_to_be_clickable((By.ID, "inn")))
         inn_tab.click()
         input_field = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "input.text-input")))
-        input_field.clear()
         logger.info(f"[check_gos_uslugi_gosposhl] Попытка отправить запрос")
         try:
-            for ch in inn:
-                input_field.send_keys(ch)
-                time.sleep(0.005)
+            fill_input(driver, input_field, inn, "gosuslugi", "inn", delay=0.005)
             input_field.send_keys(Keys.ENTER)
-            time.sleep(3)
+            try:
+                wait_for(driver, lambda d: d.find_elements(By.CSS_SELECTOR, "h3.title-h4, #errors_inn label"), "result", 10)
+            except TimeoutException:
+                logger.warning(f"[check_gos_uslugi_gosposhl] Ответ не отобразился, проверяется текущая страница")
             logger.success(f"[check_gos_uslugi_gosposhl] Запрос успешно отправлен")
         except Exception as e:
             logger.error(f"[check_gos_uslugi_gosposhl] Ошибка при отправке запроса: {e}")
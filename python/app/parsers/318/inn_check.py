@@ -1,7 +1,7 @@
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import NoSuchElementException
-import time
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from app.parsers.courts.scripts import fill_input, wait_for, open_url
 from app.utils.logger import logger
 from app.schemas import ResponseModel  
 
@@ -18,16 +18,16 @@ def check_inn_validity(inn: str, driver) -> str:
         )
 
     try:
-        driver.get(link)
+        open_url(driver, link, "nalog_inn")
         logger.info(f"[check_inn_validity] Попытка отправить запрос")
         try:
             input_elem = driver.find_element(By.ID, "inn")
-            input_elem.clear()
-            for ch in inn:
-                input_elem.send_keys(ch)
-                time.sleep(0.005)        
+            fill_input(driver, input_elem, inn, "nalog", "inn", delay=0.005)
             input_elem.send_keys(Keys.ENTER)
-            time.sleep(1)
+            try:
+                wait_for(driver, lambda d: any(e.is_displayed() for e in d.find_elements(By.CSS_SELECTOR, "#pnlResult, #errors_inn label")), "result", 10)
+            except TimeoutException:
+                logger.warning(f"[check_inn_validity] Ответ не отобразился, проверяется текущая страница")
         except Exception as e:
             logger.error(f"[check_inn_validity] Ошибка при отправке запроса: {e}")
             raise
@@ -0,0 +1,91 @@
+import asyncio
+import base64
+import json
+import time
+
+from app.parsers.courts.utils import CourtInfo, PageStatus, PROBE_FUNCTION, record_probe
+from app.parsers.courts.scripts import FETCH_BYTES_FUNCTION
+from app.services.court_registry import get_court_meta, update_court_meta
+from app.services.async_browser import CDPError, element_js
+from app.services.host_governor import report_response, host_slot_async
+from app.metrics.redis_client import incr_worker_counter, observe_worker_histogram
+from app.config.settings import settings
+from app.services.waits import backoff_delays, sleep_async
+from app.utils.logger import logger
+
+MAX_RETRIES = 15
+
+async def probe_page_async(page, selectors=None):
+    """Асинхронный аналог probe_page: состояние страницы одним вызовом Runtime.evaluate"""
+    result = await page.evaluate(f"({PROBE_FUNCTION})({json.dumps(selectors or {})})")
+    record_probe(len(json.dumps(result, ensure_ascii=False).encode("utf-8")), result["html_length"])
+    return PageStatus(alert=False, **result)
+
+async def verify_page_async(page):
+    """Асинхронный аналог verify_page: ждёт, пока сайт перестанет отдавать 502/503"""
+    delays = backoff_delays()
+    for attempt in range(MAX_RETRIES):
+        status = await probe_page_async(page)
+        report_response(await page.url(), not (status.server_error or status.unavailable_message))
+        if not status.server_error:
+            return status
+        logger.warning(f"[verify_page_async] Сайт вернул ошибку. Попытка получить доступ {attempt + 1}/{MAX_RETRIES}")
+        await sleep_async(next(delays))
+        await page.reload()
+    raise RuntimeError(f"Сайт недоступен после {MAX_RETRIES} попыток")
+
+async def fetch_bytes_async(page, url, content_type="image/"):
+    """Асинхронный аналог fetch_bytes: байты ресурса сайта через fetch в странице или None"""
+    try:
+        async with host_slot_async(url):
+            data = await page.evaluate(f"({FETCH_BYTES_FUNCTION})({json.dumps(url)}, {json.dumps(content_type)})", await_promise=True)
+    except CDPError as e:
+        logger.warning(f"[fetch_bytes_async] Скрипт загрузки {url} не выполнен: {e}")
+        return None
+    if not data:
+        return None
+    content = base64.b64decode(data)
+    incr_worker_counter("fetch_bytes_total", len(content))
+    return content
+
+async def captcha_image_bytes_async(page, selector):
+    """Асинхронный аналог captcha_image_bytes из blue: запрос из страницы, снимок элемента — запасной путь"""
+    start_time = time.monotonic()
+    src = await page.evaluate(f"(() => {{ const el = {element_js(selector)}; return el ? el.src : null; }})()") if settings.CAPTCHA_FETCH else None
+    png_data = await fetch_bytes_async(page, src) if src else None
+    mode = "fetch"
+    if png_data is None:
+        if settings.CAPTCHA_FETCH:
+            logger.warning(f"[captcha_image_bytes_async] Не удалось загрузить капчу из страницы, используется снимок элемента.")
+        png_data = await page.screenshot_element(selector)
+        mode = "screenshot"
+    observe_worker_histogram(f"captcha_image_{mode}_seconds", time.monotonic() - start_time)
+    return png_data
+
+async def predict_async(predict, image_bytes):
+    """Распознавание капчи занимает CPU, поэтому выполняется вне цикла событий"""
+    return await asyncio.to_thread(predict, image_bytes)
+
+async def get_court_info_async(page, address):
+    """Асинхронный аналог get_court_info: тип и название суда по главной странице"""
+    meta = get_court_meta(address)
+    if meta is not None and meta.type:
+        logger.info(f"[get_court_info_async] Суд найден в реестре: {meta.type}, {meta.name}")
+        return CourtInfo(supported=True, type=meta.type, name=meta.name)
+    logger.info(f"[get_court_info_async] Определение типа суда по адресу: {address}")
+    await page.get(address)
+    await verify_page_async(page)
+    try:
+        await page.wait_for("!!(document.getElementById('court_name') || document.querySelector('.header__middle') || document.querySelector('.inner-logo'))", timeout=15)
+    except asyncio.TimeoutError as e:
+        logger.warning(f"[get_court_info_async] Не удалось определить тип суда: {e}")
+        return CourtInfo(supported=False, type=None, name=None, error="Сайт не поддерживается")
+    if await page.exists("#court_name"):
+        court_info = CourtInfo(supported=True, type="blue", name=(await page.text("#court_name")).strip())
+    elif await page.exists(".header__middle"):
+        court_info = CourtInfo(supported=True, type="yellow", name=((await page.text(".heading_title")) or "unsupported").strip())
+    else:
+        court_info = CourtInfo(supported=True, type="spb", name="Мировые судьи Санкт-Петербурга")
+    if court_info.name != "unsupported":
+        update_court_meta(address, type=court_info.type, name=court_info.name)
+    return court_info
@@ -3,17 +3,60 @@ from bs4 import BeautifulSoup
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
-
 import time
+
 import torch
 print(torch.__file__)
 
 from app.captcha.ocr_model_blue_integration import predict_captcha_from_bytes
-from app.parsers.courts.utils import check_502,check_503, make_name_initials
+from app.parsers.courts.utils import probe_page, check_unexpected_alert, make_name_initials
+from app.parsers.courts.records import result_accumulator
+from app.parsers.courts.scripts import get_element_html, fill_input, navigate, refresh_page, wait_for, click_and_wait, fetch_bytes
+from app.parsers.courts.tables import find_table_html
+from app.services.browser import open_tab, close_tabs
+from app.services.checkpoints import Checkpoint
+from app.services.http_client import session_from_driver, fetch_pages, decode_response
+from app.services.host_governor import host_slot, report_response, report_status
+from app.services.waits import backoff_delays, sleep
+from app.metrics.redis_client import incr_worker_counter, observe_worker_histogram
+from app.config.settings import settings
 from app.utils.logger import logger
 
 MAX_RETRIES = 15
-RETRY_DELAY = 2.5  
+
+# Поле поиска по ФИО в каждой категории и название категории в результате
+BLUE_CATEGORIES = {
+    "U1_DEFENDANT__NAMESS": "Уголовные дела (Подсудимый (осужденный))",
+    "U1_PARTS__NAMESS": "Уголовные дела (Лицо, участвующее в деле)",
+    "G1_PARTS__NAMESS": "Административные и гражданские дела",
+    "adm_parts__NAMESS": "Дела об административных правонарушениях",
+    "M_PARTS__NAMESS": "Производство по делам",
+}
+
+# Вкладка (id кнопки в .bookmarks), на которой находится поле категории
+BLUE_CATEGORY_TABS = {
+    "U1_DEFENDANT__NAMESS": "type_0",
+    "U1_PARTS__NAMESS": "type_0",
+    "G1_PARTS__NAMESS": "type_1",
+    "adm_parts__NAMESS": "type_2",
+    "M_PARTS__NAMESS": "type_3",
+}
+
+def captcha_image_bytes(driver, captcha_img):
+    """
+    Картинка капчи запросом /captcha.php из страницы (сессия та же, сервер проверит новую капчу),
+    а если не удалось или CAPTCHA_FETCH=False — снимком элемента
+    """
+    start_time = time.monotonic()
+    png_data = fetch_bytes(driver, captcha_img.get_attribute("src")) if settings.CAPTCHA_FETCH else None
+    mode = "fetch"
+    if png_data is None:
+        if settings.CAPTCHA_FETCH:
+            logger.warning(f"[solve_captcha] Не удалось загрузить капчу из страницы, используется снимок элемента.")
+        png_data = captcha_img.screenshot_as_png
+        mode = "screenshot"
+    observe_worker_histogram(f"captcha_image_{mode}_seconds", time.monotonic() - start_time)
+    return png_data
 
 def solve_captcha(driver):
     logger.info(f"[solve_captcha] Начата попытка распознания капчи.")
@@ -24,7 +67,7 @@ def solve_captcha(driver):
         #driver.refresh()
         input_captcha(driver)
     logger.info(f"[solve_captcha] Элемент с капчей найден.")
-    png_data = captcha_img.screenshot_as_png
+    png_data = captcha_image_bytes(driver, captcha_img)
     logger.info(f"[solve_captcha] Распознавание капчи.")
     captcha_text = predict_captcha_from_bytes(png_data)
     return captcha_text
@@ -47,19 +90,16 @@ def input_captcha(driver):
         return " Поле ввода капчи не найдено"
     logger.info(f"[input_captcha] Поле найдено. Попытка отправить капчу.")
     try:
-        for c in captcha_text:
-            time.sleep(0.05)
-            inputs[0].send_keys(c)
+        fill_input(driver, inputs[0], captcha_text, "blue", "captcha-response", delay=0.05)
         
         buttons = driver.find_elements(By.CLASS_NAME, 'button-normal')
         if not buttons:
             logger.error(f"[input_captcha] Ошибка. Кнопка отправки формы не найдена.")
             return " Кнопка отправки формы не найдена"
-        buttons[0].click()
+        click_and_wait(driver, buttons[0], "blue_results")
     except Exception as e:
         logger.error(f"[input_captcha] Ошибка при отправке капчи: {e}.")
         raise
-    time.sleep(2)
     logger.info(f"[input_captcha] Капча отправлена.")
     
     inputs = driver.find_elements(By.NAME, 'captcha-response')
@@ -73,7 +113,6 @@ def input_captcha(driver):
     logger.warning(f"[input_captcha] Капча не пройдена. Запуск повторной проверки.")
     CAPTCHA_TRY+=1
     #driver.refresh()
-    time.sleep(2)
     input_captcha(driver)
 
 def extract_table_html(driver):
@@ -82,31 +121,8 @@ def extract_table_html(driver):
         WebDriverWait(driver,60).until(EC.presence_of_element_located((By.ID,"search_results")))
     except Exception as e:
         logger.error(f"[extract_table_html] Не удалось загрузить таблицу дел.")
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    table = soup.find("table", id="tablcont")
-    return str(table) if table else "<div class='placeholder'>Нет данных</div>"
-
-def merge_html_tables(html_list):
-    logger.info(f"[merge_html_tables] Начато объединение таблиц.")
-    if not html_list:
-        return "<div class='placeholder'>Нет данных</div>"
-
-    soup = BeautifulSoup(html_list[0], "html.parser")
-    base_table = soup.find("table")
-    base_body = base_table.find("tbody")
-
-    for html in html_list[1:]:
-        temp_soup = BeautifulSoup(html, "html.parser")
-        table = temp_soup.find("table")
-        if not table:
-            continue
-        body = table.find("tbody")
-        if not body:
-            continue
-        for row in body.find_all("tr"):
-            base_body.append(row)
-
-    return str(base_table)
+    table = get_element_html(driver, "table#tablcont")
+    return table or "<div class='placeholder'>Нет данных</div>"
 
 def extract_total_pages(html):
     logger.info(f"[extract_total_pages] Получения кол-ва страниц.")
@@ -155,65 +171,135 @@ def update_page_number(url, new_page_number):
         parts.fragment
     ))
 
-def check_captcha(driver):
-    logger.info(f"[check_captcha] Проверка требования капчи.")
-    capthca_page = driver.find_elements(By.ID,"kcaptchaForm")
-    if capthca_page:
-        logger.warning(f"[check_captcha] Требуется ввести капчу.")
-        input_captcha(driver)
-
-def verify_page(driver):
-    check_503(driver)
-    check_captcha(driver)
-    check_503(driver)
-    check_captcha(driver) 
+def verify_page(driver, selectors=None):
+    delays = backoff_delays()
+    for attempt in range(MAX_RETRIES):
+        status = probe_page(driver, selectors)
+        if not status.alert:
+            report_response(driver.current_url, not (status.server_error or status.unavailable_message))
+        if status.alert:
+            check_unexpected_alert(driver)
+        elif status.server_error:
+            logger.warning(f"[verify_page] Обнаружена ошибка сервера. Попытка получить доступ {attempt + 1}/{MAX_RETRIES}")
+            sleep(next(delays))
+            refresh_page(driver)
+        elif status.captcha:
+            logger.warning(f"[verify_page] Требуется ввести капчу.")
+            input_captcha(driver)
+        else:
+            return status
+    logger.error(f"[verify_page] После {MAX_RETRIES} попыток страница не прошла проверку.")
 
-def get_all_cases(driver,pages_count):
+def get_all_cases(driver,pages_count, known=None):
     logger.info(f"[get_all_cases] Парсинг результата.")
-    WebDriverWait(driver, 120).until(
-            lambda d: d.find_elements(By.CLASS_NAME, "case-count") or d.find_elements(By.CLASS_NAME, "search-error")
-        )
+    wait_for(driver, lambda d: d.find_elements(By.CLASS_NAME, "case-count") or d.find_elements(By.CLASS_NAME, "search-error"),
+             "search", 120)
     errors = driver.find_elements(By.CLASS_NAME,"search-error")
     if (errors):
         return "<div class='placeholder'>Дела не найдены</div>"
-    all_pages = []
+    tables = result_accumulator(known=known)
+    if settings.PAGE_FETCH_PER_HOST > 0 and pages_count > 1:
+        return fetch_all_cases(driver, pages_count, tables)
     for page_number in range(pages_count):
         page_url = update_page_number(driver.current_url, page_number)
-        driver.get(page_url)
+        navigate(driver, page_url, "blue_results")
         verify_page(driver)
         try:
             page = extract_table_html(driver)
         except Exception as e:
             logger.error(f"[get_all_cases] Ошибка при получении таблицы категории {e}.")
-        all_pages.append(page)
-    return merge_html_tables(all_pages)
-
-def parse_category(driver,name_to_check,category):
+        tables.add(page)
+        if tables.caught_up:
+            logger.info(f"[get_all_cases] Страница {page_number + 1} из {pages_count} состоит из известных дел, остальные не загружаются.")
+            break
+    return tables.result()
+
+def fetch_page_table(session, page_url):
+    with host_slot(page_url):
+        response = session.get(page_url, timeout=settings.BLUE_HTTP_TIMEOUT)
+    report_status(page_url, response.status_code)
+    html = decode_response(response)
+    # Капчу и ошибки сервера обрабатывает браузер (verify_page)
+    if response.status_code >= 400 or "kcaptchaForm" in html:
+        return None
+    return find_table_html(html, "tablcont")
+
+def fetch_all_cases(driver, pages_count, tables):
+    """
+    Первая страница берётся из браузера, страницы 2..N загружаются пачками (fetch_pages) HTTP-запросами
+    с cookies браузера и добавляются в tables по порядку. Страницы, которые не удалось
+    загрузить (капча, ошибка сервера), открываются в браузере.
+    Как только очередная страница целиком из известных дел (tables.caught_up), остальные не загружаются.
+    """
+    tables.add(extract_table_html(driver))
+    if tables.caught_up:
+        logger.info(f"[fetch_all_cases] Первая страница состоит из известных дел, остальные не загружаются.")
+        return tables.result()
+    logger.info(f"[fetch_all_cases] Загрузка {pages_count - 1} страниц результатов HTTP-запросами.")
+    first_url = driver.current_url
+    page_urls = [update_page_number(first_url, page_number) for page_number in range(1, pages_count)]
+    session = session_from_driver(driver)
+    fetched = fallbacks = 0
+    for page_number, (page_url, table) in enumerate(zip(page_urls, fetch_pages(page_urls, lambda url: fetch_page_table(session, url))), 2):
+        if table is None:
+            logger.warning(f"[fetch_all_cases] Страница {page_url} не загружена запросом, открываю в браузере.")
+            fallbacks += 1
+            navigate(driver, page_url, "blue_results")
+            verify_page(driver)
+            table = extract_table_html(driver)
+        else:
+            fetched += 1
+        tables.add(table)
+        if tables.caught_up:
+            logger.info(f"[fetch_all_cases] Страница {page_number} из {pages_count} состоит из известных дел, остальные не загружаются.")
+            break
+    incr_worker_counter("page_fetch_total", fetched)
+    if fallbacks:
+        incr_worker_counter("page_fetch_fallback_total", fallbacks)
+    return tables.result()
+
+def parse_category(driver,name_to_check,category, known=None):
     logger.info(f"[parse_category] Парсинг категории {category}.")
    
     category_input = driver.find_elements(By.NAME,category)
     search_button = driver.find_elements(By.CLASS_NAME,"search")
-    for c in name_to_check:
-        category_input[0].send_keys(c)
-    search_button[0].click()
+    fill_input(driver, category_input[0], name_to_check, "blue", category)
+    click_and_wait(driver, search_button[0], "blue_results")
     verify_page(driver)
-    pages_count = extract_total_pages(driver.page_source)
-    return get_all_cases(driver,pages_count)
+    pages_count = extract_total_pages(get_element_html(driver, "ul.paging") or "")
+    return get_all_cases(driver,pages_count, known)
 
-def parse_court_blue(driver, address,court_name,fullname,set_status):
+def parse_court_blue(driver, address,court_name,fullname,set_status, checkpoint=None):
+    checkpoint = checkpoint or Checkpoint()
     court_results = {}
     names = make_name_initials(fullname)
     logger.info(f"[parse_court_blue] Начало проверки.")
     for name_to_check in names:
+        # Если готовы все категории, сайт для этого ФИО не открывается
+        cached = {category_name: checkpoint.get(court_name, name_to_check, category_name) for category_name in BLUE_CATEGORIES.values()}
+        if None not in cached.values():
+            court_results.setdefault(court_name, {})[name_to_check] = cached
+            continue
+
+        def parse_and_save(category):
+            # Готовая категория берётся из сохранённого прогресса, поиск по ней не запускается
+            if cached[BLUE_CATEGORIES[category]] is not None:
+                logger.info(f"[parse_court_blue] Категория {BLUE_CATEGORIES[category]} уже проверена, пропуск")
+                return cached[BLUE_CATEGORIES[category]]
+            known = checkpoint.known(court_name, name_to_check, BLUE_CATEGORIES[category])
+            table = parse_category(driver, name_to_check, category, known)
+            checkpoint.save(court_name, name_to_check, BLUE_CATEGORIES[category], result=table)
+            return table
+
     #Проверка доступа к сайту
-        driver.get(address)
+        navigate(driver, address, "court_home")
         verify_page(driver)
         
         search_page = driver.find_elements(By.CLASS_NAME,"menu-link")
         if not search_page:
             logger.error("Не найден элемент search_page")
             raise RuntimeError(f"Ошибка при работе с судом: {address}")
-        search_page[0].click()
+        click_and_wait(driver, search_page[0], "blue_search")
         verify_page(driver)
         WebDriverWait(driver, 10).until(
             lambda d: d.find_elements(By.CLASS_NAME, "bookmarks")
@@ -231,16 +317,15 @@ def parse_court_blue(driver, address,court_name,fullname,set_status):
         logger.info(f"[parse_court_blue] Проверка уголовных дел (подсудимый)")
         set_status(f"Проверка уголовных дел (подсудимый) : {name_to_check}",court_name)
         first_button[0].click()
-        time.sleep(0.1)
         verify_page(driver)
-        ugolov_defendant_table = parse_category(driver,name_to_check,"U1_DEFENDANT__NAMESS")
+        ugolov_defendant_table = parse_and_save("U1_DEFENDANT__NAMESS")
         verify_page(driver)
 
         #Если дела найдены, то нажимается кнопка Новый Поиск
         
         new_search_button = driver.find_elements(By.CLASS_NAME,"new-search")
         if(new_search_button):
-            new_search_button[0].click()
+            click_and_wait(driver, new_search_button[0], "blue_search")
 
         #Очистка после проверки
         logger.info(f"[parse_court_blue] Очистка после провери уголовных дел (подсудимый)")
@@ -253,7 +338,7 @@ def parse_court_blue(driver, address,court_name,fullname,set_status):
         #status_manager.update_status(task_id,f"Проверка уголовных дел (участник)",name_to_check)
         set_status(f"Проверка уголовных дел (участник) по ФИО: {name_to_check}",court_name)
         verify_page(driver)
-        ugolov_parts_table = parse_category(driver,name_to_check,"U1_PARTS__NAMESS")
+        ugolov_parts_table = parse_and_save("U1_PARTS__NAMESS")
         verify_page(driver)
         logger.success(f"[parse_court_blue] Проверка уголовных дел (участник) завершена")
 
@@ -263,7 +348,7 @@ def parse_court_blue(driver, address,court_name,fullname,set_status):
         second_button = driver.find_elements(By.ID,"type_1")
         second_button[0].click()
         verify_page(driver)
-        adm_and_cit_table = parse_category(driver,name_to_check,"G1_PARTS__NAMESS")
+        adm_and_cit_table = parse_and_save("G1_PARTS__NAMESS")
         verify_page(driver)
         logger.success(f"[parse_court_blue] Проверка административыных и гражданских дел завершена")
 
@@ -274,7 +359,7 @@ def parse_court_blue(driver, address,court_name,fullname,set_status):
         third_button = driver.find_elements(By.ID,"type_2")
         third_button[0].click()
         verify_page(driver)
-        adm_cases_table = parse_category(driver,name_to_check,"adm_parts__NAMESS")
+        adm_cases_table = parse_and_save("adm_parts__NAMESS")
         verify_page(driver)
         logger.success(f"[parse_court_blue] Проверка административыных правонарушений завершена")
 
@@ -285,7 +370,7 @@ def parse_court_blue(driver, address,court_name,fullname,set_status):
         fourth_button = driver.find_elements(By.ID,"type_3")
         fourth_button[0].click()
         verify_page(driver)
-        proizv_table = parse_category(driver,name_to_check,"M_PARTS__NAMESS")
+        proizv_table = parse_and_save("M_PARTS__NAMESS")
         verify_page(driver)
         logger.success(f"[parse_court_blue] Проверка производств по делам завершена")
 
@@ -293,16 +378,86 @@ def parse_court_blue(driver, address,court_name,fullname,set_status):
         if court_name not in court_results:
             court_results[court_name] = {}
         court_results[court_name][name_to_check] = {
-            "Уголовные дела (Лицо, участвующее в деле)": ugolov_parts_table,
-            "Уголовные дела (Подсудимый (осужденный))": ugolov_defendant_table,
-            "Административные и гражданские дела": adm_and_cit_table,
-            "Дела об административных правонарушениях": adm_cases_table,
-            "Производство по делам": proizv_table
+            BLUE_CATEGORIES["U1_PARTS__NAMESS"]: ugolov_parts_table,
+            BLUE_CATEGORIES["U1_DEFENDANT__NAMESS"]: ugolov_defendant_table,
+            BLUE_CATEGORIES["G1_PARTS__NAMESS"]: adm_and_cit_table,
+            BLUE_CATEGORIES["adm_parts__NAMESS"]: adm_cases_table,
+            BLUE_CATEGORIES["M_PARTS__NAMESS"]: proizv_table
         }
         logger.success(f"[parse_court_blue] Таблица готова.")
         set_status(f"Проверка по ФИО {name_to_check} завершена",court_name)
     return court_results
 
+def start_category_search(driver, search_url, category, name_to_check):
+    logger.info(f"[start_category_search] Запуск поиска в категории {category}.")
+    navigate(driver, search_url, "blue_search")
+    verify_page(driver)
+    WebDriverWait(driver, 10).until(lambda d: d.find_elements(By.CLASS_NAME, "bookmarks"))
+    driver.find_element(By.ID, BLUE_CATEGORY_TABS[category]).click()
+    verify_page(driver)
+    category_input = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, category)))
+    fill_input(driver, category_input, name_to_check, "blue", category)
+    search_button = driver.find_element(By.CLASS_NAME, "search")
+    # Клик через setTimeout, чтобы не ждать ответа сервера и сразу перейти к следующей вкладке
+    driver.execute_script("setTimeout(() => arguments[0].click(), 0);", search_button)
+
+def harvest_category(driver, known=None):
+    # Результат поиска или капча — вкладка могла ещё не дождаться ответа сервера
+    wait_for(driver, lambda d: d.find_elements(By.CLASS_NAME, "case-count") or d.find_elements(By.CLASS_NAME, "search-error") or d.find_elements(By.ID, "kcaptchaForm"),
+             "search", 120)
+    verify_page(driver)
+    pages_count = extract_total_pages(get_element_html(driver, "ul.paging") or "")
+    return get_all_cases(driver, pages_count, known)
+
+def parse_court_blue_tabs(driver, address, court_name, fullname, set_status, checkpoint=None):
+    """
+    Вариант parse_court_blue, в котором каждая категория ищется в своей вкладке
+    той же сессии браузера: сначала запускаются все поиски, затем собираются результаты.
+    """
+    checkpoint = checkpoint or Checkpoint()
+    court_results = {}
+    names = make_name_initials(fullname)
+    logger.info(f"[parse_court_blue_tabs] Начало проверки.")
+    navigate(driver, address, "court_home")
+    verify_page(driver)
+    search_page = driver.find_elements(By.CLASS_NAME, "menu-link")
+    if not search_page:
+        logger.error("Не найден элемент search_page")
+        raise RuntimeError(f"Ошибка при работе с судом: {address}")
+    click_and_wait(driver, search_page[0], "blue_search")
+    verify_page(driver)
+    search_url = driver.current_url
+
+    main_handle = driver.current_window_handle
+    tabs = {}
+    try:
+        for category in BLUE_CATEGORIES:
+            tabs[category] = main_handle if not tabs else open_tab(driver)
+        for name_to_check in names:
+            set_status(f"Начало проверки по ФИО : {name_to_check}", court_name)
+            tables = {}
+            for category in BLUE_CATEGORIES:
+                cached = checkpoint.get(court_name, name_to_check, BLUE_CATEGORIES[category])
+                if cached is not None:
+                    tables[BLUE_CATEGORIES[category]] = cached
+            pending = {category: handle for category, handle in tabs.items() if BLUE_CATEGORIES[category] not in tables}
+            for category, handle in pending.items():
+                driver.switch_to.window(handle)
+                start_category_search(driver, search_url, category, name_to_check)
+            for category, handle in pending.items():
+                logger.info(f"[parse_court_blue_tabs] Сбор результатов категории {BLUE_CATEGORIES[category]}")
+                set_status(f"Проверка категории {BLUE_CATEGORIES[category]} по ФИО: {name_to_check}", court_name)
+                driver.switch_to.window(handle)
+                tables[BLUE_CATEGORIES[category]] = harvest_category(driver, checkpoint.known(court_name, name_to_check, BLUE_CATEGORIES[category]))
+                checkpoint.save(court_name, name_to_check, BLUE_CATEGORIES[category], result=tables[BLUE_CATEGORIES[category]])
+            tables = {category_name: tables[category_name] for category_name in BLUE_CATEGORIES.values()}
+            court_results.setdefault(court_name, {})[name_to_check] = tables
+            logger.success(f"[parse_court_blue_tabs] Проверка по ФИО {name_to_check} завершена")
+            set_status(f"Проверка по ФИО {name_to_check} завершена", court_name)
+    finally:
+        close_tabs(driver, list(tabs.values()), main_handle)
+    return court_results
+
 
 if __name__ == "__main__":
     import json
@@ -0,0 +1,94 @@
+from app.captcha.ocr_model_blue_integration import predict_captcha_from_bytes
+from app.parsers.courts.blue import BLUE_CATEGORIES, BLUE_CATEGORY_TABS, extract_total_pages, update_page_number
+from app.parsers.courts.records import result_accumulator
+from app.parsers.courts.async_utils import verify_page_async, predict_async, captcha_image_bytes_async
+from app.parsers.courts.utils import make_name_initials
+from app.services.async_browser import set_status_async
+from app.services.checkpoints import Checkpoint
+from app.utils.logger import logger
+
+MAX_CAPTCHA_TRIES = 5
+
+async def pass_captcha_async(page):
+    tries = 0
+    while await page.exists("#kcaptchaForm"):
+        if tries >= MAX_CAPTCHA_TRIES:
+            raise RuntimeError("Капча не пройдена")
+        tries += 1
+        logger.info(f"[pass_captcha_async] Требуется капча, попытка {tries}/{MAX_CAPTCHA_TRIES}")
+        png_data = await captcha_image_bytes_async(page, 'img[src="/captcha.php"]')
+        captcha_text = await predict_async(predict_captcha_from_bytes, png_data)
+        await page.fill('input[name="captcha-response"]', captcha_text)
+        await page.click(".button-normal", navigate=True)
+        await verify_page_async(page)
+
+async def verify_and_pass_captcha(page):
+    await verify_page_async(page)
+    await pass_captcha_async(page)
+
+async def open_search_page(page, address):
+    logger.info(f"[open_search_page] Открытие главной страницы: {address}")
+    await page.get(address)
+    await verify_and_pass_captcha(page)
+    if not await page.exists(".menu-link"):
+        logger.error("[open_search_page] Не найден элемент search_page")
+        raise RuntimeError(f"Ошибка при работе с судом: {address}")
+    await page.click(".menu-link", navigate=True)
+    await verify_and_pass_captcha(page)
+    await page.wait_for("!!document.querySelector('.bookmarks')", timeout=10)
+    return await page.url()
+
+async def get_all_cases_async(page, known=None):
+    logger.info(f"[get_all_cases_async] Парсинг результата.")
+    await page.wait_for("!!(document.querySelector('.case-count') || document.querySelector('.search-error'))", timeout=120)
+    if await page.exists(".search-error"):
+        return "<div class='placeholder'>Дела не найдены</div>"
+    pages_count = extract_total_pages(await page.html())
+    first_url = await page.url()
+    tables = result_accumulator(known=known)
+    for page_number in range(pages_count):
+        page_url = update_page_number(first_url, page_number)
+        if page_url != await page.url():
+            await page.get(page_url)
+            await verify_and_pass_captcha(page)
+        table = await page.outer_html("table#tablcont")
+        tables.add(table or "<div class='placeholder'>Нет данных</div>")
+        if tables.caught_up:
+            logger.info(f"[get_all_cases_async] Страница {page_number + 1} из {pages_count} состоит из известных дел, остальные не загружаются.")
+            break
+    return tables.result()
+
+async def parse_category_async(page, search_url, category, name_to_check, known=None):
+    logger.info(f"[parse_category_async] Парсинг категории {category}.")
+    await page.get(search_url)
+    await verify_and_pass_captcha(page)
+    await page.click(f"#{BLUE_CATEGORY_TABS[category]}")
+    await page.wait_for(f"!!document.querySelector('[name=\"{category}\"]')", timeout=10)
+    await page.fill(f'[name="{category}"]', name_to_check)
+    await page.click(".search", navigate=True)
+    await verify_and_pass_captcha(page)
+    return await get_all_cases_async(page, known)
+
+async def parse_court_blue_async(page, address, court_name, fullname, set_status, checkpoint=None):
+    """Асинхронный аналог parse_court_blue для AsyncBrowserRuntime"""
+    checkpoint = checkpoint or Checkpoint()
+    court_results = {}
+    names = make_name_initials(fullname)
+    logger.info(f"[parse_court_blue_async] Начало проверки.")
+    search_url = await open_search_page(page, address)
+    for name_to_check in names:
+        await set_status_async(set_status, f"Начало проверки по ФИО : {name_to_check}", court_name)
+        tables = {}
+        for category, category_name in BLUE_CATEGORIES.items():
+            cached = checkpoint.get(court_name, name_to_check, category_name)
+            if cached is not None:
+                tables[category_name] = cached
+                continue
+            await set_status_async(set_status, f"Проверка категории {category_name} по ФИО: {name_to_check}", court_name)
+            known = checkpoint.known(court_name, name_to_check, category_name)
+            tables[category_name] = await parse_category_async(page, search_url, category, name_to_check, known)
+            checkpoint.save(court_name, name_to_check, category_name, result=tables[category_name])
+        court_results.setdefault(court_name, {})[name_to_check] = tables
+        logger.success(f"[parse_court_blue_async] Проверка по ФИО {name_to_check} завершена")
+        await set_status_async(set_status, f"Проверка по ФИО {name_to_check} завершена", court_name)
+    return court_results
@@ -0,0 +1,200 @@
+import requests
+from itertools import chain
+from bs4 import BeautifulSoup
+from urllib.parse import urljoin, urlencode, urlparse
+
+from app.captcha.ocr_model_blue_integration import predict_captcha_from_bytes
+from app.parsers.courts.blue import BLUE_CATEGORIES, extract_total_pages, update_page_number
+from app.parsers.courts.records import result_accumulator
+from app.parsers.courts.utils import make_name_initials
+from app.services.checkpoints import Checkpoint
+from app.services.http_client import make_session, decode_response, fetch_pages
+from app.services.host_governor import host_slot, report_status
+from app.metrics.redis_client import incr_worker_counter
+from app.config.settings import settings
+from app.utils.logger import logger
+
+MAX_CAPTCHA_TRIES = 5
+
+class BlueHttpUnsupported(Exception):
+    """HTTP-движок встретил страницу, которую не умеет обработать — нужна проверка через Selenium"""
+
+
+class BlueHttpClient:
+    """Проверка суда msudrf через HTTP-запросы, без браузера"""
+    def __init__(self, address, session=None):
+        self.address = address
+        self.session = session or make_session()
+        self.search_url = None
+        self.encoding = "utf-8"
+
+    def get(self, url, params=None):
+        with host_slot(url):
+            response = self.session.get(url, params=params, timeout=settings.BLUE_HTTP_TIMEOUT)
+        return self._check_response(response)
+
+    def submit(self, form, page_url, fields):
+        action = urljoin(page_url, form.get("action") or page_url)
+        method = (form.get("method") or "get").lower()
+        charset = self._form_charset(form)
+        body = urlencode(fields, encoding=charset, errors="replace")
+        with host_slot(action):
+            response = self._send_form(method, action, body, page_url)
+        return self._check_response(response)
+
+    def _send_form(self, method, action, body, page_url):
+        if method == "post":
+            return self.session.post(action, data=body, timeout=settings.BLUE_HTTP_TIMEOUT,
+                                     headers={"Content-Type": "application/x-www-form-urlencoded", "Referer": page_url})
+        # Параметры из action заменяются полями формы, как это делает браузер
+        parts = urlparse(action)
+        return self.session.get(parts._replace(query=body).geturl(), timeout=settings.BLUE_HTTP_TIMEOUT,
+                                headers={"Referer": page_url})
+
+    def open_search_page(self):
+        if self.search_url:
+            return self.get(self.search_url)
+        logger.info(f"[BlueHttpClient] Открытие главной страницы: {self.address}")
+        response, soup = self.get(self.address)
+        menu_link = soup.select_one("a.menu-link[href]")
+        if menu_link is None:
+            raise BlueHttpUnsupported("Не найдена ссылка на страницу поиска (menu-link)")
+        self.search_url = urljoin(response.url, menu_link["href"])
+        logger.info(f"[BlueHttpClient] Страница поиска: {self.search_url}")
+        return self.get(self.search_url)
+
+    def search(self, category, name):
+        response, soup = self.open_search_page()
+        response, soup = self.pass_captcha(response, soup)
+        field = soup.find(attrs={"name": category})
+        form = field.find_parent("form") if field else None
+        if form is None:
+            raise BlueHttpUnsupported(f"Не найдена форма поиска для категории {category}")
+        fields = [(key, value) for key, value in form_fields(form) if key != category]
+        fields.append((category, name))
+        search_button = form.select_one(".search[name]")
+        if search_button is not None:
+            fields.append((search_button["name"], search_button.get("value", "")))
+        response, soup = self.submit(form, response.url, fields)
+        return self.pass_captcha(response, soup)
+
+    def pass_captcha(self, response, soup):
+        tries = 0
+        while soup.find(id="kcaptchaForm"):
+            if tries >= MAX_CAPTCHA_TRIES:
+                raise BlueHttpUnsupported("Капча не пройдена")
+            tries += 1
+            logger.info(f"[BlueHttpClient] Требуется капча, попытка {tries}/{MAX_CAPTCHA_TRIES}")
+            form = soup.find(id="kcaptchaForm")
+            if form.name != "form":
+                form = form.find("form") or form.find_parent("form")
+            image = soup.select_one('img[src*="captcha.php"]')
+            if form is None or image is None:
+                raise BlueHttpUnsupported("Не найдена форма или изображение капчи")
+            image_url = urljoin(response.url, image["src"])
+            with host_slot(image_url):
+                image_bytes = self.session.get(image_url, timeout=settings.BLUE_HTTP_TIMEOUT).content
+            captcha_text = predict_captcha_from_bytes(image_bytes)
+            fields = [(key, value) for key, value in form_fields(form) if key != "captcha-response"]
+            fields.append(("captcha-response", captcha_text))
+            response, soup = self.submit(form, response.url, fields)
+        return response, soup
+
+    def get_all_cases(self, response, soup, known=None):
+        if soup.find(class_="search-error"):
+            return "<div class='placeholder'>Дела не найдены</div>"
+        if not soup.find(class_="case-count") and not soup.find("table", id="tablcont"):
+            raise BlueHttpUnsupported("На странице нет ни таблицы дел, ни сообщения об их отсутствии")
+        pages_count = extract_total_pages(str(soup))
+        tables = result_accumulator(known=known)
+        page_urls = [update_page_number(response.url, page_number) for page_number in range(pages_count)]
+        # Остальные страницы загружаются пачками (fetch_pages), капча (если попалась) проходится уже по порядку
+        if page_urls[0] == response.url:
+            pages = chain([(response, soup)], fetch_pages(page_urls[1:], self.get))
+        else:
+            pages = fetch_pages(page_urls, self.get)
+        for page_number, (page_url, page) in enumerate(zip(page_urls, pages)):
+            if page is None:
+                page = self.get(page_url)
+            _, page_soup = self.pass_captcha(*page)
+            table = page_soup.find("table", id="tablcont")
+            if table is None:
+                raise BlueHttpUnsupported(f"Не найдена таблица дел на странице {page_number}")
+            tables.add(str(table))
+            if tables.caught_up:
+                logger.info(f"[BlueHttpClient] Страница {page_number + 1} из {pages_count} состоит из известных дел, остальные не загружаются.")
+                break
+        return tables.result()
+
+    def _check_response(self, response):
+        report_status(response.url, response.status_code)
+        if response.status_code >= 500:
+            raise BlueHttpUnsupported(f"Сайт вернул ошибку {response.status_code}")
+        html = decode_response(response)
+        self.encoding = response.encoding or "utf-8"
+        if "Информация временно недоступна" in html:
+            raise BlueHttpUnsupported("Информация временно недоступна")
+        return response, BeautifulSoup(html, "html.parser")
+
+    def _form_charset(self, form):
+        # Браузер кодирует поля формы в кодировке страницы, если не указан accept-charset
+        charset = (form.get("accept-charset") or "").split()
+        return charset[0] if charset else self.encoding
+
+
+def form_fields(form):
+    """Поля формы в том виде, в котором их отправил бы браузер (без нажатых кнопок)"""
+    fields = []
+    for element in form.find_all(["input", "select", "textarea"]):
+        name = element.get("name")
+        if not name or element.has_attr("disabled"):
+            continue
+        if element.name == "input":
+            input_type = (element.get("type") or "text").lower()
+            if input_type in ("submit", "button", "image", "reset", "file"):
+                continue
+            if input_type in ("checkbox", "radio"):
+                if element.has_attr("checked"):
+                    fields.append((name, element.get("value", "on")))
+                continue
+            fields.append((name, element.get("value", "")))
+        elif element.name == "select":
+            options = element.find_all("option")
+            selected = [option for option in options if option.has_attr("selected")] or options[:1]
+            for option in selected:
+                fields.append((name, option.get("value", option.text)))
+        else:
+            fields.append((name, element.text))
+    return fields
+
+def parse_court_blue_http(address, court_name, fullname, set_status, checkpoint=None):
+    """
+    Аналог parse_court_blue без браузера. При любой непредвиденной странице
+    выбрасывает BlueHttpUnsupported, чтобы вызывающий код переключился на Selenium.
+    """
+    checkpoint = checkpoint or Checkpoint()
+    court_results = {}
+    names = make_name_initials(fullname)
+    client = BlueHttpClient(address)
+    logger.info(f"[parse_court_blue_http] Начало проверки.")
+    incr_worker_counter("blue_http_checks_total")
+    for name_to_check in names:
+        set_status(f"Начало проверки по ФИО : {name_to_check}", court_name)
+        tables = {}
+        for category, category_name in BLUE_CATEGORIES.items():
+            cached = checkpoint.get(court_name, name_to_check, category_name)
+            if cached is not None:
+                tables[category_name] = cached
+                continue
+            logger.info(f"[parse_court_blue_http] Проверка категории {category_name}")
+            set_status(f"Проверка категории {category_name} по ФИО: {name_to_check}", court_name)
+            try:
+                response, soup = client.search(category, name_to_check)
+                tables[category_name] = client.get_all_cases(response, soup, checkpoint.known(court_name, name_to_check, category_name))
+            except requests.RequestException as e:
+                raise BlueHttpUnsupported(f"Ошибка HTTP-запроса: {e}") from e
+            checkpoint.save(court_name, name_to_check, category_name, result=tables[category_name])
+        court_results.setdefault(court_name, {})[name_to_check] = tables
+        logger.success(f"[parse_court_blue_http] Проверка по ФИО {name_to_check} завершена")
+        set_status(f"Проверка по ФИО {name_to_check} завершена", court_name)
+    return court_results
@@ -1,42 +1,142 @@
 import time
-import shutil
+import asyncio
 
-from app.services.browser import create_driver
-from app.parsers.courts.blue import parse_court_blue
+from app.services.browser import lease_driver
+from app.services.async_browser import AsyncFlowUnsupported, get_async_runtime
+from app.parsers.courts.blue import parse_court_blue, parse_court_blue_tabs
+from app.parsers.courts.blue_http import parse_court_blue_http, BlueHttpUnsupported
+from app.parsers.courts.blue_async import parse_court_blue_async
 from app.parsers.courts.yellow import parse_court_yellow
-from app.parsers.courts.utils import get_court_info
+from app.parsers.courts.yellow_async import parse_court_yellow_async
+from app.parsers.courts.utils import get_court_info, get_court_info_http
+from app.parsers.courts.async_utils import get_court_info_async
 from app.parsers.courts.spb import parse_court_spb
+from app.parsers.courts.spb_async import parse_court_spb_async, SPB_SEARCH_URL, SPB_COURT_NAME
+from app.services.checkpoints import Checkpoint
+from app.services.circuit_breaker import CourtUnavailable, ensure_available
 from app.utils.logger import logger
-from app.schemas.schemas import PersonInitials 
+from app.schemas.schemas import PersonInitials
 from app.config.settings import settings
-from app.metrics.redis_client import set_court_last_check_time
+from app.metrics.redis_client import set_court_last_check_time, incr_worker_counter
 
-def parse_courts(address,fullname,set_status,headless=settings.HEADLESS):
+ASYNC_PARSERS = {
+    "blue": parse_court_blue_async,
+    "yellow": parse_court_yellow_async,
+    "spb": parse_court_spb_async,
+}
+
+def try_blue_http(address, court_name, fullname, set_status, checkpoint):
+    """Проверка blue-суда без браузера. None — нужно переключиться на браузерный движок"""
+    if settings.BLUE_ENGINE != "http":
+        return None
+    try:
+        return parse_court_blue_http(address, court_name, fullname, set_status, checkpoint)
+    except BlueHttpUnsupported as e:
+        logger.warning(f"[try_blue_http] [{address}] HTTP-движок не справился ({e}), проверка через браузер")
+        incr_worker_counter("blue_http_fallback_total")
+        return None
+
+async def check_court_async(page, address, fullname, set_status, checkpoint):
+    court_info = await get_court_info_async(page, address)
+    court_type = court_info.type
+    logger.info(f"[check_court_async] [{address}] Тип суда: {court_type}")
+    if court_type not in settings.ASYNC_COURT_TYPES:
+        raise AsyncFlowUnsupported(f"Тип суда {court_type} проверяется синхронно")
+    start_time = time.monotonic()
+    result = None
+    if court_type == "blue":
+        result = await asyncio.to_thread(try_blue_http, address, court_info.name, fullname, set_status, checkpoint)
+    if result is None:
+        result = await ASYNC_PARSERS[court_type](page, address, court_info.name, fullname, set_status, checkpoint)
+    set_court_last_check_time(court_type, time.monotonic() - start_time)
+    return result
+
+def parse_courts_async(address, fullname, set_status, checkpoint):
+    """Проверка через асинхронный движок. None — сайт нужно проверить синхронными парсерами"""
+    try:
+        return get_async_runtime().run(check_court_async, address, fullname, set_status, checkpoint)
+    except AsyncFlowUnsupported as e:
+        logger.info(f"[parse_courts_async] [{address}] {e}")
+        incr_worker_counter("async_flow_fallback_total")
+        return None
+
+def unavailable_result(address, error, set_status):
+    logger.warning(f"[parse_courts] [{address}] {error}")
+    set_status(str(error), address)
+    return {f"Сайт {address}": {"__error__": str(error)}}
+
+def parse_courts(address,fullname,set_status,checkpoint=None):
+    """
+    Проверка одного суда. checkpoint — сохранённый прогресс задачи (Checkpoint): готовые
+    категории берутся из него, новые сохраняются туда по мере готовности.
+    Если выключатель сайта разомкнут (CourtUnavailable), проверка сразу завершается с ошибкой в результате
+    """
+    checkpoint = checkpoint or Checkpoint()
     if isinstance(fullname, dict):
         fullname = PersonInitials(**fullname)
-    driver = create_driver("eager", headless)
     try:
-        court_info = get_court_info(address,driver)
-        court_type = court_info.type
-        logger.info(f"[parse_courts] [{address}] Тип суда: {court_type}")
-        start_time = time.monotonic()
-        if court_type == "blue":
-            result = parse_court_blue(driver, address,court_info.name, fullname,set_status)
-            set_court_last_check_time(court_type, time.monotonic() - start_time)
-            return result
-        elif court_type == "yellow":
-            result = parse_court_yellow(driver, address,court_info.name, fullname,set_status)
-            set_court_last_check_time(court_type, time.monotonic() - start_time)
-            return result
-        elif court_type == "spb":
-            result = parse_court_spb(driver,"https://mirsud.spb.ru/cases/?type=civil&id=&full_name=","Мировые судьи Санкт-Петербурга",fullname,set_status)
-            set_court_last_check_time(court_type, time.monotonic() - start_time)
+        result = check_court(address, fullname, set_status, checkpoint)
+        # Парсеры перехватывают ошибки отдельных запросов сами: если выключатель разомкнулся во время проверки,
+        # результат неполный
+        ensure_available(address)
+        return result
+    except CourtUnavailable as e:
+        return unavailable_result(address, e, set_status)
+
+def check_court(address, fullname, set_status, checkpoint):
+    ensure_available(address)
+    if settings.ASYNC_COURT_TYPES:
+        try:
+            result = parse_courts_async(address, fullname, set_status, checkpoint)
+        except CourtUnavailable:
+            raise
+        except Exception as e:
+            logger.exception(f"[PROCESS ERROR] {address}: {e}")
+            raise RuntimeError(f"Ошибка выполнения проверки: {e}")
+        if result is not None:
             return result
-        else:
-            return {f"Сайт {address}": {"__error__": "Сайт не поддерживается"}}
+    # HTTP-движок blue работает без браузера: драйвер берётся, только если он не справился
+    court_info = None
+    try:
+        if settings.BLUE_ENGINE == "http":
+            court_info = get_court_info_http(address)
+        if court_info is not None and court_info.type == "blue":
+            start_time = time.monotonic()
+            result = try_blue_http(address, court_info.name, fullname, set_status, checkpoint)
+            if result is not None:
+                set_court_last_check_time(court_info.type, time.monotonic() - start_time)
+                return result
+    except CourtUnavailable:
+        raise
     except Exception as e:
         logger.exception(f"[PROCESS ERROR] {address}: {e}")
-        raise RuntimeError(f"Ошибка выполнения проверки: {e}")  # <-- raise, не return!
-    finally:
-        driver.quit()
-        logger.debug(f"[DRIVER] Завершение драйвера для {address}")
\ No newline at end of file
+        raise RuntimeError(f"Ошибка выполнения проверки: {e}")
+    with lease_driver() as driver:
+        try:
+            if court_info is None:
+                court_info = get_court_info(address,driver)
+            court_type = court_info.type
+            logger.info(f"[parse_courts] [{address}] Тип суда: {court_type}")
+            start_time = time.monotonic()
+            if court_type == "blue":
+                blue_parser = parse_court_blue_tabs if settings.BLUE_PARALLEL_TABS else parse_court_blue
+                result = blue_parser(driver, address,court_info.name, fullname,set_status,checkpoint)
+                set_court_last_check_time(court_type, time.monotonic() - start_time)
+                return result
+            elif court_type == "yellow":
+                result = parse_court_yellow(driver, address,court_info.name, fullname,set_status,checkpoint)
+                set_court_last_check_time(court_type, time.monotonic() - start_time)
+                return result
+            elif court_type == "spb":
+                result = parse_court_spb(driver,SPB_SEARCH_URL,SPB_COURT_NAME,fullname,set_status,checkpoint)
+                set_court_last_check_time(court_type, time.monotonic() - start_time)
+                return result
+            else:
+                return {f"Сайт {address}": {"__error__": "Сайт не поддерживается"}}
+        except CourtUnavailable:
+            raise
+        except Exception as e:
+            logger.exception(f"[PROCESS ERROR] {address}: {e}")
+            raise RuntimeError(f"Ошибка выполнения проверки: {e}")  # <-- raise, не return!
+        finally:
+            logger.debug(f"[DRIVER] Возврат драйвера для {address}")
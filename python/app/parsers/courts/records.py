@@ -0,0 +1,235 @@
+import re
+from html import escape
+from typing import NamedTuple, Optional
+
+from app.parsers.courts.tables import TableAccumulator, clean_element, parse_table, NO_DATA
+from app.metrics.redis_client import incr_worker_counter
+from app.config.settings import settings
+
+class CaseRecord(NamedTuple):
+    """
+    Дело из таблицы результатов. В JSON записывается списком значений, без имён полей.
+    extra — непустые ячейки колонок, которые не попали в поля: {заголовок: значение}
+    """
+    number: str
+    date: str
+    parties: str
+    judge: str
+    status: str
+    link: Optional[str]
+    extra: Optional[dict] = None
+
+CASE_FIELDS = list(CaseRecord._fields)
+
+# Заголовки колонок для вывода записей таблицей
+CASE_FIELD_TITLES = {
+    "number": "Номер дела",
+    "date": "Дата поступления",
+    "parties": "Стороны",
+    "judge": "Судья",
+    "status": "Решение",
+}
+
+# Признаки колонок в заголовках таблиц судов: поле -> подстроки заголовка (в нижнем регистре).
+# Берётся первая подходящая колонка, поэтому "дата поступления" раньше прочих дат.
+HEADER_KEYWORDS = {
+    "number": ("номер дела", "№ дела", "номер"),
+    "date": ("дата поступления", "дата регистрации", "дата"),
+    "parties": ("сторон", "информация по делу", "участник", "лицо"),
+    "judge": ("судья",),
+    "status": ("решение", "результат", "статус", "состояние"),
+}
+
+DATE_RE = re.compile(r"(\d{2})\.(\d{2})\.(\d{4})")
+
+def is_records(value):
+    return isinstance(value, dict) and "columns" in value and "rows" in value
+
+def cell_text(cell):
+    return " ".join(" ".join(cell.itertext()).split())
+
+def map_columns(headers):
+    """Номера колонок таблицы для полей CaseRecord по тексту заголовков"""
+    lowered = [header.lower().replace("\xa0", " ") for header in headers]
+    columns = {}
+    for field, keywords in HEADER_KEYWORDS.items():
+        for keyword in keywords:
+            index = next((i for i, header in enumerate(lowered) if keyword in header and i not in columns.values()), None)
+            if index is not None:
+                columns[field] = index
+                break
+    return columns
+
+def own_rows(table):
+    """Строки таблицы без строк вложенных таблиц"""
+    for row in table.iter("tr"):
+        if next(row.iterancestors("table"), None) is table:
+            yield row
+
+def unique_headers(headers):
+    """Заголовки таблицы для extra: пустые и повторяющиеся получают номер колонки"""
+    result = []
+    for index, header in enumerate(headers):
+        header = header or f"Колонка {index + 1}"
+        if header in result:
+            header = f"{header} ({index + 1})"
+        result.append(header)
+    return result
+
+def row_to_record(cells, columns, headers=()):
+    def value(field):
+        index = columns.get(field)
+        return cell_text(cells[index]) if index is not None and index < len(cells) else ""
+    link = None
+    number_index = columns.get("number", 0)
+    search = [cells[number_index]] if number_index < len(cells) else []
+    for cell in search + cells:
+        anchor = next(cell.iter("a"), None)
+        if anchor is not None and anchor.get("href"):
+            link = anchor.get("href")
+            break
+    mapped = set(columns.values())
+    extra = {}
+    for index, cell in enumerate(cells):
+        text = cell_text(cell)
+        if index not in mapped and text:
+            extra[headers[index] if index < len(headers) else f"Колонка {index + 1}"] = text
+    return CaseRecord(value("number"), value("date"), value("parties"), value("judge"), value("status"), link, extra or None)
+
+def record_key(record):
+    """Дело определяется номером, строки без номера — всеми полями, кроме extra"""
+    return record.number or tuple(record[:6])
+
+def newest_date(records):
+    """Самая поздняя дата поступления среди записей (дд.мм.гггг) или None"""
+    dates = [match.groups() for match in (DATE_RE.search(record.date or "") for record in records) if match]
+    if not dates:
+        return None
+    day, month, year = max(dates, key=lambda date: (date[2], date[1], date[0]))
+    return f"{day}.{month}.{year}"
+
+
+class KnownCases:
+    """
+    Дела единицы проверки, найденные прошлыми проверками. Накопитель записей объединяет
+    с ними новые строки и отмечает, что пагинация дошла до уже известных дел.
+    """
+    def __init__(self, rows, titles=None, extra=None):
+        self.rows = [CaseRecord(*row) for row in rows]
+        self.titles = titles or {}
+        self.extra = extra or []
+        self.keys = {record_key(record) for record in self.rows}
+        self.date_from = newest_date(self.rows)
+
+    def empty_result(self, placeholder):
+        """Поиск с даты последнего известного дела ничего не нашёл — результат прежний, с заголовками сайта"""
+        if self.date_from is None:
+            return placeholder
+        return {"columns": CASE_FIELDS, "rows": self.rows, "titles": self.titles, "extra": self.extra}
+
+
+class RecordAccumulator:
+    """
+    Собирает записи CaseRecord со страниц результатов, интерфейс как у TableAccumulator.
+    Колонки определяются по заголовку первой страницы, HTML страниц не хранится.
+    Результат — {"columns": [...], "rows": [[...], ...], "titles": {поле: заголовок сайта}, "extra": [заголовки
+    остальных колонок]} или заглушка, если таблицы не было.
+    С known новые строки объединяются с известными делами, а caught_up становится True,
+    когда очередная страница целиком состоит из известных дел.
+    """
+    def __init__(self, table_class=None, clean=False, known=None):
+        self.table_class = table_class
+        self.clean = clean
+        self.known = known
+        self.columns = None
+        self.headers = []
+        self.rows = []
+        self.placeholder = None
+        self.caught_up = False
+
+    def add(self, html):
+        table = parse_table(html, self.table_class)
+        if table is None:
+            if self.columns is None and self.placeholder is None:
+                self.placeholder = html
+            return
+        if self.clean:
+            clean_element(table)
+        page_start = len(self.rows)
+        for row in own_rows(table):
+            cells = [cell for cell in row if cell.tag in ("td", "th")]
+            if not cells:
+                continue
+            if any(cell.tag == "th" for cell in cells):
+                if self.columns is None:
+                    headers = [cell_text(cell) for cell in cells]
+                    self.columns = map_columns(headers)
+                    self.headers = unique_headers(headers)
+                continue
+            if self.columns is None:
+                self.columns = {"number": 0}
+            self.rows.append(row_to_record(cells, self.columns, self.headers))
+        page = self.rows[page_start:]
+        if self.known is not None and page and all(record_key(record) in self.known.keys for record in page):
+            self.caught_up = True
+
+    def result(self):
+        if self.columns is None:
+            return self.placeholder or NO_DATA
+        incr_worker_counter("case_records_total", len(self.rows))
+        rows = self.rows
+        if self.known is not None:
+            seen = {record_key(record) for record in rows}
+            rows = rows + [record for record in self.known.rows if record_key(record) not in seen]
+            incr_worker_counter("case_records_known_total", len(rows) - len(self.rows))
+        titles = {field: self.headers[index] for field, index in self.columns.items() if index < len(self.headers)}
+        mapped = set(self.columns.values())
+        extra = [header for index, header in enumerate(self.headers) if index not in mapped]
+        return {"columns": CASE_FIELDS, "rows": rows, "titles": titles, "extra": extra}
+
+
+def result_accumulator(table_class=None, header_row=False, clean=False, known=None):
+    """
+    Накопитель результатов по settings.RESULT_FORMAT: records — CaseRecord, html — объединённая таблица.
+    known (KnownCases) учитывается только для records.
+    """
+    if settings.RESULT_FORMAT == "records":
+        return RecordAccumulator(table_class=table_class, clean=clean, known=known)
+    return TableAccumulator(table_class=table_class, header_row=header_row, clean=clean)
+
+def render_records(records):
+    """
+    HTML-таблица для записей (для клиентов, которым нужен прежний формат): колонки полей,
+    затем колонки extra в порядке появления
+    """
+    columns = records["columns"]
+    shown = [column for column in columns if column in CASE_FIELD_TITLES]
+    titles = {**CASE_FIELD_TITLES, **records.get("titles", {})}
+    rows = [dict(zip(columns, row)) for row in records["rows"]]
+    extra_titles = list(dict.fromkeys(records.get("extra", []) + [title for record in rows for title in (record.get("extra") or {})]))
+    parts = ["<table><tbody><tr>"]
+    parts.extend(f"<th>{escape(titles[column], quote=False)}</th>" for column in shown)
+    parts.extend(f"<th>{escape(title, quote=False)}</th>" for title in extra_titles)
+    parts.append("</tr>")
+    for record in rows:
+        parts.append("<tr>")
+        for column in shown:
+            value = escape(record.get(column) or "", quote=False)
+            if column == "number" and record.get("link"):
+                value = f"<a href=\"{escape(record['link'])}\">{value}</a>"
+            parts.append(f"<td>{value}</td>")
+        extra = record.get("extra") or {}
+        parts.extend(f"<td>{escape(extra.get(title, ''), quote=False)}</td>" for title in extra_titles)
+        parts.append("</tr>")
+    parts.append("</tbody></table>")
+    return "".join(parts)
+
+def render_results(value):
+    """Заменяет записи дел на HTML-таблицы во вложенном результате задачи"""
+    if is_records(value):
+        return render_records(value)
+    if isinstance(value, dict):
+        return {key: render_results(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [render_results(item) for item in value]
+    return value
@@ -0,0 +1,319 @@
+import base64
+import time
+
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import (WebDriverException, NoSuchElementException,
+                                        StaleElementReferenceException, TimeoutException)
+
+from app.config.settings import settings
+from app.services.court_registry import court_host
+from app.services.host_governor import host_slot
+from app.services.waits import adaptive_timeout, record_latency, sleep, wait_until
+from app.metrics.redis_client import incr_worker_counter, observe_worker_histogram
+from app.utils.logger import logger
+
+# Скрипты выполняются в странице и возвращают только нужный фрагмент вместо всего DOM
+
+ELEMENT_HTML_JS = """
+const el = document.querySelector(arguments[0]);
+return el ? el.outerHTML : null;
+"""
+
+# Категории из всплывающего окна "Изменить" (вёрстка с div внутри #content)
+CATEGORY_DIVS_JS = """
+const content = document.getElementById('content');
+if (!content) return null;
+const result = [];
+const categories = new Set();
+let category = null;
+for (const div of content.querySelectorAll('div')) {
+    const strong = div.querySelector('strong');
+    if (strong) {
+        category = strong.innerText.trim();
+        if (category !== 'Отмена') {
+            categories.add(category);
+            result.push({category: category, name: null, element: null});
+        }
+        continue;
+    }
+    const style = div.getAttribute('style') || '';
+    if (style.includes('padding-left: 30px') && div.getAttribute('onclick') && categories.has(category)) {
+        result.push({category: category, name: div.innerText.trim(), element: div});
+    }
+}
+return result;
+"""
+
+# Категории из таблицы (старая вёрстка со строками table > tbody > tr)
+CATEGORY_ROWS_JS = """
+const result = [];
+let category = null;
+for (const row of document.querySelectorAll('table > tbody > tr')) {
+    const strong = row.querySelector('strong');
+    if (strong) {
+        category = strong.innerText.trim();
+        if (category.toLowerCase() === 'отмена') {
+            category = null;
+            continue;
+        }
+        result.push({category: category, name: null, element: null});
+        continue;
+    }
+    const div = row.querySelector("div[onclick*='select_delo_id_new']");
+    if (div && category && div.innerText.trim().toLowerCase() !== 'отмена') {
+        result.push({category: category, name: div.innerText.trim(), element: div});
+    }
+}
+return result;
+"""
+
+# Категории и подкатегории вместе с их onclick (select_delo_id_new(...)) — без ссылок на элементы,
+# чтобы карту можно было сохранить и открывать формы напрямую
+CATEGORY_IDS_JS = """
+const content = document.getElementById('content');
+if (!content) return null;
+const result = [];
+let category = null;
+for (const div of content.querySelectorAll('div')) {
+    const strong = div.querySelector('strong');
+    if (strong) {
+        category = strong.innerText.trim();
+        continue;
+    }
+    const style = div.getAttribute('style') || '';
+    const onclick = div.getAttribute('onclick');
+    if (style.includes('padding-left: 30px') && onclick && category && category !== 'Отмена') {
+        result.push({category: category, name: div.innerText.trim(), onclick: onclick});
+    }
+}
+return result;
+"""
+
+# Значение поля одним вызовом: сеттер value из прототипа (его перехватывают Angular и React),
+# затем события input и change, на которые подписаны обработчики сайтов. Возвращает итоговое значение
+FILL_INPUT_JS = """
+const [el, value] = arguments;
+const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+el.focus();
+Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+el.dispatchEvent(new Event('input', {bubbles: true}));
+el.dispatchEvent(new Event('change', {bubbles: true}));
+return el.value;
+"""
+
+# Ресурс сайта запросом из страницы (cookies и сессия сайта) в base64; null — ошибка или ответ не того типа
+FETCH_BYTES_FUNCTION = """(url, type) => fetch(url, {credentials: 'same-origin', cache: 'no-store'})
+    .then(response => response.ok ? response.blob() : null)
+    .then(blob => (!blob || !blob.type.startsWith(type)) ? null : new Promise(resolve => {
+        const reader = new FileReader();
+        reader.onload = () => resolve(reader.result.split(',')[1]);
+        reader.onerror = () => resolve(null);
+        reader.readAsDataURL(blob);
+    }))
+    .catch(() => null)"""
+
+# Поля, для которых скрипт не сработал (маска ввода и т.п.): дальше в этом процессе вводятся нажатиями клавиш
+_keystroke_fields = set()
+
+def get_element_html(driver, selector):
+    """
+    outerHTML первого элемента по CSS-селектору (строка) или None, если элемента нет.
+    При ошибке скрипта или IN_PAGE_EXTRACTION=False элемент ищется в page_source.
+    """
+    start_time = time.monotonic()
+    html = None
+    if settings.IN_PAGE_EXTRACTION:
+        try:
+            html = driver.execute_script(ELEMENT_HTML_JS, selector) or ""
+            mode = "script"
+        except WebDriverException as e:
+            logger.warning(f"[get_element_html] Скрипт извлечения не выполнен, используется page_source: {e}")
+    if html is None:
+        html, mode = driver.page_source, "page_source"
+        element = BeautifulSoup(html, "html.parser").select_one(selector)
+        result = str(element) if element is not None else None
+    else:
+        result = html or None
+    observe_worker_histogram(f"extract_{mode}_seconds", time.monotonic() - start_time)
+    incr_worker_counter(f"extract_{mode}_bytes_total", len(html))
+    return result
+
+def fetch_bytes(driver, url, content_type="image/"):
+    """
+    Байты ресурса сайта через fetch в странице — без снимка элемента и повторной отрисовки.
+    None — запрос не удался или ответ не content_type
+    """
+    try:
+        with host_slot(url):
+            data = driver.execute_script(f"return ({FETCH_BYTES_FUNCTION})(arguments[0], arguments[1]);", url, content_type)
+    except WebDriverException as e:
+        logger.warning(f"[fetch_bytes] Скрипт загрузки {url} не выполнен: {e}")
+        return None
+    if not data:
+        return None
+    content = base64.b64decode(data)
+    incr_worker_counter("fetch_bytes_total", len(content))
+    return content
+
+def fill_input(driver, element, text, site, field, delay=0):
+    """
+    Вводит text в поле одним вызовом FILL_INPUT_JS. Нажатиями клавиш (с паузой delay) — только
+    при FAST_FORM_FILL=False, для полей из FORM_FILL_KEYSTROKES ("сайт.поле") и для полей,
+    которые не приняли значение из скрипта.
+    """
+    start_time = time.monotonic()
+    key = f"{site}.{field}"
+    mode = "keys"
+    if settings.FAST_FORM_FILL and key not in settings.FORM_FILL_KEYSTROKES and key not in _keystroke_fields:
+        try:
+            value = driver.execute_script(FILL_INPUT_JS, element, text)
+        except WebDriverException as e:
+            logger.warning(f"[fill_input] Скрипт ввода не выполнен для {key}: {e}")
+            value = None
+        if value == text:
+            mode = "script"
+        else:
+            logger.warning(f"[fill_input] Поле {key} не приняло значение из скрипта, дальше вводится с клавиатуры")
+            _keystroke_fields.add(key)
+    if mode == "keys":
+        element.clear()
+        for c in text:
+            element.send_keys(c)
+            if delay:
+                sleep(delay)
+    observe_worker_histogram(f"form_fill_{mode}_seconds", time.monotonic() - start_time)
+
+def get_category_descriptors(driver, script):
+    """
+    Категории и подкатегории одним вызовом скрипта: {категория: [{"name", "element"}]}.
+    None — скрипт не выполнился, нужно использовать старый обход элементов.
+    """
+    if not settings.IN_PAGE_EXTRACTION:
+        return None
+    try:
+        descriptors = driver.execute_script(script)
+    except WebDriverException as e:
+        logger.warning(f"[get_category_descriptors] Скрипт не выполнен, используется обход элементов: {e}")
+        return None
+    if descriptors is None:
+        return None
+    result = {}
+    for descriptor in descriptors:
+        subcategories = result.setdefault(descriptor["category"], [])
+        if descriptor["name"] is not None:
+            subcategories.append({"name": descriptor["name"], "element": descriptor["element"]})
+    return result
+
+
+# Условия готовности страниц: при PAGE_LOAD_STRATEGY=none переход возвращается сразу после отправки запроса,
+# и open_url / navigate / click_and_wait ждут только то, что нужно вызывающему. Полностью загруженная
+# страница (502, другая вёрстка) тоже считается готовой — дальше её разбирает verify_page
+PAGE_READY = {
+    "document": "document.readyState !== 'loading'",
+    "court_home": "document.querySelector('#court_name, .header__middle, .inner-logo, .menu-link, a.menu__link')",
+    "blue_search": "document.querySelector('.bookmarks, #kcaptchaForm')",
+    "blue_results": "document.querySelector('#tablcont, #search_results, .case-count, .search-error, #kcaptchaForm')",
+    "yellow_sud_delo": "document.querySelector('.statUl, .round-border-container, .error_errorer, #content .box.box_common')",
+    "yellow_search": "document.querySelector('#case_type, [name=captcha], div[onclick*=select_delo_id_new], table > tbody > tr')",
+    "yellow_results": "document.querySelector('#tablcont, #resultTable, .name-instanse, #error')",
+    "spb_search": "document.querySelector('.cases-list')",
+    "nalog_inn": "document.getElementById('inn')",
+}
+
+# Метка текущего документа: пока она есть, новая страница ещё не открылась. beforeunload отмечает,
+# что переход начался (клик по ссылке, отправка формы), — клики без перехода его не вызывают
+NAVIGATION_MARK_JS = ("window.__navigationPending = true; window.__navigationStarted = false;"
+                      "window.addEventListener('beforeunload', function () { window.__navigationStarted = true; });")
+NAVIGATION_STARTED_JS = "return !window.__navigationPending || !!window.__navigationStarted;"
+PAGE_READY_JS = "return !window.__navigationPending && (document.readyState === 'complete' || !!(%s));"
+IN_PAGE_READY_JS = "return !!(%s);"
+
+def register_page_ready(name, expression):
+    """Добавляет условие готовности страницы: JS-выражение, истинное, когда нужные элементы уже есть"""
+    PAGE_READY[name] = expression
+
+def _mark_document(driver):
+    try:
+        driver.execute_script(NAVIGATION_MARK_JS)
+    except WebDriverException:
+        # Открыт alert или страницы ещё нет — ждать будем только условие готовности
+        pass
+
+def _wait_ready(driver, ready, url, template=PAGE_READY_JS):
+    host = court_host(url)
+    script = template % PAGE_READY[ready]
+    try:
+        wait_until(lambda: driver.execute_script(script), adaptive_timeout(host, "page", settings.PAGE_READY_TIMEOUT),
+                   ignored=(WebDriverException,))
+        return True
+    except TimeoutError as e:
+        logger.warning(f"[page_ready] Страница {url} не готова ({ready}): {e}")
+        incr_worker_counter(f"page_ready_timeouts_total:{ready}")
+        return False
+
+def _navigation_started(driver):
+    try:
+        return bool(wait_until(lambda: driver.execute_script(NAVIGATION_STARTED_JS), settings.CLICK_NAVIGATION_TIMEOUT,
+                               ignored=(WebDriverException,)))
+    except TimeoutError:
+        return False
+
+def _load(driver, action, url, ready, click=False):
+    _mark_document(driver)
+    start_time = time.monotonic()
+    action()
+    if click and not _navigation_started(driver):
+        # Клик обработан на странице (или форма не отправилась): метка не исчезнет, ждать новую страницу незачем
+        logger.info(f"[page_ready] Клик на {url} не открыл новую страницу, ожидание {ready} на текущей")
+        incr_worker_counter("click_without_navigation_total")
+        return _wait_ready(driver, ready, url, IN_PAGE_READY_JS)
+    ready_ok = _wait_ready(driver, ready, url)
+    # Время записывается и при таймауте, чтобы медленные загрузки не выпадали из перцентиля
+    record_latency(court_host(url), "page", time.monotonic() - start_time)
+    return ready_ok
+
+def open_url(driver, url, ready="document"):
+    """
+    driver.get, который ждёт условие готовности ready из PAGE_READY (а не загрузку всей страницы).
+    False — страница не стала готовой за таймаут (adaptive_timeout, до PAGE_READY_TIMEOUT)
+    """
+    return _load(driver, lambda: driver.get(url), url, ready)
+
+def navigate(driver, url, ready="document"):
+    """
+    open_url через host_slot: переход ждёт очереди к сайту, общей для всех воркеров.
+    Время до готовности записывается в задержки сайта (вид page) для adaptive_timeout
+    """
+    with host_slot(url):
+        return open_url(driver, url, ready)
+
+def refresh_page(driver, ready="document"):
+    url = driver.current_url
+    with host_slot(url):
+        return _load(driver, driver.refresh, url, ready)
+
+def go_back(driver, ready="document"):
+    return _load(driver, driver.back, driver.current_url, ready)
+
+def click_and_wait(driver, element, ready="document"):
+    """
+    Клик, открывающий новую страницу (ссылка, отправка формы), с ожиданием её готовности.
+    Если переход не начался за CLICK_NAVIGATION_TIMEOUT, условие ready ждётся на текущей странице.
+    ready=None — клик без ожидания, для кнопок, которые заведомо не открывают страницу
+    """
+    if ready is None:
+        element.click()
+        return True
+    return _load(driver, element.click, driver.current_url, ready, click=True)
+
+def wait_for(driver, condition, kind, default):
+    """
+    Аналог WebDriverWait(driver, default).until(condition): таймаут по задержкам сайта (adaptive_timeout),
+    время ожидания записывается в задержки вида kind, паузы опроса растут и учитываются в задаче
+    """
+    host = court_host(driver.current_url)
+    try:
+        return wait_until(lambda: condition(driver), adaptive_timeout(host, kind, default), host=host, kind=kind,
+                          ignored=(NoSuchElementException, StaleElementReferenceException))
+    except TimeoutError as e:
+        raise TimeoutException(str(e))
@@ -6,7 +6,12 @@ from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
 
 import time
 
-from app.parsers.courts.utils import  make_name_initials, verify_page, wd_safe_click,wd_safe_wait,send_with_delay
+from app.parsers.courts.utils import  make_name_initials, verify_page, wd_safe_click,wd_safe_wait
+from app.parsers.courts.scripts import get_element_html, fill_input, navigate
+from app.parsers.courts.tables import merge_tables
+from app.parsers.courts.records import result_accumulator
+from app.parsers.courts.spb_async import FIRST_ROW_JS, search_date_from
+from app.services.checkpoints import Checkpoint
 from app.utils.logger import logger
 
 
@@ -17,43 +22,12 @@ def extract_table_html(driver):
     except Exception as e:
         logger.error(f"[extract_table_html] Не удалось загрузить таблицу дел")
         return "<div class='placeholder'>Нет данных</div>"
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    table = soup.find("table", class_="rwd-table")
-    return str(table) if table else "<div class='placeholder'>Нет данных</div>"
+    table = get_element_html(driver, "table.rwd-table")
+    return table or "<div class='placeholder'>Нет данных</div>"
 
 def merge_html_tables(html_list):
     logger.info(f"[merge_html_tables] Начато объединение таблиц rwd-table.")
-    if not html_list:
-        return "<div class='placeholder'>Нет данных</div>"
-
-    soup = BeautifulSoup(html_list[0], "html.parser")
-    base_table = soup.find("table", class_="rwd-table")
-    if not base_table:
-        return "<div class='placeholder'>Нет данных</div>"
-    base_tbody = base_table.find("tbody")
-    header_tr = base_tbody.find("tr", recursive=False)
-    rows = base_tbody.find_all("tr", recursive=False)[1:] if header_tr else base_tbody.find_all("tr", recursive=False)
-
-    for html in html_list[1:]:
-        temp_soup = BeautifulSoup(html, "html.parser")
-        table = temp_soup.find("table", class_="rwd-table")
-        if not table:
-            continue
-        tbody = table.find("tbody")
-        if not tbody:
-            continue
-        tr_list = tbody.find_all("tr", recursive=False)
-        if tr_list and tr_list[0].find("th"):
-            tr_list = tr_list[1:]
-        rows.extend(tr_list)
-
-    base_tbody.clear()
-    if header_tr:
-        base_tbody.append(header_tr)
-    for row in rows:
-        base_tbody.append(row)
-
-    return str(base_table)
+    return merge_tables(html_list, table_class="rwd-table", header_row=True)
 
 def find_next_btn(driver):
     logger.info(f"[find_next_btn] Поиск кнопки 'Далее'.")
@@ -65,7 +39,7 @@ def find_next_btn(driver):
         logger.warning(f"[find_next_btn] Кнопка 'Далее' не найдена.")
         return None
 
-def get_all_cases(driver):
+def get_all_cases(driver, known=None):
     logger.info(f"[get_all_cases] Парсинг результата.")
     try:
         WebDriverWait(driver, 120).until(lambda d: d.find_elements(By.CLASS_NAME, "ng-binding") or d.find_elements(By.CSS_SELECTOR, 'table.rwd-table tr[ng-if="cases.length == 0"]'))
@@ -75,29 +49,29 @@ def get_all_cases(driver):
     no_cases = driver.find_elements(By.CSS_SELECTOR, 'table.rwd-table tr[ng-if="cases.length == 0"]')
     if (no_cases):
         logger.info(f"[get_all_cases] Дела не найдены.")
-        return "<div class='placeholder'>Дела не найдены</div>"
+        placeholder = "<div class='placeholder'>Дела не найдены</div>"
+        return known.empty_result(placeholder) if known else placeholder
     logger.info(f"[get_all_cases] Дела найдены.")
-    all_pages = []
-    page = extract_table_html(driver)
-    all_pages.append(page)
-    next_btn = find_next_btn(driver)
-    while next_btn != None:
+    tables = result_accumulator(table_class="rwd-table", header_row=True, known=known)
+    while True:
         verify_page(driver)
-        try:
-            page = extract_table_html(driver)
-        except Exception as e:
-            logger.error(f"[get_all_cases] Ошибка при получении таблицы категории")
-        all_pages.append(page)
-        wd_safe_click(driver,10, EC.element_to_be_clickable, next_btn)
+        tables.add(extract_table_html(driver))
         next_btn = find_next_btn(driver)
-    return merge_html_tables(all_pages)
+        if next_btn is None:
+            break
+        first_row = driver.execute_script(f"return {FIRST_ROW_JS}")
+        next_btn.click()
+        # Таблица перерисовывается Angular без перезагрузки страницы
+        WebDriverWait(driver, 30).until(lambda d: d.execute_script(f"return {FIRST_ROW_JS}") != first_row)
+    return tables.result()
 
-def set_date(driver):
+def set_date(driver, known=None):
     wd_safe_wait(driver,10,EC.presence_of_element_located, By.ID, "id_date_from")
     date_input = driver.find_element(By.ID, "id_date_from")
-    send_with_delay(driver, date_input, "01.01.1991")
+    fill_input(driver, date_input, search_date_from(known), "spb", "id_date_from", delay=0.05)
 
-def parse_court_spb(driver, address,court_name,fullname,set_status):
+def parse_court_spb(driver, address,court_name,fullname,set_status, checkpoint=None):
+    checkpoint = checkpoint or Checkpoint()
     court_results = {}
     court_results["Мировые судьи Санкт-Петербурга"] = {}
     names = make_name_initials(fullname)
@@ -107,7 +81,7 @@ def parse_court_spb(driver, address,court_name,fullname,set_status):
     for name_to_check in names:
         court_results["Мировые судьи Санкт-Петербурга"][name_to_check] = {}
         logger.info(f"[parse_court_spb] Проверка доступа к сайту суда: {address}")
-        driver.get(link_to_global_search)
+        navigate(driver, link_to_global_search, "spb_search")
         verify_page(driver)
         logger.info(f"[parse_court_spb] Ожидание загрузки элементов на странице")
         wd_safe_wait(driver, 10, EC.presence_of_element_located, By.CLASS_NAME, "cases-list")
@@ -119,20 +93,25 @@ def parse_court_spb(driver, address,court_name,fullname,set_status):
         wd_safe_wait(driver, 10, EC.visibility_of_all_elements_located, By.CSS_SELECTOR, "select#affairs option")
         options = driver.find_elements(By.CSS_SELECTOR, 'select#affairs option')
         logger.info(f"[parse_court_spb] Опции получены: {len(options)} найдено.")
-        logger.info(f"[parse_court_spb] Устанавливаю дату.")
-        set_date(driver)
-        logger.info(f"[parse_court_spb] Дата установлена.")
         logger.info(f"[parse_court_spb] Начинаю перебор категорий.")
         for option in options:
             value = option.get_attribute("data-raw-value") # Получаем значение data-raw-value="..." 
             category = option.text
+            cached = checkpoint.get("Мировые судьи Санкт-Петербурга", name_to_check, category)
+            if cached is not None:
+                court_results["Мировые судьи Санкт-Петербурга"][name_to_check][category] = cached
+                continue
             logger.info(f"[parse_court_spb] Парсинг категории: {category}")
             set_status(f"Парсинг категории {category} по ФИО: {name_to_check}", court_name)
+            known = checkpoint.known("Мировые судьи Санкт-Петербурга", name_to_check, category)
             option.click()
             wd_safe_click(driver,10, EC.element_to_be_clickable, By.CSS_SELECTOR, ".fancy-select .trigger")
-            send_with_delay(driver, driver.find_element(By.ID, "id_full_name"), name_to_check)
+            # Дата у каждой категории своя: с последнего известного дела или с начала
+            set_date(driver, known)
+            fill_input(driver, driver.find_element(By.ID, "id_full_name"), name_to_check, "spb", "id_full_name", delay=0.05)
             wd_safe_click(driver,10, EC.element_to_be_clickable, By.CSS_SELECTOR, ".button-mobile button[type='submit']")
-            court_results["Мировые судьи Санкт-Петербурга"][name_to_check][category] = get_all_cases(driver)
+            court_results["Мировые судьи Санкт-Петербурга"][name_to_check][category] = get_all_cases(driver, known)
+            checkpoint.save("Мировые судьи Санкт-Петербурга", name_to_check, category, result=court_results["Мировые судьи Санкт-Петербурга"][name_to_check][category])
         logger.success(f"[parse_court_blue] Таблица готова.")
         set_status(f"Проверка по ФИО завершена : {name_to_check}",court_name)
     return court_results
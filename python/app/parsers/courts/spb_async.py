@@ -0,0 +1,80 @@
+import json
+
+from app.parsers.courts.records import result_accumulator
+from app.parsers.courts.async_utils import verify_page_async
+from app.parsers.courts.utils import make_name_initials
+from app.services.async_browser import set_status_async
+from app.services.checkpoints import Checkpoint
+from app.utils.logger import logger
+
+SPB_SEARCH_URL = "https://mirsud.spb.ru/cases/?type=civil&id=&full_name="
+SPB_COURT_NAME = "Мировые судьи Санкт-Петербурга"
+SPB_DATE_FROM = "01.01.1991"
+
+NO_CASES_SELECTOR = 'table.rwd-table tr[ng-if="cases.length == 0"]'
+FIRST_ROW_JS = "(() => { const row = document.querySelector('table.rwd-table tbody tr:nth-child(2)'); return row ? row.innerText : ''; })()"
+
+def search_date_from(known):
+    """Начало периода поиска: дата последнего известного дела или SPB_DATE_FROM"""
+    if known is not None and known.date_from:
+        return known.date_from
+    return SPB_DATE_FROM
+
+async def select_category(page, value):
+    """Выбор категории в select#affairs так же, как это делает fancy-select"""
+    await page.evaluate(f"""(() => {{
+        const select = document.querySelector('select#affairs');
+        const option = Array.from(select.options).find(o => o.getAttribute('data-raw-value') === {json.dumps(value)});
+        select.value = option.value;
+        select.dispatchEvent(new Event('change', {{bubbles: true}}));
+    }})()""")
+
+async def get_all_cases_async(page, known=None):
+    logger.info(f"[get_all_cases_async] Парсинг результата.")
+    await page.wait_for(f"!!(document.querySelector('.ng-binding') || document.querySelector({json.dumps(NO_CASES_SELECTOR)}))", timeout=120)
+    if await page.exists(NO_CASES_SELECTOR):
+        logger.info(f"[get_all_cases_async] Дела не найдены.")
+        placeholder = "<div class='placeholder'>Дела не найдены</div>"
+        return known.empty_result(placeholder) if known else placeholder
+    tables = result_accumulator(table_class="rwd-table", header_row=True, known=known)
+    while True:
+        await page.wait_for("!!document.querySelector('table.rwd-table')", timeout=10)
+        tables.add(await page.outer_html("table.rwd-table"))
+        if not await page.exists("a.pag__next.ng-scope"):
+            break
+        first_row = await page.evaluate(FIRST_ROW_JS)
+        await page.click("a.pag__next.ng-scope")
+        # Таблица перерисовывается Angular без перезагрузки страницы
+        await page.wait_for(f"{FIRST_ROW_JS} !== {json.dumps(first_row)}", timeout=30)
+    return tables.result()
+
+async def parse_court_spb_async(page, address, court_name, fullname, set_status, checkpoint=None):
+    """Асинхронный аналог parse_court_spb для AsyncBrowserRuntime"""
+    checkpoint = checkpoint or Checkpoint()
+    court_results = {SPB_COURT_NAME: {}}
+    names = make_name_initials(fullname)
+    logger.info(f"[parse_court_spb_async] Начало проверки.")
+    await set_status_async(set_status, f"Начало проверки", court_name)
+    for name_to_check in names:
+        court_results[SPB_COURT_NAME][name_to_check] = {}
+        await page.get(SPB_SEARCH_URL)
+        await verify_page_async(page)
+        await page.wait_for("document.querySelectorAll('select#affairs option').length > 0", timeout=10)
+        options = await page.evaluate("Array.from(document.querySelectorAll('select#affairs option')).map(o => [o.getAttribute('data-raw-value'), o.text])")
+        logger.info(f"[parse_court_spb_async] Опции получены: {len(options)} найдено.")
+        for value, category in options:
+            cached = checkpoint.get(SPB_COURT_NAME, name_to_check, category)
+            if cached is not None:
+                court_results[SPB_COURT_NAME][name_to_check][category] = cached
+                continue
+            logger.info(f"[parse_court_spb_async] Парсинг категории: {category}")
+            await set_status_async(set_status, f"Парсинг категории {category} по ФИО: {name_to_check}", court_name)
+            known = checkpoint.known(SPB_COURT_NAME, name_to_check, category)
+            await select_category(page, value)
+            await page.fill("#id_date_from", search_date_from(known))
+            await page.fill("#id_full_name", name_to_check)
+            await page.click(".button-mobile button[type='submit']")
+            court_results[SPB_COURT_NAME][name_to_check][category] = await get_all_cases_async(page, known)
+            checkpoint.save(SPB_COURT_NAME, name_to_check, category, result=court_results[SPB_COURT_NAME][name_to_check][category])
+        await set_status_async(set_status, f"Проверка по ФИО завершена : {name_to_check}", court_name)
+    return court_results
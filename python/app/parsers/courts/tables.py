@@ -0,0 +1,215 @@
+from io import StringIO
+
+from bs4.builder import HTMLTreeBuilder
+from bs4.dammit import EntitySubstitution
+from lxml import etree
+
+from app.utils.logger import logger
+
+# Правила вывода BeautifulSoup (html.parser, formatter="minimal"), чтобы результат совпадал байт в байт
+VOID_TAGS = HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS
+CDATA_LIST_ATTRIBUTES = HTMLTreeBuilder.DEFAULT_CDATA_LIST_ATTRIBUTES
+RAW_TEXT_TAGS = {"script", "style"}
+PRESERVE_WHITESPACE_TAGS = HTMLTreeBuilder.DEFAULT_PRESERVE_WHITESPACE_TAGS
+ASCII_SPACES = " \n\t\x0c\r"
+
+NO_DATA = "<div class='placeholder'>Нет данных</div>"
+ROWS_MARKER = "\x00rows\x00"
+
+# Атрибуты, которые удаляет clean_table
+STRIPPED_ATTRIBUTES = {"style", "width", "height", "border", "cellpadding", "cellspacing", "align", "valign", "color"}
+
+_parser = etree.HTMLParser(remove_comments=False, remove_blank_text=False)
+
+def parse_table(html, table_class=None):
+    """Первая таблица страницы (с классом table_class, если задан) или None"""
+    if not html or not html.strip():
+        return None
+    root = etree.fromstring(html, _parser)
+    if root is None:
+        return None
+    for table in root.iter("table"):
+        if table_class is None or table_class in (table.get("class") or "").split():
+            return table
+    return None
+
+def clean_element(element):
+    """То же, что clean_table, для дерева lxml: удаление оформления и замена иконки дела"""
+    for el in element.iter(tag=etree.Element):
+        for attr in list(el.attrib):
+            if attr in STRIPPED_ATTRIBUTES or attr.startswith("on"):
+                del el.attrib[attr]
+        if el.tag == "img" and el.get("src") == "/images/arow.gif":
+            el.set("src", "assets/images/case.png")
+            el.set("class", "court-tree-link-img")
+
+def format_attributes(element):
+    parts = []
+    list_attributes = CDATA_LIST_ATTRIBUTES["*"] | CDATA_LIST_ATTRIBUTES.get(element.tag, set())
+    for name, value in sorted(element.attrib.items()):
+        if name in list_attributes:
+            value = " ".join(value.split())
+        value = EntitySubstitution.quoted_attribute_value(EntitySubstitution.substitute_xml(value))
+        parts.append(f" {name}={value}")
+    return "".join(parts)
+
+def format_text(text, raw=False, preserve=False):
+    if not text:
+        return ""
+    # BeautifulSoup сворачивает строки из одних пробелов в один пробел или перевод строки
+    if not preserve and not text.strip(ASCII_SPACES):
+        return "\n" if "\n" in text else " "
+    return text if raw else EntitySubstitution.substitute_xml(text)
+
+def serialize(element, out, skip=None, children=None, preserve=False):
+    """
+    Пишет элемент в out так же, как str(tag) в BeautifulSoup, без хвостового текста (tail).
+    skip — вложенные элементы, которые выводятся отдельно (их tail остаётся на месте);
+    children — функция, которая выводит содержимое элемента вместо обычного обхода.
+    """
+    if element.tag is etree.Comment:
+        out.write(f"<!--{element.text or ''}-->")
+        return
+    if not isinstance(element.tag, str):
+        return
+    if element.tag in VOID_TAGS and not len(element) and not element.text:
+        out.write(f"<{element.tag}{format_attributes(element)}/>")
+        return
+    out.write(f"<{element.tag}{format_attributes(element)}>")
+    if children is not None:
+        children(element, out)
+    else:
+        raw = element.tag in RAW_TEXT_TAGS
+        preserve = preserve or element.tag in PRESERVE_WHITESPACE_TAGS
+        out.write(format_text(element.text, raw, preserve))
+        for child in element:
+            if skip is None or child not in skip:
+                serialize(child, out, skip, preserve=preserve)
+            out.write(format_text(child.tail, raw, preserve))
+    out.write(f"</{element.tag}>")
+
+def find_table_html(html, table_id):
+    """HTML таблицы с заданным id со страницы или None"""
+    if not html or not html.strip():
+        return None
+    root = etree.fromstring(html, _parser)
+    if root is None:
+        return None
+    for table in root.iter("table"):
+        if table.get("id") == table_id:
+            out = StringIO()
+            serialize(table, out)
+            return out.getvalue()
+    return None
+
+
+class TableAccumulator:
+    """
+    Объединяет таблицы результатов по мере получения страниц. Каждая страница разбирается
+    один раз (lxml), её строки сразу пишутся в буфер, дерево страницы не хранится.
+    Результат совпадает с прежними merge_html_tables на BeautifulSoup.
+
+    header_row=False — строки всех страниц (все tr из tbody) дописываются в tbody первой таблицы.
+    header_row=True — вариант spb: в tbody остаются только прямые строки, заголовок
+    (строка с th) берётся только с первой страницы.
+    """
+    def __init__(self, table_class=None, header_row=False, clean=False):
+        self.table_class = table_class
+        self.header_row = header_row
+        self.clean = clean
+        self.rows = StringIO()
+        self.prefix = None
+        self.suffix = None
+        self.passthrough = None
+        self.final = None
+        # Известные дела учитывает только RecordAccumulator, здесь пагинация всегда полная
+        self.caught_up = False
+
+    def add(self, html):
+        if self.final is not None:
+            return
+        if self.passthrough is not None:
+            self.passthrough.write(html)
+            return
+        table = parse_table(html, self.table_class)
+        if self.prefix is None:
+            self._start(html, table)
+            return
+        if table is None:
+            return
+        body = next(table.iter("tbody"), None)
+        if body is None:
+            return
+        if self.clean:
+            clean_element(body)
+        if self.header_row:
+            rows = [row for row in body if row.tag == "tr"]
+            if rows and next(rows[0].iter("th"), None) is not None:
+                rows = rows[1:]
+            for row in rows:
+                serialize(row, self.rows)
+            return
+        # Как base_body.append(row) для всех tr: вложенные строки выносятся из родительских
+        rows = list(body.iter("tr"))
+        nested = set(rows)
+        for row in rows:
+            serialize(row, self.rows, skip=nested)
+
+    def result(self):
+        if self.final is not None:
+            return self.final
+        if self.passthrough is not None:
+            return self.passthrough.getvalue()
+        if self.prefix is None:
+            return NO_DATA
+        return self.prefix + self.rows.getvalue() + self.suffix
+
+    def _start(self, html, table):
+        if table is None:
+            if self.header_row:
+                self.final = NO_DATA
+            else:
+                # Первая страница без таблицы: как раньше, заглушки просто склеиваются
+                self.passthrough = StringIO()
+                self.passthrough.write(html)
+            return
+        if self.clean:
+            clean_element(table)
+        body = next(table.iter("tbody"), None)
+        out = StringIO()
+        if body is None:
+            logger.warning(f"[TableAccumulator] В первой таблице нет tbody, строки следующих страниц не добавляются")
+            serialize(table, out)
+            self.final = out.getvalue()
+            return
+        self._serialize_around(table, body, out)
+        self.prefix, self.suffix = out.getvalue().split(ROWS_MARKER)
+
+    def _serialize_around(self, element, body, out):
+        """Выводит таблицу первой страницы, оставляя метку в конце tbody для новых строк"""
+        def children(el, o):
+            o.write(format_text(el.text))
+            for child in el:
+                if child is body or body in child.iterdescendants():
+                    self._serialize_around(child, body, o)
+                else:
+                    serialize(child, o)
+                o.write(format_text(child.tail))
+
+        def body_children(el, o):
+            if self.header_row:
+                for row in el:
+                    if row.tag == "tr":
+                        serialize(row, o)
+            else:
+                children(el, o)
+            o.write(ROWS_MARKER)
+
+        serialize(element, out, children=body_children if element is body else children)
+
+
+def merge_tables(html_list, table_class=None, header_row=False, clean=False):
+    accumulator = TableAccumulator(table_class, header_row, clean)
+    for html in html_list:
+        accumulator.add(html)
+    return accumulator.result()
@@ -1,20 +1,28 @@
 import time
+import json
 import shutil
 
 from bs4 import BeautifulSoup, Tag
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, Union
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-
-from app.services.browser import create_driver
+from selenium.common.exceptions import UnexpectedAlertPresentException
+
+from app.services.browser import lease_driver
+from app.services.court_registry import get_court_meta, update_court_meta
+from app.parsers.courts.tables import merge_tables
+from app.parsers.courts.scripts import navigate, refresh_page
+from app.services.host_governor import host_slot, report_response, report_status
+from app.services.http_client import make_session, decode_response
+from app.services.circuit_breaker import CourtUnavailable
+from app.services.waits import backoff_delays, sleep
+from app.metrics.redis_client import incr_worker_counter
 from app.utils.logger import logger
 from app.config.settings import settings
 
 MAX_RETRIES = 15
-MAX_RETRIES_UNAVAILABLE = 3
-RETRY_DELAY = 3
 
 @dataclass
 class CourtInfo:
@@ -58,58 +66,60 @@ def check_unexpected_alert(driver,):
         return
 
  
-def check_503(driver):
-    logger.info(f"[check_503] Проверка на ошибку 503.")
-    max_retries=15
-    retry_delay = 3
-    try:
-        for attempt in range(max_retries):
-            title = driver.title
-            page = driver.page_source
-            if "503" not in title and "Service Unavailable" not in page:
-                logger.info(f"[check_503] Ошибка 503 отсутсвует.")
-                return
-            print(f"[503 DETECTED] — retry {attempt + 1}/{max_retries}")
-            logger.warning(f"[check_503] Обнаружена ошибка 503. Попытка получить доступ {attempt + 1}/{max_retries} ")
-            time.sleep(retry_delay)
-            driver.refresh()
-        raise RuntimeError(f"[503 ERROR] — exceeded {max_retries} retries")
-    except RuntimeError as e:
-        logger.error(f"[check_503] Ошибка 503. После {max_retries} доступ получить не удалось. ")
+# Одна проверка состояния страницы вместо повторных driver.title и driver.page_source
+PROBE_FUNCTION = """(selectors) => {
+    const html = document.documentElement ? document.documentElement.outerHTML : '';
+    const text = document.body ? document.body.innerText : '';
+    const title = document.title || '';
+    const elements = {};
+    for (const [key, selector] of Object.entries(selectors || {})) {
+        elements[key] = !!document.querySelector(selector);
+    }
+    return {
+        title: title,
+        bad_gateway: title.includes('502') || html.includes('Bad Gateway'),
+        service_unavailable: title.includes('503') || html.includes('Service Unavailable'),
+        unavailable_message: text.includes('Информация временно недоступна'),
+        captcha: !!document.getElementById('kcaptchaForm'),
+        elements: elements,
+        html_length: html.length,
+    };
+}"""
 
- 
-def check_502(driver):
-    logger.info(f"[check_502] Проверка на ошибку 502.")
-    try:
-        for attempt in range(MAX_RETRIES):
-            title = driver.title
-            page = driver.page_source
-            if "502" not in title and "Bad Gateway" not in page:
-                logger.success(f"[check_502] Ошибка 502 отсутсвует.")
-                return
-            logger.warning(f"[check_502] Обнаружена ошибка 502. Попытка получить доступ {attempt + 1}/{MAX_RETRIES} ")
-            time.sleep(RETRY_DELAY)
-            driver.refresh()
-        raise RuntimeError(f"[502 ERROR] — exceeded {MAX_RETRIES} retries")
-    except RuntimeError as e: 
-        logger.error(f"[check_502] Ошибка 502. После {MAX_RETRIES} доступ получить не удалось. ")
-
- 
-def check_unavailable_message(driver):
-    logger.info(f"[check_unavailable_message] Проверка сообщения об отсутствии данных.")
+@dataclass
+class PageStatus:
+    alert: bool
+    title: str = ""
+    bad_gateway: bool = False
+    service_unavailable: bool = False
+    unavailable_message: bool = False
+    captcha: bool = False
+    elements: dict = field(default_factory=dict)
+    html_length: int = 0
+
+    @property
+    def server_error(self):
+        return self.bad_gateway or self.service_unavailable
+
+def probe_page(driver, selectors=None):
+    """
+    Состояние страницы за один вызов скрипта: alert, 502/503, сообщение о недоступности,
+    форма капчи и наличие элементов из selectors ({ключ: CSS-селектор}).
+    """
     try:
-        for attempt in range(MAX_RETRIES_UNAVAILABLE):
-            message = driver.find_element((By.XPATH, "//*[contains(text(),'Информация временно недоступна')]"))
-            if not message:
-                logger.success(f"[check_unavailable_message] Сообщение об отсутствии данных не обнаружено.")
-                return
-            logger.warning(f"[check_unavailable_message] Сообщение об отсутствии данных обнаружено.")
-            time.sleep(RETRY_DELAY)
-            driver.refresh()
-        raise RuntimeError(f"[check_unavailable_message] Судебные делопроизводства в данном суде недоступны. Проверьте данный адрес позже.")
-    except Exception as e:
-        logger.success(f"[check_unavailable_message] Сообщение об отсутствии данных не обнаружено.")
-        return
+        result = driver.execute_script(f"return ({PROBE_FUNCTION})(arguments[0]);", selectors or {})
+    except UnexpectedAlertPresentException:
+        incr_worker_counter("page_probe_total")
+        return PageStatus(alert=True)
+    status = PageStatus(alert=False, **result)
+    record_probe(len(json.dumps(result, ensure_ascii=False).encode("utf-8")), status.html_length)
+    return status
+
+def record_probe(probe_bytes, page_bytes):
+    """Считает вызовы проверки и сколько байт передано вместо целой страницы"""
+    incr_worker_counter("page_probe_total")
+    incr_worker_counter("page_probe_bytes_total", probe_bytes)
+    incr_worker_counter("page_probe_page_bytes_total", page_bytes)
 
  
 def make_name_initials(fullname):
@@ -152,43 +162,32 @@ def make_name_initials(fullname):
         return [fullname.surname]
 
  
-def verify_page(driver,):
+def verify_page(driver, selectors=None):
+    delays = backoff_delays()
     try:
-        check_unexpected_alert(driver)
-        check_unavailable_message(driver)
-        check_502(driver)
-        check_503(driver)
+        for attempt in range(MAX_RETRIES):
+            status = probe_page(driver, selectors)
+            if status.alert:
+                check_unexpected_alert(driver)
+                continue
+            if status.unavailable_message:
+                logger.warning(f"[verify_page] На странице сообщение 'Информация временно недоступна'.")
+            report_response(driver.current_url, not (status.server_error or status.unavailable_message))
+            if not status.server_error:
+                return status
+            logger.warning(f"[verify_page] Обнаружена ошибка {'502' if status.bad_gateway else '503'}. Попытка получить доступ {attempt + 1}/{MAX_RETRIES} ")
+            sleep(next(delays))
+            refresh_page(driver)
+        logger.error(f"[verify_page] После {MAX_RETRIES} попыток доступ получить не удалось.")
+    except CourtUnavailable:
+        raise
     except Exception as e:
         logger.error(f"[verify_page] Ошибка при проверке страницы: {e}")
 
  
 def merge_html_tables(html_list):
     logger.info(f"[merge_html_tables] Начато объединение таблиц.")
-    if not html_list:
-        logger.info(f"[merge_html_tables] Не данных для заполнения таблицы.")
-        return "<div class='placeholder'>Нет данных</div>"
-
-    soup = BeautifulSoup(html_list[0], "html.parser")
-    base_table = soup.find("table")
-
-    if base_table is None:
-        # Если нет таблицы, просто объединяем текст заглушек
-        return "".join(html_list)
-
-    base_body = base_table.find("tbody")
-
-    for html in html_list[1:]:
-        temp_soup = BeautifulSoup(html, "html.parser")
-        table = temp_soup.find("table")
-        if not table:
-            continue
-        body = table.find("tbody")
-        if not body:
-            continue
-        for row in body.find_all("tr"):
-            base_body.append(row)
-
-    return str(base_table)
+    return merge_tables(html_list)
 
 
 def clean_table(html_or_tag: Union[str, Tag]) -> Optional[Tag]:
@@ -224,10 +223,11 @@ def clean_table(html_or_tag: Union[str, Tag]) -> Optional[Tag]:
     return table
 
  
-def get_court_type(driver, address):
+def get_court_type(driver, address, open_page=True):
     logger.info(f"[get_court_type] Определение типа суда по адресу: {address}")
-    driver.get(address)
-    verify_page(driver)
+    if open_page:
+        navigate(driver, address, "court_home")
+        verify_page(driver)
     try:
         WebDriverWait(driver, 15).until(
             lambda d: d.find_elements(By.ID, "court_name") or d.find_elements(By.CLASS_NAME, "header__middle") or d.find_elements(By.CLASS_NAME, "inner-logo")
@@ -262,12 +262,6 @@ def wd_safe_click(driver,wait_time,condition,by,element):
         logger.warning(f"[safe_click] Превышено время ожидания {element}")
         raise
 
-def send_with_delay(driver, element, text, delay=0.05):
-    element.clear()
-    for char in text:
-        element.send_keys(char)
-        time.sleep(delay)
-
 def get_court_name(court_type,driver):
     logger.info(f"[get_court_name] Получение названия суда")
     verify_page(driver)
@@ -296,32 +290,80 @@ def get_court_name(court_type,driver):
         logger.error(f"[get_court_name] Ошибка при получении названия суда: {e}")
         return "unsupported"
 
-def get_court_info(address,driver):
-    need_to_close = False
+def parse_court_home(html):
+    """Тип и название суда по HTML главной страницы или None, если вёрстка не распознана"""
+    soup = BeautifulSoup(html, "html.parser")
+    court_name = soup.find(id="court_name")
+    if court_name is not None:
+        return CourtInfo(supported=True, type="blue", name=" ".join(court_name.get_text().split()))
+    if soup.select_one(".header__middle"):
+        heading = soup.select_one(".heading_title")
+        return CourtInfo(supported=True, type="yellow", name=" ".join(heading.get_text().split()) if heading else "unsupported")
+    if soup.select_one(".inner-logo"):
+        return CourtInfo(supported=True, type="spb", name="Мировые судьи Санкт-Петербурга")
+    return None
+
+def get_court_info_http(address):
+    """
+    Тип и название суда без браузера: из реестра судов, а если там нет — по главной странице,
+    загруженной HTTP-запросом. None — определить не удалось, тип определяется через Selenium.
+    CourtUnavailable — выключатель сайта разомкнут
+    """
+    meta = get_court_meta(address)
+    if meta is not None and meta.type:
+        logger.info(f"[get_court_info_http] Суд найден в реестре: {meta.type}, {meta.name}")
+        return CourtInfo(supported=True, type=meta.type, name=meta.name)
+    try:
+        with host_slot(address):
+            response = make_session().get(address, timeout=settings.BLUE_HTTP_TIMEOUT)
+        report_status(response.url, response.status_code)
+        court_info = parse_court_home(decode_response(response))
+    except CourtUnavailable:
+        raise
+    except Exception as e:
+        logger.warning(f"[get_court_info_http] Не удалось загрузить главную страницу {address}: {e}")
+        return None
+    if court_info is None:
+        logger.info(f"[get_court_info_http] Тип суда {address} не определён без браузера")
+        return None
+    logger.info(f"[get_court_info_http] Определенный тип суда: {court_info.type}")
+    if court_info.name != "unsupported":
+        update_court_meta(address, type=court_info.type, name=court_info.name)
+    return court_info
+
+def get_court_info(address, driver, refresh=False):
+    """
+    Тип и название суда: из реестра судов, а если там нет (или refresh) — с сайта.
+    CourtUnavailable — выключатель сайта разомкнут
+    """
+    meta = None if refresh else get_court_meta(address)
+    if meta is not None and meta.type:
+        logger.info(f"[get_court_info] Суд найден в реестре: {meta.type}, {meta.name}")
+        return CourtInfo(supported=True, type=meta.type, name=meta.name)
     if driver is None:
-        need_to_close = True
-        driver = create_driver("eager", headless=settings.HEADLESS)
+        with lease_driver() as leased_driver:
+            return get_court_info(address, leased_driver, refresh)
     try:
         try:
-            driver.get(address)
+            navigate(driver, address, "court_home")
             verify_page(driver)
+        except CourtUnavailable:
+            raise
         except Exception as e:
             logger.warning(f"[get_court_info] Не удалось открыть сайт: {e}")
-            return CourtInfo(supported=False)
+            return CourtInfo(supported=False, type=None, name=None, error=str(e))
 
-        court_type = get_court_type(driver, address)
+        # Сайт уже открыт выше, повторный переход не нужен
+        court_type = get_court_type(driver, address, open_page=False)
         logger.info(f"[get_court_info] Определенный тип суда: {court_type}")
         if court_type == "unsupported":
             return CourtInfo(supported=False, type=None, name=None, error="Сайт не поддерживается")
         court_name = get_court_name(court_type, driver)
+        if court_name != "unsupported":
+            update_court_meta(address, type=court_type, name=court_name)
         return CourtInfo(supported=True, type=court_type, name=court_name)
+    except CourtUnavailable:
+        raise
     except Exception as e:
         logger.exception(f"[get_court_info] Ошибка: {e}")
-        return CourtInfo(supported=False, error=str(e))
-    finally:
-        if need_to_close:
-            try:
-                driver.quit()
-            except Exception as e:
-                logger.error(f"[get_court_info] Ошибка при закрытии драйвера: {e}")
-
+        return CourtInfo(supported=False, type=None, name=None, error=str(e))
@@ -1,18 +1,37 @@
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
 from base64 import b64decode
-import time
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from contextvars import copy_context
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
 from app.utils.logger import logger
-from app.parsers.courts.utils import verify_page, make_name_initials, clean_table, timing_decorator
+from app.parsers.courts.utils import verify_page, make_name_initials, timing_decorator
+from app.parsers.courts.records import result_accumulator
 from app.captcha.orc_model_yellow_integration import predict_captcha_from_bytes
+from app.parsers.courts.scripts import get_element_html, get_category_descriptors, CATEGORY_DIVS_JS, CATEGORY_ROWS_JS, CATEGORY_IDS_JS, fill_input, navigate, refresh_page, wait_for, click_and_wait, go_back
+from app.services.court_registry import get_court_meta, update_court_meta
+from app.services.browser import lease_driver
+from app.services.checkpoints import Checkpoint
+from app.metrics.redis_client import incr_worker_counter
+from app.config.settings import settings
 
 MAX_RETRIES = 15
-RETRY_DELAY = 5  
 FIRST_TIME = True
 
+# Картинка капчи (base64 в src) рядом с полем ввода загружена
+CAPTCHA_READY_JS = """
+const input = document.getElementsByName('captcha')[0];
+const img = input && input.closest('td') && input.closest('td').querySelector('img');
+return !!(img && img.src.replace(/\\s/g, '').startsWith('data:image'));
+"""
+
+DELO_ID_RE = re.compile(r"select_delo_id_new\(\s*['\"]?(\d+)")
+
 @timing_decorator
 def solve_captcha(driver):
     logger.info(f"[solve_captcha] Начата попытка распознания капчи.")
@@ -40,40 +59,10 @@ def solve_captcha(driver):
 @timing_decorator
 def extract_table_html(driver):
     logger.info("[extract_table_html] Получение таблицы дел.")
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    table = soup.find("table", id="tablcont")
-    table = clean_table(table)
+    # clean_table применяется при объединении страниц (result_accumulator(clean=True))
+    table = get_element_html(driver, "table#tablcont")
     logger.info("[extract_table_html] Таблица получена.")
-    return str(table) if table else "<div class='placeholder'>Нет данных</div>"
-
-@timing_decorator
-def merge_html_tables(html_list):
-    logger.info(f"[merge_html_tables] Начато объединение таблиц.")
-    if not html_list:
-        logger.info(f"[merge_html_tables] Не данных для заполнения таблицы.")
-        return "<div class='placeholder'>Нет данных</div>"
-
-    soup = BeautifulSoup(html_list[0], "html.parser")
-    base_table = soup.find("table")
-
-    if base_table is None:
-        # Если нет таблицы, просто объединяем текст заглушек
-        return "".join(html_list)
-
-    base_body = base_table.find("tbody")
-
-    for html in html_list[1:]:
-        temp_soup = BeautifulSoup(html, "html.parser")
-        table = temp_soup.find("table")
-        if not table:
-            continue
-        body = table.find("tbody")
-        if not body:
-            continue
-        for row in body.find_all("tr"):
-            base_body.append(row)
-
-    return str(base_table)
+    return table or "<div class='placeholder'>Нет данных</div>"
 
 @timing_decorator
 def check_captcha(driver):
@@ -124,10 +113,13 @@ def check_invalid_captcha_input(driver, name, current_subcategory):
 @timing_decorator
 def restart_captcha_input(driver, name, current_subcategory=None):
     try:
-        driver.back()
-        driver.refresh()
-        if current_subcategory:
-            select_category_and_subcategory(driver, current_subcategory["category"], current_subcategory["subcategory"])
+        if current_subcategory and current_subcategory.get("entry"):
+            open_subcategory_form(driver, current_subcategory["search_url"], current_subcategory["category"], current_subcategory["entry"])
+        else:
+            go_back(driver)
+            refresh_page(driver)
+            if current_subcategory:
+                select_category_and_subcategory(driver, current_subcategory["category"], current_subcategory["subcategory"])
 
         logger.info(f"[restart_captcha_input] Ожидание поля ввода капчи.")
         captcha_input = WebDriverWait(driver, 30).until(
@@ -136,7 +128,10 @@ def restart_captcha_input(driver, name, current_subcategory=None):
         captcha_input.clear()
         logger.info(f"[restart_captcha_input] Поле найдено. Ввод ФИО.")
         find_and_send_surname_input(driver, name)
-        time.sleep(1)
+        try:
+            wait_for(driver, lambda d: d.execute_script(CAPTCHA_READY_JS), "captcha", 30)
+        except TimeoutException:
+            logger.warning(f"[restart_captcha_input] Картинка капчи не загрузилась.")
         return False
     except Exception as e:
         logger.error(f"[restart_captcha_input] Ошибка при повторном вводе капчи: {e}")
@@ -157,7 +152,7 @@ def input_captcha_and_press_submit(driver,name,current_subcategory):
                 EC.element_to_be_clickable((By.NAME, "Submit"))
             )
             logger.info(f"[input_captcha_and_press_submit] Конпка найдена, нажимаю...")
-            submit_button.click()
+            click_and_wait(driver, submit_button, "yellow_results")
             logger.info(f"[input_captcha_and_press_submit] Нажата конпка submit")
         except Exception as e:
             logger.error(f"[input_captcha_and_press_submit] Ошибка при поиске и нажатии кнопки submit")
@@ -203,7 +198,7 @@ def check_and_get_next_page(driver):
     logger.info(f"[check_and_get_next_page] Проверка наличия кнопки 'Следующая страница")
     try:
         next_page_btn = driver.find_element(By.XPATH, "//a[@title='Следующая страница']")
-        next_page_btn.click()
+        click_and_wait(driver, next_page_btn, "yellow_results")
         #WebDriverWait(driver, 30).until(EC.visibility_of_element_located((By.ID, "tablcont")))
         logger.info(f"[check_and_get_next_page] Кнопка найдена")
         return extract_table_html(driver)
@@ -212,7 +207,7 @@ def check_and_get_next_page(driver):
         return "end"
 
 @timing_decorator
-def get_all_cases(driver):
+def get_all_cases(driver, known=None):
     logger.info(f"[get_all_cases] Ожидаю появления таблицы или ошибки")
     try:
         WebDriverWait(driver, 30).until(
@@ -228,27 +223,31 @@ def get_all_cases(driver):
     except Exception as e:
         logger.error(f"[get_all_cases] Ни таблица, ни ошибка не появились: {e}")
         
-    all_pages = []
+    tables = result_accumulator(clean=True, known=known)
+    pages_count = 1
     logger.info(f"[get_all_cases] Получаю таблицу на первой странице")
     first_page = extract_table_html(driver)
     logger.info(f"[get_all_cases] Таблица получена, добавляю в список таблиц")
-    all_pages.append(first_page)
+    tables.add(first_page)
     logger.info(f"[get_all_cases] Первая страница добавлена")
 
     logger.info(f"[get_all_cases] Начало итерации цикла страниц")
-    while True:
-        logger.info(f"[get_all_cases] Текущая страница: {len(all_pages) + 1}")
+    while not tables.caught_up:
+        logger.info(f"[get_all_cases] Текущая страница: {pages_count + 1}")
         logger.info(f"[get_all_cases] Проверка наличия и переход к след. странице")
         page = check_and_get_next_page(driver)
         if page == "end":
             logger.info(f"[get_all_cases] Достигнута последняя страница, выхожу из цикла")
             break
         logger.info(f"[get_all_cases] Добавление страницы в список.")
-        all_pages.append(page)
-        logger.info(f"[get_all_cases] Добавлена новая страница, всего страниц: {len(all_pages)}")
+        tables.add(page)
+        pages_count += 1
+        logger.info(f"[get_all_cases] Добавлена новая страница, всего страниц: {pages_count}")
+    if tables.caught_up:
+        logger.info(f"[get_all_cases] Страница {pages_count} состоит из известных дел, остальные не загружаются")
 
     logger.success(f"[get_all_cases] Все страницы собраны, объединяю таблицы")
-    return merge_html_tables(all_pages)
+    return tables.result()
 
 @timing_decorator
 def find_and_click_change_btn(driver):
@@ -290,8 +289,7 @@ def find_and_send_surname_input(driver,name):
                 )
             )
             logger.info(f"[find_and_send_surname_input] Поле для ввода фамилии найдено — вводим: {name}")
-            for c in name:
-                surname_input.send_keys(c)
+            fill_input(driver, surname_input, name, "yellow", "surname")
             logger.success(f"[find_and_send_surname_input] Ввод фамилии '{name}' успешно завершён")
         except TimeoutException:
             logger.error(f"[find_and_send_surname_input] Поле для ввода фамилии не найдено за 30 секунд")
@@ -309,7 +307,7 @@ def find_and_click_back_btn(driver):
             EC.element_to_be_clickable((By.XPATH, "//a[b[contains(text(),'Поиск информации по делам')]]"))
         )
         logger.info(f"[find_and_click_back_btn] Кнопка найдена. Выполняется клик...")
-        back_button.click()
+        click_and_wait(driver, back_button, "yellow_search")
         logger.success(f"[find_and_click_back_btn] Кнопка 'Поиск информации по делам' успешно нажата")
 
     except (TimeoutException, NoSuchElementException) as e:
@@ -342,8 +340,7 @@ def find_and_send_captcha(driver):
         raise
 
     try:
-        for c in capcha_text:
-            capcha_input.send_keys(c)
+        fill_input(driver, capcha_input, capcha_text, "yellow", "captcha")
         logger.success(f"[find_and_send_captcha] Капча успешно введена")
     except Exception as e:
         logger.warning(f"[find_and_send_captcha] Ошибка при первом вводе капчи: {e}")
@@ -351,8 +348,7 @@ def find_and_send_captcha(driver):
             capcha_input = WebDriverWait(driver, 30).until(
                 EC.presence_of_element_located((By.NAME, "captcha"))
             )
-            for c in capcha_text:
-                capcha_input.send_keys(c)
+            fill_input(driver, capcha_input, capcha_text, "yellow", "captcha")
             logger.success(f"[find_and_send_captcha] Повторный ввод капчи успешен")
         except Exception as e2:
             logger.error(f"[find_and_send_captcha] Повторный ввод капчи не удался: {e2}")
@@ -372,6 +368,11 @@ def get_category_and_subcategory_btns(driver):
         logger.error(f"[get_category_and_subcategory_btns] Категории не загрузились — таймаут")
         return {}
 
+    descriptors = get_category_descriptors(driver, CATEGORY_ROWS_JS)
+    if descriptors is not None:
+        logger.success(f"[get_category_and_subcategory_btns] Парсинг завершён. Найдено категорий: {len(descriptors)}")
+        return descriptors
+
     rows = driver.find_elements(By.CSS_SELECTOR, "table > tbody > tr")
     results = {}
     current_category = None
@@ -429,6 +430,11 @@ def get_category_and_subcategory_btns_new(driver):
         )
     except:
         logger.error("[get_category_and_subcategory_buttons_new] Элемент #content не найден")
+    descriptors = get_category_descriptors(driver, CATEGORY_DIVS_JS)
+    if descriptors is not None:
+        logger.success(f"[get_category_and_subcategory_buttons_new] Готово. Категорий: {len(descriptors)}")
+        return descriptors
+
     try:
         container = driver.find_element(By.ID, "content")
     except Exception as e:
@@ -486,18 +492,23 @@ def find_and_click_search_btn(driver):
 
     try:
         logger.info(f"[find_and_click_search_btn] Кнопка найдена. Выполняется клик...")
-        search_button.click()
+        click_and_wait(driver, search_button, "yellow_search")
         logger.success(f"[find_and_click_search_btn] Кнопка 'Поиск информации по делам' успешно нажата")
     except Exception as e:
         logger.exception(f"[find_and_click_search_btn] Ошибка при нажатии кнопки: {e}")
         return { "ошибка: Не удалось нажать кнопку 'Поиск информации по делам'" : "" }
 
 @timing_decorator
-def get_court_type(driver, address):
+def get_court_type(driver, address, refresh=False):
+    """Вёрстка раздела "Судебное делопроизводство": из реестра судов, а если там нет (или refresh) — с сайта"""
     logger.info(f"[get_court_type] Определение типа суда по адресу: {address}")
+    meta = None if refresh else get_court_meta(address)
+    if meta is not None and meta.layout:
+        logger.info(f"[get_court_type] Тип суда из реестра: {meta.layout}")
+        return meta.layout
 
     try:
-        driver.get(address)
+        navigate(driver, address, "court_home")
         logger.info(f"[get_court_type] Страница загружена")
         WebDriverWait(driver, 30).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "a.menu__link"))
@@ -516,40 +527,123 @@ def get_court_type(driver, address):
             raise RuntimeError(f"Ошибка при работе с судом: {address}")
 
         logger.info(f"[get_court_type] Кнопка 'Судебное делопроизводство' найдена — выполняется переход")
+        sud_delo_url = sud_delo_button.get_attribute("href")
         driver.execute_script("arguments[0].scrollIntoView(true);", sud_delo_button)
-        time.sleep(0.3)
-        sud_delo_button.click()
+        wait_for(driver, EC.element_to_be_clickable(sud_delo_button), "click", 5)
+        click_and_wait(driver, sud_delo_button, "yellow_sud_delo")
         logger.info(f"[get_court_type] Переход выполнен.")
         logger.info(f"[get_court_type] Попытка загрузить элементы.")
         is_multiserver = driver.find_elements(By.CLASS_NAME, "statUl")
         is_modern = driver.find_elements(By.CLASS_NAME, "round-border-container")
         is_unavailable = driver.find_elements(By.CLASS_NAME, "error_errorer")
-        if is_multiserver:
-            logger.success(f"[get_court_type] Тип суда: multi")
-            return "multi"
-        if is_modern:
-            logger.success(f"[get_court_type] Тип суда: modern")
-            return "modern"
-        if is_unavailable:
+        if is_unavailable and not is_multiserver and not is_modern:
             logger.warning(f"[get_court_type] Сайт недоступен: ошибка-доступа")
             return "unavailable"
-
-        logger.success(f"[get_court_type] Тип суда: regular")
-        return "regular"
+        servers = []
+        if is_multiserver:
+            court_type = "multi"
+            servers = [{"name": link.text.strip(), "url": link.get_attribute("href")}
+                       for link in is_multiserver[0].find_elements(By.CSS_SELECTOR, "li a")]
+        elif is_modern:
+            court_type = "modern"
+        else:
+            court_type = "regular"
+        logger.success(f"[get_court_type] Тип суда: {court_type}")
+        update_court_meta(address, layout=court_type, sud_delo_url=sud_delo_url, servers=servers, categories={})
+        return court_type
 
     except Exception as e:
         logger.exception(f"[get_court_type] Ошибка при определении типа суда: {e}")
         return {f"Сайт {address}": {"__error__": "Ошибка при работе с судом."}}
 
+def set_query_param(url, key, value):
+    parts = urlparse(url)
+    params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != key]
+    params.append((key, str(value)))
+    return urlunparse(parts._replace(query=urlencode(params)))
+
+def server_key(search_url):
+    """Номер сервера multi-суда (srv_num) — у каждого сервера своя карта категорий"""
+    return dict(parse_qsl(urlparse(search_url).query)).get("srv_num", "1")
+
+@timing_decorator
+def get_category_map(driver, address, search_url):
+    """
+    Карта {категория: [{"name", "delo_id", "onclick"}]} для формы поиска. Берётся из реестра судов,
+    а если её там нет — один раз извлекается из окна "Изменить" и сохраняется.
+    """
+    server = server_key(search_url)
+    meta = get_court_meta(address)
+    if meta is not None and meta.categories.get(server):
+        logger.info(f"[get_category_map] Карта категорий сервера {server} взята из реестра")
+        return meta.categories[server]
+
+    find_and_click_change_btn(driver)
+    verify_page(driver)
+    try:
+        WebDriverWait(driver, 30).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "div[onclick*='select_delo_id_new']"))
+        )
+        entries = driver.execute_script(CATEGORY_IDS_JS) or []
+    except (TimeoutException, WebDriverException) as e:
+        logger.error(f"[get_category_map] Не удалось получить категории: {e}")
+        return {}
+
+    category_map = {}
+    for entry in entries:
+        match = DELO_ID_RE.search(entry["onclick"])
+        category_map.setdefault(entry["category"], []).append({
+            "name": entry["name"],
+            "delo_id": match.group(1) if match else None,
+            "onclick": entry["onclick"],
+        })
+    logger.success(f"[get_category_map] Категорий: {len(category_map)}, подкатегорий: {len(entries)}")
+    if category_map:
+        categories = dict(meta.categories) if meta is not None else {}
+        categories[server] = category_map
+        update_court_meta(address, categories=categories)
+    return category_map
+
+def wait_subcategory_form(driver):
+    try:
+        WebDriverWait(driver, 40).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "#content .box.box_common.m-all_m"))
+        )
+        WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.ID, "case_type")))
+        return True
+    except TimeoutException:
+        return False
+
 @timing_decorator
-def regular_type_court_check(driver, address,court_name, names,set_status):
+def open_subcategory_form(driver, search_url, category_name, subcategory):
+    """
+    Открывает форму поиска подкатегории по адресу с delo_id. Если адрес не сработал
+    (или delo_id неизвестен) — прежним путём через окно "Изменить".
+    """
+    if subcategory.get("delo_id"):
+        navigate(driver, set_query_param(search_url, "delo_id", subcategory["delo_id"]), "yellow_search")
+        verify_page(driver)
+        if wait_subcategory_form(driver):
+            logger.info(f"[open_subcategory_form] Форма '{subcategory['name']}' открыта по delo_id={subcategory['delo_id']}")
+            return True
+        logger.warning(f"[open_subcategory_form] Форма по delo_id={subcategory['delo_id']} не загрузилась, выбор через 'Изменить'")
+        incr_worker_counter("yellow_delo_id_fallback_total")
+    navigate(driver, search_url, "yellow_search")
+    verify_page(driver)
+    if not select_category_and_subcategory(driver, category_name, subcategory["name"]):
+        return False
+    verify_page(driver)
+    return wait_subcategory_form(driver)
+
+@timing_decorator
+def regular_type_court_check(driver, address,court_name, names,set_status, checkpoint):
     logger.info(f"[regular_type_court_check] Запуск проверки обычного типа суда по адресу: {address}")
     court_results = {}
 
     try:
         for name_to_check in names:
             logger.info(f"[regular_type_court_check] Проверка для имени: {name_to_check}")
-            driver.get(address)
+            navigate(driver, address, "court_home")
             verify_page(driver)
 
             logger.info(f"[regular_type_court_check] Поиск кнопки 'Судебное делопроизводство'")
@@ -562,7 +656,7 @@ def regular_type_court_check(driver, address,court_name, names,set_status):
 
             court_results.setdefault(court_name, {})[name_to_check] = {}
 
-            sud_delo_button.click()
+            click_and_wait(driver, sud_delo_button, "yellow_sud_delo")
             verify_page(driver)
 
             find_and_click_search_btn(driver)
@@ -570,59 +664,33 @@ def regular_type_court_check(driver, address,court_name, names,set_status):
 
             is_captcha_required = check_captcha(driver)
 
-            find_and_click_change_btn(driver)
-            verify_page(driver)
-            visited_categories = set()
-            category_buttons = get_category_and_subcategory_btns_new(driver)
-            logger.info(f"[regular_type_court_check] Категорий для обработки: {len(category_buttons)}")
+            search_url = driver.current_url
+            category_map = get_category_map(driver, address, search_url)
+            logger.info(f"[regular_type_court_check] Категорий для обработки: {len(category_map)}")
             logger.info("=== Начало итерации по категориям ===")
 
-            for category_name, subcategories in category_buttons.items():
-                if category_name in visited_categories:
-                    logger.debug(f"[regular_type_court_check] Категория '{category_name}' уже была обработана — пропускаем")
-                    continue
-
+            for category_name, subcategories in category_map.items():
                 logger.info(f"[regular_type_court_check] Обработка категории: {category_name}")
-                
+
                 for subcategory in subcategories:
-                    logger.info(f"[regular_type_court_check] Попытка нажать подкатегорию: {subcategory['name']}")
+                    cached = checkpoint.get(court_name, name_to_check, category_name, subcategory["name"])
+                    if cached is not None:
+                        court_results[court_name][name_to_check].setdefault(category_name, {})[subcategory["name"]] = cached
+                        continue
+                    logger.info(f"[regular_type_court_check] Открытие формы подкатегории: {subcategory['name']}")
                     current_subcategory = {
                         "category": category_name,
-                        "subcategory": subcategory["name"]
+                        "subcategory": subcategory["name"],
+                        "entry": subcategory,
+                        "search_url": search_url,
                     }
-                    fresh_category_buttons = get_category_and_subcategory_btns_new(driver)
-                    refreshed_element = next(
-                        (sub["element"] for sub in fresh_category_buttons.get(category_name, [])
-                        if sub["name"] == subcategory["name"]), None)
-
-                    if refreshed_element is None:
-                        logger.warning(f"[regular_type_court_check] Не удалось найти элемент подкатегории '{subcategory['name']}'")
-                        continue
-                    try:       
-                        WebDriverWait(driver, 1).until(EC.invisibility_of_element_located((By.ID, "divFSPopupBottom")))
-                    except TimeoutException:
-                        logger.info(f"[regular_type_court_check] Таблица выбора категории не пропала")
-                        driver.execute_script("""
-                            const el = document.getElementById('divFSPopupBottom');
-                            if (el) { el.style.display='none'; el.style.pointerEvents='none'; }
-                        """)
-                    refreshed_element.click()
-                    logger.info(f"[regular_type_court_check] Подкатегория '{subcategory['name']}' нажата")
                     set_status(f"Проверка категории {category_name}, подкатегория {subcategory['name']} : {name_to_check}", court_name)
-                    verify_page(driver)
-                    try:
-                        WebDriverWait(driver, 40).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, "#content .box.box_common.m-all_m"))
-                        )
-                        logger.debug(f"[regular_type_court_check] Вторая форма загружена")
-                    except TimeoutException:
-                        logger.warning(f"[regular_type_court_check] Вторая форма не загрузилась — подкатегория пропущена")
+                    if not open_subcategory_form(driver, search_url, category_name, subcategory):
+                        logger.warning(f"[regular_type_court_check] Форма подкатегории '{subcategory['name']}' не загрузилась — подкатегория пропущена")
                         continue
 
                     try:
-                        case_type_div = WebDriverWait(driver, 30).until(
-                            EC.presence_of_element_located((By.ID, "case_type"))
-                        )
+                        case_type_div = driver.find_element(By.ID, "case_type")
                         category_text = case_type_div.find_element(By.TAG_NAME, "div").text.strip()
                         logger.debug(f"[regular_type_court_check] Тип дел: {category_text}")
                     except Exception as e:
@@ -642,27 +710,19 @@ def regular_type_court_check(driver, address,court_name, names,set_status):
                     else:
                         try:
                             submit_button = driver.find_element(By.NAME, "Submit")
-                            submit_button.click()
+                            click_and_wait(driver, submit_button, "yellow_results")
                             verify_page(driver)
                             logger.info(f"[regular_type_court_check] Нажата кнопка 'Submit'")
                         except Exception as e:
                             logger.warning(f"[regular_type_court_check] Ошибка при нажатии 'Submit': {e}")
                             continue
 
-                    html_table = get_all_cases(driver)
-                    logger.info(f"[regular_type_court_check] Таблица дел получена ({len(html_table)} символов)")
+                    html_table = get_all_cases(driver, checkpoint.known(court_name, name_to_check, category_name, subcategory["name"]))
+                    logger.info(f"[regular_type_court_check] Таблица дел получена")
 
                     court_results[court_name][name_to_check].setdefault(category_name, {})[subcategory["name"]] = html_table
+                    checkpoint.save(court_name, name_to_check, category_name, subcategory["name"], result=html_table)
                     logger.success(f"[regular_type_court_check] Результат добавлен: {court_name} > {name_to_check} > {category_name} > {subcategory['name']}")
-
-                    find_and_click_back_btn(driver)
-                    logger.info(f"[regular_type_court_check] Выполнен возврат назад")
-                    verify_page(driver)
-                    find_and_click_change_btn(driver)
-                    verify_page(driver)
-                    logger.info(f"[regular_type_court_check] Нажата кнопка 'Изменить'")
-                # Добавляем в список посещённых категорий
-                visited_categories.add(category_name)
             logger.info("=== Конец итерации по имени ===")
             set_status(f"Проверка по ФИО: {name_to_check} завершена", court_name)
     except Exception as e:
@@ -681,8 +741,7 @@ def moder_find_and_send_surname_input(driver, name):
         surname_input = driver.find_element(By.ID, "parts__namess")
         logger.info(f"[moder_find_and_send_surname_input] Поле найдено. Начинаем посимвольный ввод")
 
-        for c in name:
-            surname_input.send_keys(c)
+        fill_input(driver, surname_input, name, "yellow", "parts__namess")
 
         logger.success(f"[moder_find_and_send_surname_input] Ввод имени '{name}' завершён")
 
@@ -747,8 +806,7 @@ def modern_find_and_send_captcha(driver):
 
     try:
         logger.info(f"[modern_find_and_send_captcha] Вводим капчу посимвольно (основная попытка)")
-        for c in captcha_text:
-            capcha_input.send_keys(c)
+        fill_input(driver, capcha_input, captcha_text, "yellow", "captcha")
         logger.success(f"[modern_find_and_send_captcha] Ввод капчи завершён успешно")
 
     except Exception as e:
@@ -758,8 +816,7 @@ def modern_find_and_send_captcha(driver):
             capcha_input = WebDriverWait(driver, 30).until(
                 EC.presence_of_element_located((By.NAME, "captcha"))
             )
-            for c in captcha_text:
-                capcha_input.send_keys(c)
+            fill_input(driver, capcha_input, captcha_text, "yellow", "captcha")
             logger.success(f"[modern_find_and_send_captcha] Повторный ввод капчи выполнен успешно")
         except Exception as e2:
             logger.exception(f"[modern_find_and_send_captcha] Повторный ввод капчи не удался: {e2}")
@@ -774,8 +831,8 @@ def modern_check_invalid_captcha_input(driver, name):
         error = driver.find_elements(By.ID, "error")
         if error:
             logger.warning(f"[modern_check_invalid_captcha_input] Обнаружена ошибка: неверная капча (ID='error')")
-            driver.back()
-            driver.refresh()
+            go_back(driver)
+            refresh_page(driver)
 
             logger.info(f"[modern_check_invalid_captcha_input] Повторный ввод капчи после ошибки")
             capcha_input = WebDriverWait(driver, 30).until(
@@ -790,8 +847,8 @@ def modern_check_invalid_captcha_input(driver, name):
         h3 = driver.find_element(By.TAG_NAME, "h3")
         if "Данный запрос некорректен" in h3.text:
             logger.warning(f"[modern_check_invalid_captcha_input] Ошибка: некорректный запрос (captcha invalid)")
-            driver.back()
-            driver.refresh()
+            go_back(driver)
+            refresh_page(driver)
 
             logger.info(f"[modern_check_invalid_captcha_input] Повторный ввод капчи после ошибки h3")
             capcha_input = WebDriverWait(driver, 30).until(
@@ -828,7 +885,7 @@ def modern_input_captcha_and_press_submit(driver, name):
             submit_button = WebDriverWait(driver, 30).until(
                 EC.element_to_be_clickable((By.ID, "searchBtn"))
             )
-            submit_button.click()
+            click_and_wait(driver, submit_button, "yellow_results")
             verify_page(driver)
             logger.info(f"[modern_input_captcha_and_press_submit] Нажата кнопка 'searchBtn'")
         except Exception as e:
@@ -864,12 +921,11 @@ def modern_extract_table_html(driver):
         return "<div class='placeholder'>Таблица не найдена</div>"
 
     try:
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        table = soup.find("table", class_="law-case-table")
+        table = get_element_html(driver, "table.law-case-table")
 
         if table:
             logger.success(f"[modern_extract_table_html] Таблица успешно найдена и извлечена")
-            return str(table)
+            return table
         else:
             logger.warning(f"[modern_extract_table_html] Таблица отсутствует в разметке — возвращается заглушка")
             return "<div class='placeholder'>Нет данных</div>"
@@ -892,7 +948,7 @@ def modern_check_and_get_next_page(driver):
         next_page_btn = WebDriverWait(driver, 10).until(
             EC.element_to_be_clickable((By.LINK_TEXT, "»"))
         )
-        next_page_btn.click()
+        click_and_wait(driver, next_page_btn, "yellow_results")
         verify_page(driver)
         logger.info(f"[modern_check_and_get_next_page] Кнопка 'Следующая страница' нажата")
 
@@ -907,7 +963,7 @@ def modern_check_and_get_next_page(driver):
         return "end"
 
 @timing_decorator
-def modern_get_all_cases(driver):
+def modern_get_all_cases(driver, known=None):
     logger.info(f"[modern_get_all_cases] Запуск парсинга результатов (modern)")
 
     logger.info(f"[modern_get_all_cases] Ожидание текста 'не найдено' или появления таблицы")
@@ -930,17 +986,19 @@ def modern_get_all_cases(driver):
         logger.warning(f"[modern_get_all_cases] Ни таблица, ни блок с ошибкой не появились за 30 секунд")
         return "<div class='placeholder'>Результаты не найдены</div>"
 
-    all_pages = []
+    tables = result_accumulator(known=known)
+    pages_count = 0
 
     try:
         first_page = modern_extract_table_html(driver)
-        all_pages.append(first_page)
+        tables.add(first_page)
+        pages_count += 1
         logger.info(f"[modern_get_all_cases] Первая страница сохранена (длина: {len(first_page)} символов)")
     except Exception as e:
         logger.exception(f"[modern_get_all_cases] Ошибка при извлечении первой страницы: {e}")
         return "<div class='placeholder'>Ошибка при парсинге первой страницы</div>"
 
-    while True:
+    while not tables.caught_up:
         logger.info(f"[modern_get_all_cases] Начало итерации цикла страниц")
         try:
             page = modern_check_and_get_next_page(driver)
@@ -954,11 +1012,14 @@ def modern_get_all_cases(driver):
             logger.info(f"[modern_get_all_cases] Достигнут конец страниц — завершение цикла")
             break
 
-        all_pages.append(page)
-        logger.info(f"[modern_get_all_cases] Добавлена новая страница. Всего страниц: {len(all_pages)}")
+        tables.add(page)
+        pages_count += 1
+        logger.info(f"[modern_get_all_cases] Добавлена новая страница. Всего страниц: {pages_count}")
+    if tables.caught_up:
+        logger.info(f"[modern_get_all_cases] Страница {pages_count} состоит из известных дел, остальные не загружаются")
 
     logger.success(f"[modern_get_all_cases] Все страницы собраны. Объединение таблиц")
-    return merge_html_tables(all_pages)
+    return tables.result()
 
 @timing_decorator
 def modern_find_and_click_search_btn(driver):
@@ -983,14 +1044,14 @@ def modern_find_and_click_search_btn(driver):
         return { "ошибка: Не удалось нажать кнопку 'Поиск информации по делам'" : "" }
 
 @timing_decorator    
-def modern_type_court_check(driver, address,court_name, names,set_status):
+def modern_type_court_check(driver, address,court_name, names,set_status, checkpoint):
     logger.info(f"[modern_type_court_check] Запуск проверки modern-суда по адресу: {address}")
     court_results = {}
 
     try:
         for name_to_check in names:
             logger.info(f"[modern_type_court_check] Проверка для ФИО: {name_to_check}")
-            driver.get(address)
+            navigate(driver, address, "court_home")
             verify_page(driver)
 
             all_links = driver.find_elements(By.CSS_SELECTOR, "a.menu__link")
@@ -1002,7 +1063,7 @@ def modern_type_court_check(driver, address,court_name, names,set_status):
 
             court_results.setdefault(court_name, {})[name_to_check] = {}
 
-            sud_delo_button.click()
+            click_and_wait(driver, sud_delo_button, "yellow_sud_delo")
             verify_page(driver)
 
             modern_find_and_click_search_btn(driver)
@@ -1035,6 +1096,10 @@ def modern_type_court_check(driver, address,court_name, names,set_status):
 
                     for sub in subcategories:
                         subcategory_name = sub["name"]
+                        cached = checkpoint.get(court_name, name_to_check, category_name, subcategory_name)
+                        if cached is not None:
+                            court_results[court_name][name_to_check].setdefault(category_name, {})[subcategory_name] = cached
+                            continue
                         logger.info(f"[modern_type_court_check] Подкатегория: {subcategory_name}")
                         set_status(f"Проверка категории {category_name}, подкатегория {subcategory_name} : {name_to_check}", court_name)
                         # Обновляем select и подкатегорию
@@ -1069,17 +1134,18 @@ def modern_type_court_check(driver, address,court_name, names,set_status):
                                 submit_button = WebDriverWait(driver, 10).until(
                                     EC.element_to_be_clickable((By.NAME, "Submit"))
                                 )
-                                submit_button.click()
+                                click_and_wait(driver, submit_button, "yellow_results")
                                 verify_page(driver)
                                 logger.info(f"[modern_type_court_check] Нажата кнопка 'Submit'")
                             except Exception as e:
                                 logger.warning(f"[modern_type_court_check] Ошибка при нажатии 'Submit': {e}")
                                 continue
 
-                        html_table = modern_get_all_cases(driver)
-                        logger.info(f"[modern_type_court_check] Таблица дел получена (длина: {len(html_table)} символов)")
+                        html_table = modern_get_all_cases(driver, checkpoint.known(court_name, name_to_check, category_name, subcategory_name))
+                        logger.info(f"[modern_type_court_check] Таблица дел получена")
 
                         court_results[court_name][name_to_check].setdefault(category_name, {})[subcategory_name] = html_table
+                        checkpoint.save(court_name, name_to_check, category_name, subcategory_name, result=html_table)
                         logger.success(f"[modern_type_court_check] Результат сохранён для подкатегории '{subcategory_name}'")
 
                         modern_find_and_click_search_btn(driver)
@@ -1098,150 +1164,188 @@ def modern_type_court_check(driver, address,court_name, names,set_status):
 
     return court_results
 
-@timing_decorator
-def multiserver_type_court_check(driver, address, court_name, names,set_status):
-    logger.info(f"[multiserver_type_court_check] Запуск проверки multiserver-суда по адресу: {address}")
-    court_results = {}
+def get_servers(driver, address):
+    """Серверы multi-суда из реестра, а если их там нет — из списка statUl на текущей странице"""
+    meta = get_court_meta(address)
+    if meta is not None and meta.servers:
+        return meta.servers
+    servers = [{"name": link.text.strip(), "url": link.get_attribute("href")}
+               for link in driver.find_elements(By.CSS_SELECTOR, ".statUl li a")]
+    if servers:
+        update_court_meta(address, servers=servers)
+    return servers
 
-    try:
-        for name_to_check in names:
-            logger.info(f"[multiserver_type_court_check] Проверка для ФИО: {name_to_check}")
-            driver.get(address)
-            verify_page(driver)
+@timing_decorator
+def server_type_court_check(driver, address, server, court_name, names, set_status, checkpoint):
+    """Полный обход категорий одного сервера multi-суда: {ФИО: {категория: {подкатегория: результат}}}"""
+    logger.info(f"[server_type_court_check] Проверка сервера '{server['name']}': {server['url']}")
+    server_results = {}
+    for name_to_check in names:
+        server_results[name_to_check] = {}
+        navigate(driver, server["url"])
+        verify_page(driver)
+        find_and_click_search_btn(driver)
+        verify_page(driver)
 
-            all_links = driver.find_elements(By.CSS_SELECTOR, "a.menu__link")
-            sud_delo_button = next((link for link in all_links if "sud_delo" in link.get_attribute("href")), None)
+        is_captcha_required = check_captcha(driver)
+        verify_page(driver)
 
-            if sud_delo_button is None:
-                logger.error(f"[multiserver_type_court_check] Кнопка 'Судебное делопроизводство' не найдена")
-                return {f"Сайт {address}": {"__error__": "Ошибка при работе с судом. Не найдена кнопка судебное делопроизводство"}}
+        search_url = driver.current_url
+        category_map = get_category_map(driver, address, search_url)
+        logger.info(f"[server_type_court_check] Сервер '{server['name']}', категорий найдено: {len(category_map)}")
 
-            ul = driver.find_element(By.CLASS_NAME, "statUl")
-            li_elements = ul.find_elements(By.TAG_NAME, "li")
+        for category_name, subcategories in category_map.items():
+            logger.info(f"[server_type_court_check] Категория: {category_name}")
 
-            for li in li_elements:
-                server_link = li.find_element(By.TAG_NAME, "a")
-                server_link.click()
-                verify_page(driver)
-                court_results.setdefault(court_name, {})[name_to_check] = {}
+            for subcategory in subcategories:
+                cached = checkpoint.get(court_name, name_to_check, server["name"], category_name, subcategory["name"])
+                if cached is not None:
+                    server_results[name_to_check].setdefault(category_name, {})[subcategory["name"]] = cached
+                    continue
+                logger.info(f"[server_type_court_check] Подкатегория: {subcategory['name']}")
+                current_subcategory = {
+                    "category": category_name,
+                    "subcategory": subcategory["name"],
+                    "entry": subcategory,
+                    "search_url": search_url,
+                }
+                set_status(f"Сервер {server['name']}: проверка категории {category_name}, подкатегория {subcategory['name']} : {name_to_check}", court_name)
+                if not open_subcategory_form(driver, search_url, category_name, subcategory):
+                    logger.warning("[server_type_court_check] Вторая форма не загрузилась — подкатегория пропущена")
+                    continue
 
-                sud_delo_button.click()
-                verify_page(driver)
-                find_and_click_search_btn(driver)
-                verify_page(driver)
+                try:
+                    case_type_div = driver.find_element(By.ID, "case_type")
+                    category_text = case_type_div.find_element(By.TAG_NAME, "div").text.strip()
+                    logger.debug(f"[server_type_court_check] Тип дела: {category_text}")
+                except Exception as e:
+                    logger.warning(f"[server_type_court_check] Ошибка получения типа дела: {e}")
+                    continue
 
-                is_captcha_required = check_captcha(driver)
+                find_and_send_surname_input(driver, name_to_check)
+                logger.info(f"[server_type_court_check] Введена фамилия: {name_to_check}")
                 verify_page(driver)
 
-                category_buttons = get_category_and_subcategory_btns_new(driver)
-                logger.info(f"[multiserver_type_court_check] Категорий найдено: {len(category_buttons)}")
-                logger.info("=== Начало итерации по категориям ===")
-
-                for category_name, subcategories in category_buttons.items():
-                    logger.info(f"[multiserver_type_court_check] Категория: {category_name}")
-
-                    for subcategory in subcategories:
-                        logger.info(f"[multiserver_type_court_check] Подкатегория: {subcategory['name']}")
-                        set_status(f"Проверка категории {category_name}, подкатегория {subcategory['name']} : {name_to_check}", court_name)
-                        fresh_category_buttons = get_category_and_subcategory_btns_new(driver)
-
-                        refreshed_element = next(
-                            (sub["element"] for sub in fresh_category_buttons.get(category_name, [])
-                             if sub["name"] == subcategory["name"]), None)
-
-                        if not refreshed_element:
-                            logger.warning(f"[multiserver_type_court_check] Не найдена подкатегория: {subcategory['name']}")
-                            continue
-
-                        WebDriverWait(driver, 10).until(EC.invisibility_of_element_located((By.ID, "divFSPopupBottom")))
-                        refreshed_element.click()
-                        verify_page(driver)
-                        logger.info(f"[multiserver_type_court_check] Клик по подкатегории '{subcategory['name']}' выполнен")
-
-                        verify_page(driver)
-                        try:
-                            WebDriverWait(driver, 50).until(
-                                EC.presence_of_element_located((By.CSS_SELECTOR, "#content .box.box_common.m-all_m"))
-                            )
-                            logger.debug("[multiserver_type_court_check] Вторая форма загружена")
-                        except TimeoutException:
-                            logger.warning("[multiserver_type_court_check] Вторая форма не загрузилась — подкатегория пропущена")
-                            continue
-
-                        try:
-                            case_type_div = WebDriverWait(driver, 30).until(
-                                EC.presence_of_element_located((By.ID, "case_type"))
-                            )
-                            category_text = case_type_div.find_element(By.TAG_NAME, "div").text.strip()
-                            logger.debug(f"[multiserver_type_court_check] Тип дела: {category_text}")
-                        except Exception as e:
-                            logger.warning(f"[multiserver_type_court_check] Ошибка получения типа дела: {e}")
-                            continue
-
-                        find_and_send_surname_input(driver, name_to_check)
-                        logger.info(f"[multiserver_type_court_check] Введена фамилия: {name_to_check}")
+                if is_captcha_required:
+                    if not input_captcha_and_press_submit(driver, name_to_check, current_subcategory):
+                        logger.warning("[server_type_court_check] Не удалось решить капчу")
+                        continue
+                else:
+                    try:
+                        submit_button = driver.find_element(By.NAME, "Submit")
+                        click_and_wait(driver, submit_button, "yellow_results")
                         verify_page(driver)
+                        logger.info("[server_type_court_check] Нажата кнопка 'Submit'")
+                    except Exception as e:
+                        logger.warning(f"[server_type_court_check] Ошибка при нажатии Submit: {e}")
+                        continue
 
-                        if is_captcha_required:
-                            if not input_captcha_and_press_submit(driver, name_to_check):
-                                logger.warning("[multiserver_type_court_check] Не удалось решить капчу")
-                                continue
-                        else:
-                            try:
-                                submit_button = driver.find_element(By.NAME, "Submit")
-                                submit_button.click()
-                                verify_page(driver)
-                                logger.info("[multiserver_type_court_check] Нажата кнопка 'Submit'")
-                            except Exception as e:
-                                logger.warning(f"[multiserver_type_court_check] Ошибка при нажатии Submit: {e}")
-                                continue
-
-                        html_table = get_all_cases(driver)
-                        logger.info(f"[multiserver_type_court_check] Таблица дел получена (длина: {len(html_table)} символов)")
-
-                        court_results[court_name][name_to_check].setdefault(category_name, {})[subcategory["name"]] = html_table
-                        logger.success("[multiserver_type_court_check] Результат успешно добавлен")
+                html_table = get_all_cases(driver, checkpoint.known(court_name, name_to_check, server["name"], category_name, subcategory["name"]))
+                logger.info(f"[server_type_court_check] Таблица дел получена")
+                server_results[name_to_check].setdefault(category_name, {})[subcategory["name"]] = html_table
+                checkpoint.save(court_name, name_to_check, server["name"], category_name, subcategory["name"], result=html_table)
+    return server_results
 
-                        find_and_click_back_btn(driver)
-                        logger.info("[multiserver_type_court_check] Выполнен возврат назад")
+def leased_server_check(address, server, court_name, names, set_status, checkpoint):
+    """Проверка сервера в отдельном драйвере (своя сессия сайта и своя капча). None — свободного драйвера нет"""
+    stack = ExitStack()
+    try:
+        server_driver = stack.enter_context(lease_driver(timeout=settings.YELLOW_SERVER_LEASE_TIMEOUT))
+    except RuntimeError as e:
+        logger.warning(f"[leased_server_check] Нет свободного драйвера для сервера '{server['name']}': {e}")
+        return None
+    with stack:
+        return server_type_court_check(server_driver, address, server, court_name, names, set_status, checkpoint)
+
+def merge_server_results(court_results, server, server_results):
+    """
+    Добавляет результаты сервера в court_results[court_name]. Подкатегория, которая уже пришла
+    с другого сервера, записывается с названием сервера в скобках, чтобы не затереть результат.
+    """
+    for name_to_check, categories in server_results.items():
+        name_results = court_results.setdefault(name_to_check, {})
+        for category_name, subcategories in categories.items():
+            category_results = name_results.setdefault(category_name, {})
+            for subcategory_name, result in subcategories.items():
+                if subcategory_name in category_results:
+                    subcategory_name = f"{subcategory_name} ({server['name']})"
+                category_results[subcategory_name] = result
 
-                        verify_page(driver)
-                        find_and_click_change_btn(driver)
-                        logger.info("[multiserver_type_court_check] Нажата кнопка 'Изменить'")
-                        verify_page(driver)
-                logger.info("=== Конец итерации по имени ===")
-                set_status(f"Проверка по ФИО: {name_to_check} завершена", court_name)
+@timing_decorator
+def multiserver_type_court_check(driver, address, court_name, names,set_status, checkpoint):
+    """
+    Проверка суда с несколькими серверами. Первый сервер обходится в текущем драйвере,
+    остальные — одновременно в отдельных драйверах (до YELLOW_SERVER_WORKERS), результаты
+    объединяются в порядке серверов.
+    """
+    logger.info(f"[multiserver_type_court_check] Запуск проверки multiserver-суда по адресу: {address}")
+    servers = get_servers(driver, address)
+    if not servers:
+        logger.error(f"[multiserver_type_court_check] Список серверов statUl не найден")
+        return {f"Сайт {address}": {"__error__": "Ошибка при работе с судом. Не найден список серверов"}}
+    logger.info(f"[multiserver_type_court_check] Серверов: {len(servers)}")
+
+    results = [None] * len(servers)
+    workers = min(max(settings.YELLOW_SERVER_WORKERS, 1), len(servers))
+    try:
+        with ThreadPoolExecutor(max_workers=max(workers - 1, 1)) as executor:
+            futures = {}
+            if workers > 1:
+                futures = {index: executor.submit(copy_context().run, leased_server_check, address, server, court_name, names, set_status, checkpoint)
+                           for index, server in enumerate(servers[1:], start=1)}
+            results[0] = server_type_court_check(driver, address, servers[0], court_name, names, set_status, checkpoint)
+            for index in range(1, len(servers)):
+                if index in futures:
+                    try:
+                        results[index] = futures[index].result()
+                    except Exception as e:
+                        logger.warning(f"[multiserver_type_court_check] Сервер '{servers[index]['name']}' не проверен в отдельном драйвере: {e}")
+                if results[index] is None:
+                    # Свободного драйвера не было или проверка упала — повтор в текущем драйвере
+                    results[index] = server_type_court_check(driver, address, servers[index], court_name, names, set_status, checkpoint)
     except Exception as e:
         logger.exception(f"[multiserver_type_court_check] Критическая ошибка при проверке: {e}")
         raise
 
+    court_results = {court_name: {}}
+    for server, server_results in zip(servers, results):
+        merge_server_results(court_results[court_name], server, server_results)
+    for name_to_check in names:
+        set_status(f"Проверка по ФИО: {name_to_check} завершена", court_name)
     return court_results
 
 @timing_decorator
 def check_court_availible(driver,address):
-    driver.get(address)
-    logger.info(f"[check_court_availible] Страница загружена")
-    WebDriverWait(driver, 30).until(
-        EC.presence_of_element_located((By.CSS_SELECTOR, "a.menu__link"))
-    )
-    all_links = driver.find_elements(By.CSS_SELECTOR, "a.menu__link")
-    sud_delo_button = None
-
-    for link in all_links:
-        href = link.get_attribute("href")
-        if "sud_delo" in href:
-            sud_delo_button = link
-            break
+    meta = get_court_meta(address)
+    if meta is not None and meta.sud_delo_url:
+        # Адрес раздела известен из реестра — главная страница не нужна
+        logger.info(f"[check_court_availible] Переход на страницу из реестра: {meta.sud_delo_url}")
+        navigate(driver, meta.sud_delo_url, "yellow_sud_delo")
+        verify_page(driver)
+    else:
+        navigate(driver, address, "court_home")
+        logger.info(f"[check_court_availible] Страница загружена")
+        WebDriverWait(driver, 30).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "a.menu__link"))
+        )
+        all_links = driver.find_elements(By.CSS_SELECTOR, "a.menu__link")
+        sud_delo_button = None
 
-    if sud_delo_button is None:
-        logger.error(f"[check_court_availible] Не найдена кнопка 'Судебное делопроизводство' на сайте {address}")
-        return {f"Сайт {address}": {"__error__": "Ошибка при работе с судом. Не найдено кнопка судебное делопроизовдство"}}
+        for link in all_links:
+            href = link.get_attribute("href")
+            if "sud_delo" in href:
+                sud_delo_button = link
+                break
 
-    logger.info(f"[check_court_availible] Кнопка 'Судебное делопроизводство' найдена — выполняется переход")
-    driver.execute_script("arguments[0].scrollIntoView(true);", sud_delo_button)
-    time.sleep(0.3)
-    sud_delo_button.click()
-    verify_page(driver)
+        if sud_delo_button is None:
+            logger.error(f"[check_court_availible] Не найдена кнопка 'Судебное делопроизводство' на сайте {address}")
+            return {f"Сайт {address}": {"__error__": "Ошибка при работе с судом. Не найдено кнопка судебное делопроизовдство"}}
+
+        logger.info(f"[check_court_availible] Кнопка 'Судебное делопроизводство' найдена — выполняется переход")
+        driver.execute_script("arguments[0].scrollIntoView(true);", sud_delo_button)
+        wait_for(driver, EC.element_to_be_clickable(sud_delo_button), "click", 5)
+        click_and_wait(driver, sud_delo_button, "yellow_sud_delo")
+        verify_page(driver)
     try:
         element = WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.CSS_SELECTOR, ".box.box_common.m-all_m")))
         if "Информация временно недоступна" in element.text:
@@ -1254,7 +1358,8 @@ def check_court_availible(driver,address):
         return{f"Сайт {address}": {"__error__": "Ошибка при работе с судом. Информация временно недоступна"}}
 
 @timing_decorator
-def parse_court_yellow(driver, address,court_name,fullname,set_status):
+def parse_court_yellow(driver, address,court_name,fullname,set_status, checkpoint=None):
+    checkpoint = checkpoint or Checkpoint()
     logger.info(f"[parse_court_yellow] Запуск параллельной проверки судов по адресу {address}.")
     names = make_name_initials(fullname)
     court_type = get_court_type(driver,address)
@@ -1264,17 +1369,17 @@ def parse_court_yellow(driver, address,court_name,fullname,set_status):
     court_result = {}
     if(court_type == "regular"):
         if(is_court_availible):
-            court_result = regular_type_court_check(driver,address,court_name,names,set_status)
+            court_result = regular_type_court_check(driver,address,court_name,names,set_status,checkpoint)
             return court_result 
         return{f"Сайт {address}": {"__error__": "Сайт не работает. Информация временно недоступна"}}
     if(court_type == "modern"):
         if(is_court_availible):
-            court_result = modern_type_court_check(driver,address,court_name,names,set_status)
+            court_result = modern_type_court_check(driver,address,court_name,names,set_status,checkpoint)
             return court_result
         return{f"Сайт {address}": {"__error__": "Сайт не работает. Информация временно недоступна"}}
     if(court_type == "multi"):
         if(is_court_availible):
-            court_result = multiserver_type_court_check(driver,address,court_name,names,set_status)
+            court_result = multiserver_type_court_check(driver,address,court_name,names,set_status,checkpoint)
             return court_result
         return{f"Сайт {address}": {"__error__": "Сайт не работает. Информация временно недоступна"}}
     if(court_type == "unavailable"):
@@ -0,0 +1,160 @@
+from base64 import b64decode
+
+from app.captcha.orc_model_yellow_integration import predict_captcha_from_bytes
+from app.parsers.courts.records import result_accumulator
+from app.parsers.courts.async_utils import verify_page_async, predict_async
+from app.parsers.courts.utils import make_name_initials
+from app.services.async_browser import AsyncFlowUnsupported, set_status_async
+from app.services.court_registry import get_court_meta, update_court_meta
+from app.services.checkpoints import Checkpoint
+from app.utils.logger import logger
+
+MAX_RETRIES = 15
+
+SEARCH_LINK = "//a[b[contains(text(),'Поиск информации по делам')]]"
+CHANGE_LINK = "//a[text()='Изменить']"
+NEXT_PAGE_LINK = "//a[@title='Следующая страница']"
+SURNAME_INPUT = "//td[text()='Фамилия']/following-sibling::td/input"
+
+# Категории и подкатегории из всплывающего окна "Изменить" (как get_category_and_subcategory_btns_new)
+CATEGORIES_JS = """(() => {
+    const content = document.getElementById('content');
+    if (!content) return [];
+    const result = [];
+    let category = null;
+    content.querySelectorAll('div').forEach((div, index) => {
+        const strong = div.querySelector('strong');
+        if (strong) {
+            category = strong.innerText.trim();
+            return;
+        }
+        if ((div.getAttribute('style') || '').includes('padding-left: 30px') && div.getAttribute('onclick')
+                && category && category !== 'Отмена') {
+            result.push([category, div.innerText.trim(), index]);
+        }
+    });
+    return result;
+})()"""
+
+async def open_sud_delo(page, address):
+    await page.get(address)
+    await verify_page_async(page)
+    await page.wait_for("!!document.querySelector('a.menu__link')", timeout=30)
+    if not await page.exists("a.menu__link[href*='sud_delo']"):
+        raise RuntimeError(f"Ошибка при работе с судом: {address}")
+    await page.click("a.menu__link[href*='sud_delo']", navigate=True)
+    await verify_page_async(page)
+
+async def get_court_layout(page):
+    if await page.exists(".statUl"):
+        return "multi"
+    if await page.exists(".round-border-container"):
+        return "modern"
+    if await page.exists(".error_errorer"):
+        return "unavailable"
+    return "regular"
+
+async def open_categories(page):
+    await page.click(CHANGE_LINK)
+    await page.wait_for("!!document.querySelector(\"div[onclick*='select_delo_id_new']\")", timeout=30)
+
+async def select_subcategory(page, index):
+    await page.evaluate(f"""(() => {{
+        const popup = document.getElementById('divFSPopupBottom');
+        if (popup) {{ popup.style.display = 'none'; popup.style.pointerEvents = 'none'; }}
+        document.getElementById('content').querySelectorAll('div')[{index}].click();
+    }})()""")
+    await page.wait_for("!!document.querySelector('#content .box.box_common.m-all_m') && !!document.getElementById('case_type')", timeout=40)
+
+async def solve_captcha_async(page):
+    src = await page.evaluate("""(() => {
+        const input = document.querySelector('[name="captcha"]');
+        const td = input && input.closest('td');
+        const img = td && td.querySelector('img');
+        return img ? img.getAttribute('src') : null;
+    })()""")
+    src = (src or "").replace(" ", "")
+    if not src.startswith("data:image"):
+        raise RuntimeError("Captcha not in base64 fromat: " + src[:30])
+    return await predict_async(predict_captcha_from_bytes, b64decode(src.split(",")[1]))
+
+async def submit_search(page, name_to_check, index, is_captcha_required):
+    """Вводит ФИО (и капчу) и отправляет форму. Возвращает False, если капчу пройти не удалось"""
+    for tries in range(MAX_RETRIES):
+        await page.fill(SURNAME_INPUT, name_to_check)
+        if is_captcha_required:
+            await page.fill('[name="captcha"]', await solve_captcha_async(page))
+        await page.click('[name="Submit"]', navigate=True)
+        await verify_page_async(page)
+        error = await page.text("#error") or ""
+        heading = await page.text("h3") or ""
+        if "Неверно указан проверочный код" not in error and "Данный запрос некорректен" not in heading:
+            return True
+        logger.warning(f"[submit_search] Капча введена неверно, попытка {tries + 1}/{MAX_RETRIES}")
+        await page.click(SEARCH_LINK, navigate=True)
+        await open_categories(page)
+        await select_subcategory(page, index)
+    return False
+
+async def get_all_cases_async(page, known=None):
+    await page.wait_for("!!(document.getElementById('tablcont') || document.getElementById('error'))", timeout=30)
+    if await page.exists("#error"):
+        return "<div class='placeholder'>Дела не найдены</div>"
+    tables = result_accumulator(clean=True, known=known)
+    while not tables.caught_up:
+        tables.add(await page.outer_html("table#tablcont") or "<div class='placeholder'>Нет данных</div>")
+        if not await page.exists(NEXT_PAGE_LINK):
+            break
+        await page.click(NEXT_PAGE_LINK, navigate=True)
+        await verify_page_async(page)
+    return tables.result()
+
+async def parse_court_yellow_async(page, address, court_name, fullname, set_status, checkpoint=None):
+    """
+    Асинхронный аналог parse_court_yellow. Поддерживает только обычную вёрстку сайта,
+    для modern и multi выбрасывает AsyncFlowUnsupported.
+    """
+    checkpoint = checkpoint or Checkpoint()
+    names = make_name_initials(fullname)
+    meta = get_court_meta(address)
+    if meta is not None and meta.layout and meta.layout != "regular":
+        raise AsyncFlowUnsupported(f"Тип сайта {meta.layout} поддерживается только синхронной проверкой")
+    await open_sud_delo(page, address)
+    layout = await get_court_layout(page)
+    if meta is None or not meta.layout:
+        if layout != "unavailable":
+            update_court_meta(address, layout=layout, sud_delo_url=await page.url())
+    if layout != "regular":
+        raise AsyncFlowUnsupported(f"Тип сайта {layout} поддерживается только синхронной проверкой")
+    box_text = await page.text(".box.box_common.m-all_m") or ""
+    if "Информация временно недоступна" in box_text:
+        return {f"Сайт {address}": {"__error__": "Сайт не работает. Информация временно недоступна"}}
+    await set_status_async(set_status, f"Начало проверки", court_name)
+    court_results = {}
+    for name_to_check in names:
+        court_results.setdefault(court_name, {})[name_to_check] = {}
+        await open_sud_delo(page, address)
+        await page.click(SEARCH_LINK, navigate=True)
+        await verify_page_async(page)
+        is_captcha_required = await page.exists("#captcha")
+        await open_categories(page)
+        subcategories = await page.evaluate(CATEGORIES_JS)
+        logger.info(f"[parse_court_yellow_async] Подкатегорий для обработки: {len(subcategories)}")
+        for category_name, subcategory_name, index in subcategories:
+            cached = checkpoint.get(court_name, name_to_check, category_name, subcategory_name)
+            if cached is not None:
+                court_results[court_name][name_to_check].setdefault(category_name, {})[subcategory_name] = cached
+                continue
+            await set_status_async(set_status, f"Проверка категории {category_name}, подкатегория {subcategory_name} : {name_to_check}", court_name)
+            await select_subcategory(page, index)
+            if await submit_search(page, name_to_check, index, is_captcha_required):
+                html_table = await get_all_cases_async(page, checkpoint.known(court_name, name_to_check, category_name, subcategory_name))
+                court_results[court_name][name_to_check].setdefault(category_name, {})[subcategory_name] = html_table
+                checkpoint.save(court_name, name_to_check, category_name, subcategory_name, result=html_table)
+            else:
+                logger.warning(f"[parse_court_yellow_async] Не удалось решить капчу")
+            await page.click(SEARCH_LINK, navigate=True)
+            await verify_page_async(page)
+            await open_categories(page)
+        await set_status_async(set_status, f"Проверка по ФИО: {name_to_check} завершена", court_name)
+    return court_results
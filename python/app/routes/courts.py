@@ -22,6 +22,7 @@ async def check_courts(data: CourtCheckModel, request: Request):
         data: Данные для проверки
             - address: Список URL адресов судов для проверки
             - fullname: ФИО для проверки (объект PersonInitials)
+            - max_age: Допустимый возраст результата из кэша в секундах (0 — всегда проверять заново)
     
     Returns:
         CourtResponseModel: Результат проверки с названием суда
@@ -50,7 +51,8 @@ async def check_courts(data: CourtCheckModel, request: Request):
     checker = request.app.state.check_service
     try:
         # fullname — это объект PersonInitials, преобразуем в dict для передачи в Celery
-        result = checker.check_courts(data.address, data.fullname.model_dump())
+        addresses = [data.address] if isinstance(data.address, str) else data.address
+        result = checker.check_courts(addresses, data.fullname.model_dump(), max_age=data.max_age)
         return CourtResponseModel(
             success=True,
             status="queued",
@@ -4,7 +4,9 @@ from fastapi import APIRouter, Request, Response
 
 from app.metrics.redis_client import (get_court_check_size,
                                       get_court_verify_size, get_queue_size_redis,
-                                      get_court_last_check_time)
+                                      get_court_last_check_time, get_worker_counters,
+                                      get_worker_gauges)
+from app.services.circuit_breaker import get_breaker_states
 
 from app.schemas.schemas import QueueSizeResponseModel
 
@@ -52,4 +54,16 @@ async def get_queue_size(request: Request):
         celery_court_last_check_time_blue=result["celery_court_last_check_time_blue"],
         celery_court_last_check_time_yellow=result["celery_court_last_check_time_yellow"],
         celery_court_last_check_time_spb=result["celery_court_last_check_time_spb"]
-    )
\ No newline at end of file
+    )
+
+@router.get("/metrics/worker")
+async def get_worker_metrics(request: Request):
+    """
+    Эндпоинт для получения метрик воркеров Celery (пул браузеров, капча, кэш и т.д.)
+    и состояния выключателей сайтов судов
+    """
+    return {
+        "counters": get_worker_counters(),
+        "gauges": get_worker_gauges(),
+        "breakers": get_breaker_states()
+    }
@@ -1,8 +1,10 @@
 import asyncio
 import json
+from typing import Literal
 from fastapi import APIRouter, Request
 from fastapi.responses import StreamingResponse
 from app.celery.celery_app import celery_app
+from app.parsers.courts.records import render_results
 from celery.result import GroupResult, AsyncResult
 from app.metrics.redis_client import (get_court_check_size,
                                       get_court_verify_size, get_queue_size_redis,
@@ -29,7 +31,11 @@ async def stream_verify_courts_result(task_id: str, request: Request):
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
 @router.get("/courts/check/stream/{task_id}")
-async def stream_check_courts_result(task_id: str, request: Request):
+async def stream_check_courts_result(task_id: str, request: Request, format: Literal["html", "records"] = "html"):
+    """
+    SSE-эндпоинт статуса и результата проверки судов.
+    format=html — дела отдаются HTML-таблицами, format=records — записями {"columns": [...], "rows": [...]}.
+    """
     async def event_generator():
         group_result = GroupResult.restore(task_id, app=celery_app)
         if not group_result:
@@ -57,6 +63,8 @@ async def stream_check_courts_result(task_id: str, request: Request):
                 yield f"data: {json.dumps({'status': 'progress', 'subtasks': statuses}, ensure_ascii=False)}\n\n"
             await asyncio.sleep(1)
         results = group_result.get()
+        if format == "html":
+            results = render_results(results)
         yield f"data: {json.dumps({'status': 'success', 'result': results}, ensure_ascii=False)}\n\n"
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
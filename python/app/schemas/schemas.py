@@ -1,4 +1,4 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Union, Literal, Any
 import re
 
@@ -55,6 +55,7 @@ class CourtResponseModel(BaseModel):
 class CourtCheckModel(BaseModel):
     address: Union[str, List[str]]
     fullname: PersonInitials
+    max_age: int = Field(0, ge=0)
 
 class CourtVerifyModel(BaseModel):
     address: Union[str, List[str]]
@@ -0,0 +1,324 @@
+import asyncio
+import base64
+import itertools
+import json
+import threading
+from contextlib import asynccontextmanager
+
+import requests
+import websockets
+from fake_useragent import UserAgent
+
+from app.config.settings import settings
+from app.services.browser import get_shared_browser
+from app.services.host_governor import host_slot_async
+from app.services.waits import backoff_delays, sleep_async
+from app.metrics.redis_client import set_worker_gauge
+from app.utils.logger import logger
+
+
+class CDPError(Exception):
+    """Ошибка, которую вернул Chromium в ответ на команду DevTools"""
+
+
+class AsyncFlowUnsupported(Exception):
+    """Асинхронный сценарий не поддерживает этот сайт — нужна синхронная проверка через Selenium"""
+
+
+class CDPConnection:
+    """Одно websocket-соединение DevTools с браузером, сессии вкладок мультиплексируются в нём"""
+    def __init__(self):
+        self.ws = None
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._listeners = {}
+        self._reader = None
+
+    async def connect(self, ws_url):
+        self.ws = await websockets.connect(ws_url, max_size=None, ping_interval=None)
+        self._reader = asyncio.ensure_future(self._read())
+
+    @property
+    def closed(self):
+        return self._reader is None or self._reader.done()
+
+    async def send(self, method, params=None, session_id=None, timeout=60):
+        message_id = next(self._ids)
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        try:
+            await self.ws.send(json.dumps(message))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(message_id, None)
+
+    def on(self, session_id, event, callback):
+        self._listeners.setdefault((session_id, event), []).append(callback)
+
+    def off(self, session_id):
+        for key in [key for key in self._listeners if key[0] == session_id]:
+            del self._listeners[key]
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def _read(self):
+        try:
+            async for raw in self.ws:
+                message = json.loads(raw)
+                if "id" in message:
+                    future = self._pending.get(message["id"])
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(CDPError(message["error"].get("message")))
+                    else:
+                        future.set_result(message.get("result", {}))
+                    continue
+                for callback in self._listeners.get((message.get("sessionId"), message.get("method")), []):
+                    callback(message.get("params", {}))
+        except websockets.ConnectionClosed:
+            logger.warning(f"[CDPConnection] Соединение с браузером закрыто")
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(CDPError("Соединение с браузером закрыто"))
+
+
+def element_js(selector):
+    """JS-выражение для поиска элемента: селекторы, начинающиеся с "//", считаются XPath, остальные — CSS"""
+    if selector.startswith("//"):
+        return f"document.evaluate({json.dumps(selector)}, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue"
+    return f"document.querySelector({json.dumps(selector)})"
+
+
+class AsyncPage:
+    """
+    Асинхронный драйвер одной вкладки в изолированном контексте браузера.
+    Все проверки элементов выполняются скриптами внутри страницы.
+    """
+    def __init__(self, connection, context_id, target_id, session_id):
+        self.connection = connection
+        self.context_id = context_id
+        self.target_id = target_id
+        self.session_id = session_id
+        self._load_waiters = []
+        connection.on(session_id, "Page.domContentEventFired", self._on_loaded)
+        connection.on(session_id, "Page.javascriptDialogOpening", self._on_dialog)
+
+    async def setup(self, resource_policy=None):
+        await self.send("Page.enable")
+        await self.send("Network.enable")
+        await self.send("Network.setUserAgentOverride", {"userAgent": UserAgent().random})
+        if resource_policy:
+            await self.send("Network.setBlockedURLs", {"urls": resource_policy.patterns()})
+
+    async def send(self, method, params=None, timeout=60):
+        return await self.connection.send(method, params, self.session_id, timeout)
+
+    async def get(self, url, timeout=60):
+        async with host_slot_async(url):
+            loaded = self._expect_load()
+            result = await self.send("Page.navigate", {"url": url}, timeout)
+            if result.get("errorText"):
+                raise CDPError(f"Не удалось открыть {url}: {result['errorText']}")
+            await asyncio.wait_for(loaded, timeout)
+
+    async def reload(self, timeout=60):
+        async with host_slot_async(await self.url()):
+            loaded = self._expect_load()
+            await self.send("Page.reload")
+            await asyncio.wait_for(loaded, timeout)
+
+    async def evaluate(self, expression, await_promise=False):
+        result = await self.send("Runtime.evaluate", {
+            "expression": expression,
+            "returnByValue": True,
+            "awaitPromise": await_promise,
+        })
+        if "exceptionDetails" in result:
+            raise CDPError(result["exceptionDetails"].get("text", "Ошибка выполнения скрипта"))
+        return result.get("result", {}).get("value")
+
+    async def wait_for(self, expression, timeout=30, interval=0.25):
+        """
+        Ждёт, пока выражение в странице не станет истинным, и возвращает его значение.
+        Паузы между проверками растут от WAIT_POLL_INTERVAL до interval
+        """
+        deadline = asyncio.get_running_loop().time() + timeout
+        delays = backoff_delays(settings.WAIT_POLL_INTERVAL, interval)
+        while True:
+            try:
+                value = await self.evaluate(expression)
+                if value:
+                    return value
+            except CDPError:
+                # Контекст страницы мог пересоздаться во время навигации
+                pass
+            if asyncio.get_running_loop().time() >= deadline:
+                raise asyncio.TimeoutError(f"Не дождались условия: {expression[:80]}")
+            await sleep_async(min(next(delays), max(deadline - asyncio.get_running_loop().time(), 0)))
+
+    async def exists(self, selector):
+        return bool(await self.evaluate(f"!!{element_js(selector)}"))
+
+    async def url(self):
+        return await self.evaluate("location.href")
+
+    async def html(self):
+        return await self.evaluate("document.documentElement.outerHTML")
+
+    async def title(self):
+        return await self.evaluate("document.title")
+
+    async def text(self, selector):
+        return await self.evaluate(f"(() => {{ const el = {element_js(selector)}; return el ? el.innerText : null; }})()")
+
+    async def outer_html(self, selector):
+        return await self.evaluate(f"(() => {{ const el = {element_js(selector)}; return el ? el.outerHTML : null; }})()")
+
+    async def click(self, selector, navigate=False, timeout=60):
+        loaded = self._expect_load() if navigate else None
+        clicked = await self.evaluate(f"(() => {{ const el = {element_js(selector)}; if (!el) return false; el.click(); return true; }})()")
+        if not clicked:
+            if loaded is not None:
+                loaded.cancel()
+            raise CDPError(f"Элемент для клика не найден: {selector}")
+        if loaded is not None:
+            await asyncio.wait_for(loaded, timeout)
+
+    async def fill(self, selector, text):
+        """Вводит текст как пользователь: фокус на поле и один вызов Input.insertText"""
+        focused = await self.evaluate(f"""(() => {{
+            const el = {element_js(selector)};
+            if (!el) return false;
+            el.focus(); el.value = '';
+            el.dispatchEvent(new Event('input', {{bubbles: true}}));
+            return true;
+        }})()""")
+        if not focused:
+            raise CDPError(f"Поле для ввода не найдено: {selector}")
+        await self.send("Input.insertText", {"text": text})
+        await self.evaluate(f"{element_js(selector)}.dispatchEvent(new Event('change', {{bubbles: true}}))")
+
+    async def screenshot_element(self, selector):
+        rect = await self.evaluate(f"""(() => {{
+            const el = {element_js(selector)};
+            if (!el) return null;
+            el.scrollIntoView();
+            const r = el.getBoundingClientRect();
+            return {{x: r.x + window.scrollX, y: r.y + window.scrollY, width: r.width, height: r.height}};
+        }})()""")
+        if not rect:
+            raise CDPError(f"Элемент для снимка не найден: {selector}")
+        result = await self.send("Page.captureScreenshot", {"format": "png", "clip": dict(rect, scale=1), "captureBeyondViewport": True})
+        return base64.b64decode(result["data"])
+
+    def _expect_load(self):
+        future = asyncio.get_running_loop().create_future()
+        self._load_waiters.append(future)
+        return future
+
+    def _on_loaded(self, params):
+        waiters, self._load_waiters = self._load_waiters, []
+        for future in waiters:
+            if not future.done():
+                future.set_result(True)
+
+    def _on_dialog(self, params):
+        logger.warning(f"[AsyncPage] Закрыт alert: {params.get('message')!r}")
+        asyncio.ensure_future(self.send("Page.handleJavaScriptDialog", {"accept": True}))
+
+
+class AsyncBrowser:
+    """Асинхронное подключение к общему Chromium воркера"""
+    def __init__(self, shared_browser=None):
+        self.shared_browser = shared_browser or get_shared_browser()
+        self.connection = None
+        self._lock = asyncio.Lock()
+
+    async def connect(self):
+        async with self._lock:
+            if self.connection is not None and not self.connection.closed:
+                return
+            await asyncio.to_thread(self.shared_browser.start)
+            version_url = f"http://127.0.0.1:{self.shared_browser.port}/json/version"
+            response = await asyncio.to_thread(requests.get, version_url, timeout=10)
+            self.connection = CDPConnection()
+            await self.connection.connect(response.json()["webSocketDebuggerUrl"])
+            logger.success(f"[AsyncBrowser] Подключение к общему Chromium установлено")
+
+    @asynccontextmanager
+    async def page(self):
+        await self.connect()
+        connection = self.connection
+        context_id = (await connection.send("Target.createBrowserContext", {"disposeOnDetach": True}))["browserContextId"]
+        session_id = None
+        try:
+            target_id = (await connection.send("Target.createTarget", {"url": "about:blank", "browserContextId": context_id}))["targetId"]
+            session_id = (await connection.send("Target.attachToTarget", {"targetId": target_id, "flatten": True}))["sessionId"]
+            page = AsyncPage(connection, context_id, target_id, session_id)
+            await page.setup(self.shared_browser.resource_policy)
+            yield page
+        finally:
+            # Подписки без сессии (None) относятся ко всему браузеру и не удаляются
+            if session_id is not None:
+                connection.off(session_id)
+            try:
+                await connection.send("Target.disposeBrowserContext", {"browserContextId": context_id})
+            except Exception as e:
+                logger.error(f"[AsyncBrowser] Ошибка при удалении контекста {context_id}: {e}")
+
+
+class AsyncBrowserRuntime:
+    """
+    Цикл событий в отдельном потоке воркера. Потоки Celery отдают ему сценарии проверки
+    и ждут результат, а сами сессии с судами мультиплексируются в одном цикле.
+    """
+    def __init__(self, max_sessions=settings.ASYNC_MAX_SESSIONS):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="async-browser", daemon=True)
+        self.thread.start()
+        self.browser = None
+        self.max_sessions = max_sessions
+        self._semaphore = None
+        self._active = 0
+        asyncio.run_coroutine_threadsafe(self._init(), self.loop).result()
+
+    async def _init(self):
+        self.browser = AsyncBrowser()
+        self._semaphore = asyncio.Semaphore(self.max_sessions)
+
+    def run(self, flow, *args):
+        """Выполняет flow(page, *args) в отдельном контексте браузера и возвращает результат"""
+        return asyncio.run_coroutine_threadsafe(self._run(flow, *args), self.loop).result()
+
+    async def _run(self, flow, *args):
+        async with self._semaphore:
+            self._active += 1
+            set_worker_gauge("async_browser_sessions", self._active)
+            try:
+                async with self.browser.page() as page:
+                    return await flow(page, *args)
+            finally:
+                self._active -= 1
+                set_worker_gauge("async_browser_sessions", self._active)
+
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+def get_async_runtime():
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = AsyncBrowserRuntime()
+        return _runtime
+
+async def set_status_async(set_status, text, court_name):
+    """set_status пишет в Redis синхронно, поэтому выполняется вне цикла событий"""
+    await asyncio.to_thread(set_status, text, court_name)
@@ -1,13 +1,120 @@
 import tempfile, uuid, shutil
+import json
+import socket
+import subprocess
+import threading
+import time
+from collections import deque, Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from typing import Tuple
 
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from fake_useragent import UserAgent
 from loguru import logger
+import requests
 
-def create_driver(page_load_strategy="normal", headless=True):
+from app.config.settings import settings
+from app.metrics.redis_client import set_worker_gauge, observe_worker_histogram, incr_worker_counter
+
+# Шаблоны URL по типам ресурсов для Network.setBlockedURLs
+RESOURCE_TYPE_PATTERNS = {
+    "Image": ("*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*", "*.bmp*"),
+    "Font": ("*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"),
+    "Stylesheet": ("*.css*",),
+    "Media": ("*.mp3*", "*.mp4*", "*.webm*", "*.ogg*"),
+}
+
+# Счётчики посещений и аналитика, которые встречаются на сайтах судов
+TRACKER_PATTERNS = (
+    "*mc.yandex.ru*", "*yandex.ru/metrika*", "*google-analytics.com*", "*googletagmanager.com*",
+    "*counter.yadro.ru*", "*liveinternet.ru*", "*top-fwz1.mail.ru*", "*top100.rambler.ru*",
+    "*openstat.net*", "*counter.rambler.ru*", "*sputnik.ru/counter*",
+)
+
+# Капча должна грузиться всегда: blue — /captcha.php, yellow — data:image внутри страницы
+CAPTCHA_URL_SAMPLES = ("https://court.msudrf.ru/captcha.php", "data:image/png;base64,")
+
+@dataclass
+class ResourcePolicy:
+    blocked_types: Tuple[str, ...] = ("Image", "Font", "Media")
+    block_trackers: bool = True
+    collect_stats: bool = settings.RESOURCE_POLICY_STATS
+
+    def patterns(self):
+        patterns = [pattern for resource_type in self.blocked_types for pattern in RESOURCE_TYPE_PATTERNS.get(resource_type, ())]
+        if self.block_trackers:
+            patterns.extend(TRACKER_PATTERNS)
+        return [p for p in patterns if not any(fnmatch(url, p) for url in CAPTCHA_URL_SAMPLES)]
+
+# Без CSS страница может сверстаться иначе (скрытые элементы, капча) — стили блокирует только strict
+RESOURCE_POLICIES = {
+    "default": ResourcePolicy(),
+    "strict": ResourcePolicy(blocked_types=("Image", "Font", "Stylesheet", "Media")),
+    "none": None,
+}
+
+def get_resource_policy(policy):
+    if isinstance(policy, str):
+        return RESOURCE_POLICIES.get(policy)
+    return policy
+
+def apply_resource_policy(driver, policy):
+    """Блокирует лишние запросы страницы через DevTools (Network.setBlockedURLs)"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": policy.patterns()})
+
+def prepare_tab(driver):
+    """
+    Настройки DevTools действуют на одну вкладку: текущая вкладка получает подмену User-Agent
+    (driver.tab_user_agent, режим shared) и блокировку ресурсов (driver.resource_policy) драйвера
+    """
+    user_agent = getattr(driver, "tab_user_agent", None)
+    if isinstance(user_agent, str):
+        driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": user_agent})
+    policy = getattr(driver, "resource_policy", None)
+    if isinstance(policy, ResourcePolicy):
+        apply_resource_policy(driver, policy)
+
+def collect_resource_stats(driver):
+    """
+    Разбирает performance-лог драйвера и отправляет в метрики число заблокированных
+    запросов и объём загруженных данных по типам ресурсов.
+    """
+    if getattr(driver, "collect_resource_stats", False) is not True:
+        return
+    try:
+        entries = driver.get_log("performance")
+    except Exception as e:
+        logger.debug(f"[collect_resource_stats] Не удалось получить performance-лог: {e}")
+        return
+    request_types = {}
+    blocked = Counter()
+    loaded_bytes = Counter()
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        method = message.get("method")
+        params = message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            request_types[params.get("requestId")] = params.get("type", "Other")
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            blocked[params.get("type") or request_types.get(params.get("requestId"), "Other")] += 1
+        elif method == "Network.loadingFinished":
+            loaded_bytes[request_types.get(params.get("requestId"), "Other")] += params.get("encodedDataLength", 0)
+    for resource_type, count in blocked.items():
+        incr_worker_counter(f"blocked_requests_total:{resource_type}", count)
+    for resource_type, size in loaded_bytes.items():
+        incr_worker_counter(f"loaded_bytes_total:{resource_type}", size)
+
+def create_driver(page_load_strategy="normal", headless=True, resource_policy=settings.RESOURCE_POLICY):
     user_agent = UserAgent()
+    policy = get_resource_policy(resource_policy)
     options = webdriver.ChromeOptions()
     options.page_load_strategy = page_load_strategy
     options.add_argument(f"user-agent={user_agent.random}")
@@ -20,13 +127,379 @@ def create_driver(page_load_strategy="normal", headless=True):
         options.add_argument("--disable-gpu")
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
-    chromedriver_path = "/usr/bin/chromedriver"
-    options.binary_location = "/usr/bin/chromium"
+    if policy and policy.collect_stats:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    chromedriver_path = settings.CHROMEDRIVER_PATH
+    options.binary_location = settings.CHROMIUM_BINARY
     logger.info(f" Создание Chrome-драйвера (headless={headless}, strategy='{page_load_strategy}')")
     try:
         driver = webdriver.Chrome(service=Service(chromedriver_path), options=options)
+        if policy:
+            driver.resource_policy = policy
+            driver.collect_resource_stats = policy.collect_stats
+            prepare_tab(driver)
         logger.success(" Драйвер успешно создан")
         return driver
     except Exception as e:
         logger.exception(f" Ошибка при создании драйвера: {e}")
         raise
+
+
+class PooledDriver:
+    """Драйвер из пула вместе с его возрастом и числом выдач"""
+    def __init__(self, driver):
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.uses = 0
+
+
+class DriverPool:
+    """
+    Пул заранее запущенных Chrome-драйверов одного воркера.
+
+    Драйвер выдаётся задаче через lease(), после возврата очищается (вкладки, alert, cookies)
+    и пересоздаётся после max_uses выдач или по достижении max_age секунд.
+    """
+    def __init__(self, size=settings.DRIVER_POOL_SIZE, max_uses=settings.DRIVER_POOL_MAX_USES,
+                 max_age=settings.DRIVER_POOL_MAX_AGE, headless=settings.HEADLESS,
+                 page_load_strategy=settings.PAGE_LOAD_STRATEGY, factory=None):
+        self.size = size
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.factory = factory or (lambda: create_driver(page_load_strategy, headless))
+        self._idle = deque()
+        self._total = 0
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def warm(self, count=None):
+        """Запускает драйверы заранее, чтобы первые задачи не ждали холодного старта Chrome"""
+        count = min(count or self.size, self.size)
+        logger.info(f"[DriverPool] Прогрев пула: {count} драйвер(ов)")
+        while True:
+            with self._cond:
+                if self._closed or self._total >= count:
+                    break
+                self._total += 1
+            try:
+                entry = PooledDriver(self.factory())
+            except Exception as e:
+                logger.error(f"[DriverPool] Не удалось запустить драйвер при прогреве: {e}")
+                with self._cond:
+                    self._total -= 1
+                break
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+        self._report()
+
+    @contextmanager
+    def lease(self, timeout=settings.DRIVER_POOL_LEASE_TIMEOUT):
+        started = time.monotonic()
+        entry = self._acquire(timeout)
+        wait = time.monotonic() - started
+        observe_worker_histogram("driver_pool_lease_wait_seconds", wait)
+        logger.debug(f"[DriverPool] Драйвер выдан, ожидание {wait:.2f} сек")
+        try:
+            yield entry.driver
+        finally:
+            self._release(entry)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._quit(entry)
+        self._report()
+
+    def _acquire(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            entry = None
+            create = False
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Пул драйверов закрыт")
+                if self._idle:
+                    entry = self._idle.popleft()
+                elif self._total < self.size:
+                    self._total += 1
+                    create = True
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise RuntimeError(f"Не удалось получить драйвер из пула за {timeout} сек")
+                    self._cond.wait(remaining)
+                    continue
+                self._in_use += 1
+            self._report()
+
+            if create:
+                try:
+                    return PooledDriver(self.factory())
+                except Exception:
+                    self._forget()
+                    raise
+
+            if self._is_expired(entry) or not self._is_healthy(entry):
+                self._quit(entry)
+                self._forget()
+                continue
+            return entry
+
+    def _release(self, entry):
+        entry.uses += 1
+        keep = not self._is_expired(entry) and self._reset(entry)
+        if not keep:
+            self._quit(entry)
+            self._forget()
+            return
+        with self._cond:
+            self._in_use -= 1
+            closed = self._closed
+            if closed:
+                self._total -= 1
+            else:
+                self._idle.append(entry)
+                self._cond.notify()
+        if closed:
+            self._quit(entry)
+        self._report()
+
+    def _forget(self):
+        """Убирает из учёта выданный драйвер, который был закрыт или не запустился"""
+        with self._cond:
+            self._in_use -= 1
+            self._total -= 1
+            self._cond.notify()
+        self._report()
+
+    def _is_expired(self, entry):
+        return entry.uses >= self.max_uses or time.monotonic() - entry.created_at >= self.max_age
+
+    def _is_healthy(self, entry):
+        try:
+            entry.driver.current_window_handle
+            entry.driver.execute_script("return 1")
+            return True
+        except Exception as e:
+            logger.warning(f"[DriverPool] Драйвер не отвечает, будет пересоздан: {e}")
+            incr_worker_counter("driver_pool_unhealthy_total")
+            return False
+
+    def _reset(self, entry):
+        driver = entry.driver
+        try:
+            try:
+                driver.switch_to.alert.dismiss()
+            except Exception:
+                pass
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            collect_resource_stats(driver)
+            driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            logger.warning(f"[DriverPool] Не удалось очистить драйвер, будет пересоздан: {e}")
+            return False
+
+    def _quit(self, entry):
+        incr_worker_counter("driver_pool_recycled_total")
+        collect_resource_stats(entry.driver)
+        try:
+            entry.driver.quit()
+        except Exception as e:
+            logger.error(f"[DriverPool] Ошибка при закрытии драйвера: {e}")
+
+    def _report(self):
+        set_worker_gauge("driver_pool_in_use", self._in_use)
+        set_worker_gauge("driver_pool_size", self._total)
+
+
+_driver_pool = None
+_driver_pool_lock = threading.Lock()
+
+def get_driver_pool():
+    global _driver_pool
+    with _driver_pool_lock:
+        if _driver_pool is None:
+            _driver_pool = DriverPool()
+        return _driver_pool
+
+class SharedBrowser:
+    """
+    Один процесс Chromium на воркер. Каждая задача получает собственный
+    изолированный контекст браузера (как отдельное инкогнито-окно) и свою
+    сессию chromedriver, подключённую к общему процессу через DevTools.
+    """
+    def __init__(self, headless=settings.HEADLESS, page_load_strategy=settings.PAGE_LOAD_STRATEGY, resource_policy=settings.RESOURCE_POLICY):
+        self.headless = headless
+        self.page_load_strategy = page_load_strategy
+        self.resource_policy = get_resource_policy(resource_policy)
+        self.port = None
+        self.process = None
+        self.user_data_dir = None
+        self._lock = threading.Lock()
+        self._contexts = 0
+
+    def start(self):
+        with self._lock:
+            if self.process is not None and self.process.poll() is None:
+                return
+            self._cleanup()
+            self.port = _free_port()
+            self.user_data_dir = tempfile.mkdtemp(prefix=f"chromium-shared-{uuid.uuid4().hex[:8]}-")
+            args = [
+                settings.CHROMIUM_BINARY,
+                f"--remote-debugging-port={self.port}",
+                f"--user-data-dir={self.user_data_dir}",
+                "--disable-blink-features=AutomationControlled",
+                "--ignore-certificate-errors",
+                "--no-first-run",
+                "--no-default-browser-check",
+                "--log-level=3",
+                "about:blank",
+            ]
+            if self.headless:
+                args[1:1] = ["--headless=new", "--window-size=1920,1080", "--disable-gpu", "--no-sandbox", "--disable-dev-shm-usage"]
+            logger.info(f"[SharedBrowser] Запуск общего Chromium (порт {self.port})")
+            self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline:
+                try:
+                    requests.get(f"http://127.0.0.1:{self.port}/json/version", timeout=1)
+                    logger.success(f"[SharedBrowser] Общий Chromium запущен")
+                    return
+                except requests.RequestException:
+                    time.sleep(0.2)
+            raise RuntimeError("Общий Chromium не запустился за 30 сек")
+
+    @contextmanager
+    def context(self):
+        self.start()
+        options = webdriver.ChromeOptions()
+        options.page_load_strategy = self.page_load_strategy
+        options.debugger_address = f"127.0.0.1:{self.port}"
+        driver = webdriver.Chrome(service=Service(settings.CHROMEDRIVER_PATH), options=options)
+        context_id = None
+        try:
+            context_id = driver.execute_cdp_cmd("Target.createBrowserContext", {"disposeOnDetach": False})["browserContextId"]
+            target_id = driver.execute_cdp_cmd("Target.createTarget", {"url": "about:blank", "browserContextId": context_id})["targetId"]
+            driver.switch_to.window(target_id)
+            driver.browser_context_id = context_id
+            driver.tab_user_agent = UserAgent().random
+            driver.resource_policy = self.resource_policy
+            prepare_tab(driver)
+            self._report(1)
+            logger.debug(f"[SharedBrowser] Создан контекст {context_id}")
+            yield driver
+        finally:
+            if context_id is not None:
+                self._report(-1)
+                try:
+                    driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context_id})
+                except Exception as e:
+                    logger.error(f"[SharedBrowser] Ошибка при удалении контекста {context_id}: {e}")
+            # quit() у подключённой сессии не нужен: браузер общий, останавливаем только chromedriver
+            driver.service.stop()
+
+    def close(self):
+        with self._lock:
+            self._cleanup()
+
+    def _cleanup(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+            self.user_data_dir = None
+
+    def _report(self, delta):
+        with self._lock:
+            self._contexts += delta
+            contexts = self._contexts
+        set_worker_gauge("shared_browser_contexts", contexts)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+_shared_browser = None
+_shared_browser_lock = threading.Lock()
+
+def get_shared_browser():
+    global _shared_browser
+    with _shared_browser_lock:
+        if _shared_browser is None:
+            _shared_browser = SharedBrowser()
+        return _shared_browser
+
+@contextmanager
+def lease_driver(timeout=settings.DRIVER_POOL_LEASE_TIMEOUT):
+    """
+    Выдаёт драйвер на время проверки в зависимости от BROWSER_MODE:
+    из пула воркера, как контекст общего Chromium или новый процесс браузера.
+    Режим без окна во всех случаях задаёт settings.HEADLESS.
+    timeout — сколько ждать свободный драйвер пула (RuntimeError, если не дождались)
+    """
+    if settings.BROWSER_MODE == "pool":
+        with get_driver_pool().lease(timeout) as driver:
+            yield driver
+        return
+    if settings.BROWSER_MODE == "shared":
+        with get_shared_browser().context() as driver:
+            yield driver
+        return
+    driver = create_driver(settings.PAGE_LOAD_STRATEGY, settings.HEADLESS)
+    try:
+        yield driver
+    finally:
+        collect_resource_stats(driver)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.error(f" Ошибка при закрытии драйвера: {e}")
+
+def open_tab(driver):
+    """
+    Открывает новую вкладку в той же сессии браузера (общие cookies) и переключается на неё.
+    В режиме shared вкладка создаётся в контексте задачи, а не в контексте по умолчанию.
+    Вкладка получает те же User-Agent и блокировку ресурсов, что и основная (prepare_tab)
+    """
+    context_id = getattr(driver, "browser_context_id", None)
+    if context_id:
+        target_id = driver.execute_cdp_cmd("Target.createTarget", {"url": "about:blank", "browserContextId": context_id})["targetId"]
+        driver.switch_to.window(target_id)
+    else:
+        driver.switch_to.new_window("tab")
+    prepare_tab(driver)
+    return driver.current_window_handle
+
+def close_tabs(driver, handles, main_handle):
+    """Закрывает вкладки, открытые через open_tab, и возвращается на основную"""
+    for handle in handles:
+        if handle == main_handle:
+            continue
+        try:
+            driver.switch_to.window(handle)
+            driver.close()
+        except Exception as e:
+            logger.warning(f"[close_tabs] Не удалось закрыть вкладку {handle}: {e}")
+    driver.switch_to.window(main_handle)
@@ -0,0 +1,70 @@
+import json
+import time
+
+from app.parsers.courts.records import KnownCases, is_records
+from app.services.court_registry import court_host
+from app.services.result_cache import person_key
+from app.metrics.redis_client import r, incr_worker_counter
+from app.config.settings import settings
+from app.utils.logger import logger
+
+KEY_CASE_HISTORY = "courts:history"
+UNIT_SEPARATOR = "\x1f"
+
+def history_key(address, fullname_data):
+    return f"{KEY_CASE_HISTORY}:{court_host(address)}:{person_key(fullname_data)}"
+
+
+class CaseHistory:
+    """
+    Дела, найденные прошлыми проверками суда по человеку, по единицам (суд, ФИО, категория[, подкатегория]).
+    Парсеры по ним ограничивают поиск датой последнего дела или останавливают пагинацию на известных делах.
+    Раз в INCREMENTAL_FULL_RECHECK секунд единица проверяется полностью, чтобы обновить статусы старых дел.
+    CaseHistory() без ключа ничего не хранит и не ограничивает поиск.
+    """
+    def __init__(self, key=None):
+        self.key = key
+        self.units = {}
+        self.incremental = set()
+        if key is None:
+            return
+        try:
+            self.units = {unit: json.loads(value) for unit, value in r.hgetall(key).items()}
+        except Exception as e:
+            logger.warning(f"[CaseHistory] Не удалось прочитать историю дел: {e}")
+
+    @classmethod
+    def for_check(cls, address, fullname_data):
+        """
+        История для проверки суда. Хранятся только записи дел, поэтому при RESULT_FORMAT=html
+        (или выключенном INCREMENTAL_CHECKS) возвращается пустая история — суд проверяется полностью
+        """
+        if not settings.INCREMENTAL_CHECKS or settings.RESULT_FORMAT != "records":
+            return cls()
+        return cls(history_key(address, fullname_data))
+
+    def known(self, *unit):
+        """Известные дела единицы (KnownCases) или None, если единицу нужно проверить полностью"""
+        field = UNIT_SEPARATOR.join(unit)
+        entry = self.units.get(field)
+        if entry is None or time.time() - entry["full_at"] > settings.INCREMENTAL_FULL_RECHECK:
+            return None
+        self.incremental.add(field)
+        incr_worker_counter("incremental_units_total")
+        return KnownCases(entry["rows"], entry.get("titles"), entry.get("extra"))
+
+    def update(self, *unit, result):
+        """Запоминает дела единицы. Время полной проверки сохраняется, если проверка была инкрементальной"""
+        if self.key is None or not is_records(result):
+            return
+        field = UNIT_SEPARATOR.join(unit)
+        full_at = self.units[field]["full_at"] if field in self.incremental else time.time()
+        self.units[field] = {"rows": result["rows"], "titles": result.get("titles", {}), "extra": result.get("extra", []),
+                             "full_at": full_at}
+        try:
+            pipe = r.pipeline()
+            pipe.hset(self.key, field, json.dumps(self.units[field], ensure_ascii=False))
+            pipe.expire(self.key, settings.CASE_HISTORY_TTL)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"[CaseHistory] Не удалось сохранить историю дел {field!r}: {e}")
@@ -1,5 +1,8 @@
-from celery import group
+from celery import group, uuid
+from celery.result import AsyncResult, GroupResult
+from app.celery.celery_app import celery_app
 from app.celery.tasks import verify_court_task, check_court_task
+from app.services.result_cache import get_cached_result
 from app.utils.logger import logger
 from app.parsers.courts.core import parse_courts
 from app.config.settings import settings
@@ -8,13 +11,29 @@ class CheckService():
     def __init__(self, headless=settings.HEADLESS):
         self.headless_mode = headless
     
-    def check_courts(self, addresses, fullname_data):
+    def check_courts(self, addresses, fullname_data, max_age=0):
         """
-        Проверяет список адресов судов.
+        Проверяет список адресов судов. Если max_age > 0, суды с результатом из кэша не старше
+        max_age секунд в очередь не ставятся: их результат сразу записывается как выполненная задача группы.
         """
         try:
-            task = group(check_court_task.s(address, fullname_data) for address in addresses)
-            async_result = task.apply_async()
+            cached = {address: get_cached_result(address, fullname_data, max_age) for address in addresses} if max_age else {}
+            if not any(result is not None for result, _ in cached.values()):
+                task = group(check_court_task.s(address, fullname_data) for address in addresses)
+                async_result = task.apply_async()
+            else:
+                results = []
+                for address in addresses:
+                    result, age = cached[address]
+                    if result is None:
+                        results.append(check_court_task.apply_async(args=(address, fullname_data)))
+                        continue
+                    logger.info(f"[Celery] Результат для {address} взят из кэша (возраст {age:.0f} сек)")
+                    task_id = uuid()
+                    celery_app.backend.store_result(task_id, {"address": address, "result": result, "status": "success",
+                                                              "cached": True, "age": round(age)}, "SUCCESS")
+                    results.append(AsyncResult(task_id, app=celery_app))
+                async_result = GroupResult(uuid(), results, app=celery_app)
             async_result.save()
             return {
                 'task_id': async_result.id,
@@ -35,7 +54,7 @@ class CheckService():
         try:
             results = {}
             for address in addresses:
-                court_result = parse_courts(address, fullname_data, headless=settings.HEADLESS)
+                court_result = parse_courts(address, fullname_data)
                 results[address] = court_result
             logger.info(f"[Celery] Batch-задача проверки адресов завершена")
             return {
@@ -0,0 +1,79 @@
+import hashlib
+import json
+
+from app.services.case_history import CaseHistory
+from app.metrics.redis_client import r, incr_worker_counter
+from app.config.settings import settings
+from app.utils.logger import logger
+
+KEY_CHECKPOINT = "checks:checkpoint"
+UNIT_SEPARATOR = "\x1f"
+
+def input_hash(address, fullname_data):
+    """Хэш входных данных проверки: одинаковый для повтора задачи и для повторной отправки тех же данных"""
+    payload = json.dumps({"address": address.strip().rstrip("/").lower(), "fullname": fullname_data},
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class Checkpoint:
+    """
+    Готовые единицы проверки (суд, ФИО, категория[, подкатегория]) в хэше Redis. Парсеры берут
+    из него уже собранные результаты и сохраняют новые сразу по готовности.
+    Checkpoint() без ключа ничего не хранит — так парсеры вызываются вне задач Celery.
+    history (CaseHistory) — дела прошлых проверок для инкрементального поиска.
+    """
+    def __init__(self, key=None, history=None):
+        self.key = key
+        self.history = history or CaseHistory()
+        self.units = {}
+        if key is None:
+            return
+        try:
+            self.units = {unit: json.loads(value) for unit, value in r.hgetall(key).items()}
+        except Exception as e:
+            logger.warning(f"[Checkpoint] Не удалось прочитать сохранённый прогресс: {e}")
+        if self.units:
+            logger.info(f"[Checkpoint] Продолжение проверки: готово единиц {len(self.units)}")
+
+    @classmethod
+    def for_check(cls, address, fullname_data):
+        history = CaseHistory.for_check(address, fullname_data)
+        if not settings.CHECKPOINT_ENABLED:
+            return cls(history=history)
+        return cls(f"{KEY_CHECKPOINT}:{input_hash(address, fullname_data)}", history)
+
+    def get(self, *unit):
+        """Сохранённый результат единицы или None"""
+        result = self.units.get(UNIT_SEPARATOR.join(unit))
+        if result is not None:
+            incr_worker_counter("checkpoint_units_reused_total")
+        return result
+
+    def known(self, *unit):
+        """Известные дела единицы для инкрементального поиска или None"""
+        return self.history.known(*unit)
+
+    def save(self, *unit, result):
+        self.history.update(*unit, result=result)
+        if self.key is None:
+            return
+        field = UNIT_SEPARATOR.join(unit)
+        self.units[field] = result
+        try:
+            pipe = r.pipeline()
+            pipe.hset(self.key, field, json.dumps(result, ensure_ascii=False))
+            pipe.expire(self.key, settings.CHECKPOINT_TTL)
+            pipe.execute()
+            incr_worker_counter("checkpoint_units_saved_total")
+        except Exception as e:
+            logger.warning(f"[Checkpoint] Не удалось сохранить прогресс {field!r}: {e}")
+
+    def clear(self):
+        """Проверка завершена — следующая отправка тех же данных начнётся заново"""
+        if self.key is None:
+            return
+        try:
+            r.delete(self.key)
+        except Exception as e:
+            logger.warning(f"[Checkpoint] Не удалось удалить сохранённый прогресс: {e}")
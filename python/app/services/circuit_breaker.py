@@ -0,0 +1,113 @@
+import threading
+import time
+
+from app.services.court_registry import court_host
+from app.metrics.redis_client import r, incr_worker_counter, WORKER_ID
+from app.config.settings import settings
+from app.utils.logger import logger
+
+KEY_BREAKER_FAILURES = "courts:breaker:failures"
+KEY_BREAKER_OPEN = "courts:breaker:open"
+KEY_BREAKER_PROBE = "courts:breaker:probe"
+# Сколько помнить сработавший выключатель после окончания паузы, пока пробная проверка не закроет его
+HALF_OPEN_TTL = 24 * 3600
+
+# Хосты, по которым этот процесс видел ошибки или ведёт пробную проверку: успешные ответы остальных хостов в Redis не пишутся
+_failing = set()
+_probing = set()
+_lock = threading.Lock()
+
+
+class CourtUnavailable(Exception):
+    """Сайт суда признан недоступным (выключатель разомкнут)"""
+    def __init__(self, host, retry_at):
+        self.host = host
+        self.retry_at = retry_at
+        super().__init__(f"Сайт {host} временно недоступен, повторная проверка после {time.strftime('%H:%M:%S', time.localtime(retry_at))}")
+
+
+def ensure_available(url):
+    """
+    Выбрасывает CourtUnavailable, если выключатель сайта разомкнут. После паузы BREAKER_COOLDOWN
+    пропускает одну пробную проверку (процесс, занявший KEY_BREAKER_PROBE), остальные ждут её результата.
+    """
+    if not settings.BREAKER_ENABLED:
+        return
+    host = court_host(url)
+    try:
+        opened_until = r.get(f"{KEY_BREAKER_OPEN}:{host}")
+        if opened_until is None:
+            return
+        retry_at = float(opened_until)
+        if time.time() >= retry_at:
+            probe_key = f"{KEY_BREAKER_PROBE}:{host}"
+            if r.set(probe_key, WORKER_ID, nx=True, ex=settings.BREAKER_PROBE_TIMEOUT) or r.get(probe_key) == WORKER_ID:
+                with _lock:
+                    if host not in _probing:
+                        logger.info(f"[circuit_breaker] Пробная проверка доступности {host}")
+                    _probing.add(host)
+                return
+            retry_at = time.time() + settings.BREAKER_PROBE_TIMEOUT
+    except Exception as e:
+        logger.warning(f"[circuit_breaker] Не удалось прочитать состояние выключателя {host}: {e}")
+        return
+    incr_worker_counter(f"breaker_fast_fail_total:{host}")
+    raise CourtUnavailable(host, retry_at)
+
+def trip(host):
+    opened_until = time.time() + settings.BREAKER_COOLDOWN
+    pipe = r.pipeline()
+    pipe.set(f"{KEY_BREAKER_OPEN}:{host}", opened_until, ex=settings.BREAKER_COOLDOWN + HALF_OPEN_TTL)
+    pipe.delete(f"{KEY_BREAKER_FAILURES}:{host}", f"{KEY_BREAKER_PROBE}:{host}")
+    pipe.execute()
+    with _lock:
+        _failing.discard(host)
+        _probing.discard(host)
+    logger.error(f"[circuit_breaker] Выключатель {host} разомкнут на {settings.BREAKER_COOLDOWN} с")
+    incr_worker_counter(f"breaker_trips_total:{host}")
+
+def record_result(url, ok):
+    """
+    Ответ сайта: BREAKER_THRESHOLD ошибок за BREAKER_WINDOW секунд или ошибка пробной проверки
+    размыкают выключатель: следующие запросы к сайту выбрасывают CourtUnavailable (ensure_available).
+    Успешный ответ пробной проверки замыкает его.
+    """
+    if not settings.BREAKER_ENABLED:
+        return
+    host = court_host(url)
+    with _lock:
+        probing = host in _probing
+        failing = host in _failing
+    try:
+        if ok:
+            if probing:
+                r.delete(f"{KEY_BREAKER_OPEN}:{host}", f"{KEY_BREAKER_PROBE}:{host}", f"{KEY_BREAKER_FAILURES}:{host}")
+                logger.info(f"[circuit_breaker] Сайт {host} снова отвечает, выключатель замкнут")
+            elif failing:
+                r.delete(f"{KEY_BREAKER_FAILURES}:{host}")
+            with _lock:
+                _probing.discard(host)
+                _failing.discard(host)
+            return
+        failures_key = f"{KEY_BREAKER_FAILURES}:{host}"
+        failures = r.incr(failures_key)
+        if failures == 1:
+            r.expire(failures_key, settings.BREAKER_WINDOW)
+    except Exception as e:
+        logger.warning(f"[circuit_breaker] Не удалось обновить выключатель {host}: {e}")
+        return
+    with _lock:
+        _failing.add(host)
+    if probing or failures >= settings.BREAKER_THRESHOLD:
+        trip(host)
+
+def get_breaker_states():
+    """Разомкнутые (open) и ожидающие пробной проверки (half_open) выключатели: {хост: состояние}"""
+    states = {}
+    now = time.time()
+    for key in r.scan_iter(f"{KEY_BREAKER_OPEN}:*"):
+        opened_until = r.get(key)
+        if opened_until is None:
+            continue
+        states[key[len(KEY_BREAKER_OPEN) + 1:]] = "open" if now < float(opened_until) else "half_open"
+    return states
@@ -0,0 +1,90 @@
+import json
+import time
+from dataclasses import dataclass, field, asdict, fields
+from typing import Optional
+from urllib.parse import urlparse
+
+from app.metrics.redis_client import r, incr_worker_counter
+from app.config.settings import settings
+from app.utils.logger import logger
+
+KEY_COURT_REGISTRY = "courts:registry"
+KEY_COURT_REVALIDATE = "courts:registry:revalidate"
+
+@dataclass
+class CourtMeta:
+    """Сведения о сайте суда, которые не меняются от проверки к проверке"""
+    type: Optional[str] = None          # blue, yellow или spb
+    name: Optional[str] = None
+    layout: Optional[str] = None        # вёрстка yellow: regular, modern, multi или unavailable
+    sud_delo_url: Optional[str] = None  # страница "Судебное делопроизводство" (yellow)
+    servers: list = field(default_factory=list)  # серверы multi-суда: [{"name": ..., "url": ...}]
+    categories: dict = field(default_factory=dict)  # карта категорий yellow по серверу: {srv_num: {категория: [подкатегории]}}
+    checked_at: float = 0.0
+
+def court_host(address):
+    """Нормализованный хост суда: без схемы, www, порта и регистра"""
+    parts = urlparse(address if "//" in address else f"//{address}")
+    host = (parts.hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+def _load(address):
+    raw = r.get(f"{KEY_COURT_REGISTRY}:{court_host(address)}")
+    if raw is None:
+        return None
+    data = json.loads(raw)
+    known = {f.name for f in fields(CourtMeta)}
+    return CourtMeta(**{key: value for key, value in data.items() if key in known})
+
+def get_court_meta(address):
+    """
+    Сведения о суде из реестра или None. Устаревшая запись (старше COURT_REGISTRY_REVALIDATE)
+    всё равно возвращается, а её обновление ставится в очередь.
+    """
+    if not settings.COURT_REGISTRY_ENABLED:
+        return None
+    try:
+        meta = _load(address)
+    except Exception as e:
+        logger.warning(f"[get_court_meta] Не удалось прочитать реестр судов: {e}")
+        return None
+    if meta is None:
+        incr_worker_counter("court_registry_misses_total")
+        return None
+    incr_worker_counter("court_registry_hits_total")
+    if time.time() - meta.checked_at > settings.COURT_REGISTRY_REVALIDATE:
+        schedule_revalidation(address)
+    return meta
+
+def update_court_meta(address, **values):
+    """Дополняет запись реестра новыми сведениями и продлевает её срок жизни"""
+    if not settings.COURT_REGISTRY_ENABLED:
+        return
+    try:
+        meta = _load(address) or CourtMeta()
+        for key, value in values.items():
+            setattr(meta, key, value)
+        meta.checked_at = time.time()
+        r.set(f"{KEY_COURT_REGISTRY}:{court_host(address)}", json.dumps(asdict(meta), ensure_ascii=False),
+              ex=settings.COURT_REGISTRY_TTL)
+        logger.info(f"[update_court_meta] Реестр судов обновлён для {court_host(address)}: {', '.join(values)}")
+    except Exception as e:
+        logger.warning(f"[update_court_meta] Не удалось обновить реестр судов: {e}")
+
+def invalidate_court_meta(address):
+    """Удаляет запись, если сайт перестал соответствовать сохранённым сведениям"""
+    try:
+        r.delete(f"{KEY_COURT_REGISTRY}:{court_host(address)}")
+        logger.warning(f"[invalidate_court_meta] Запись реестра для {court_host(address)} удалена")
+    except Exception as e:
+        logger.warning(f"[invalidate_court_meta] Не удалось удалить запись реестра: {e}")
+
+def schedule_revalidation(address):
+    """Ставит задачу перепроверки суда, не чаще одной на COURT_REGISTRY_REVALIDATE"""
+    from app.celery.celery_app import celery_app
+    try:
+        if r.set(f"{KEY_COURT_REVALIDATE}:{court_host(address)}", 1, nx=True, ex=settings.COURT_REGISTRY_REVALIDATE):
+            celery_app.send_task("revalidate_court", args=[address], queue="court_verifications")
+            incr_worker_counter("court_registry_revalidations_total")
+    except Exception as e:
+        logger.warning(f"[schedule_revalidation] Не удалось поставить перепроверку суда: {e}")
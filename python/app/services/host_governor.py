@@ -0,0 +1,179 @@
+import asyncio
+import threading
+import time
+import uuid
+from contextlib import contextmanager, asynccontextmanager
+
+from app.services.court_registry import court_host
+from app.services.circuit_breaker import ensure_available, record_result
+from app.services.waits import sleep
+from app.metrics.redis_client import r, incr_worker_counter, observe_worker_histogram
+from app.config.settings import settings
+from app.utils.logger import logger
+
+KEY_HOST_BUCKET = "courts:governor:bucket"
+KEY_HOST_INFLIGHT = "courts:governor:inflight"
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+MAX_POLL_INTERVAL = 1.0
+
+# Токен-бакет и число запросов в работе одним атомарным вызовом.
+# KEYS: бакет (hash rate/tokens/ts), запросы в работе (zset lease -> срок истечения)
+# ARGV: now, max_rate, burst, max_inflight, lease_id, lease_ttl
+# Ответ: {1, rate} — можно идти; {0, wait, rate} — подождать wait секунд
+ACQUIRE_LUA = """
+local now = tonumber(ARGV[1])
+local rate = tonumber(redis.call('HGET', KEYS[1], 'rate') or ARGV[2])
+local burst = tonumber(ARGV[3])
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens') or burst)
+local ts = tonumber(redis.call('HGET', KEYS[1], 'ts') or now)
+tokens = math.min(burst, tokens + math.max(now - ts, 0) * rate)
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+local wait = 0
+if redis.call('ZCARD', KEYS[2]) >= tonumber(ARGV[4]) then
+    wait = 0.1
+elseif tokens < 1 then
+    wait = (1 - tokens) / rate
+else
+    tokens = tokens - 1
+    redis.call('ZADD', KEYS[2], now + tonumber(ARGV[6]), ARGV[5])
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], 3600)
+redis.call('EXPIRE', KEYS[2], 3600)
+if wait > 0 then
+    return {0, tostring(wait), tostring(rate)}
+end
+return {1, tostring(rate)}
+"""
+
+# AIMD: успешный ответ прибавляет step к скорости (не выше max_rate), ошибка умножает её на factor (не ниже min_rate)
+# ARGV: ok, max_rate, step, min_rate, factor
+ADJUST_LUA = """
+local rate = tonumber(redis.call('HGET', KEYS[1], 'rate') or ARGV[2])
+if ARGV[1] == '1' then
+    rate = math.min(tonumber(ARGV[2]), rate + tonumber(ARGV[3]))
+else
+    rate = math.max(tonumber(ARGV[4]), rate * tonumber(ARGV[5]))
+end
+redis.call('HSET', KEYS[1], 'rate', rate)
+redis.call('EXPIRE', KEYS[1], 3600)
+return tostring(rate)
+"""
+
+_acquire = r.register_script(ACQUIRE_LUA)
+_adjust = r.register_script(ADJUST_LUA)
+
+# Последняя известная скорость по хостам: успешные ответы не пишут в Redis, пока скорость не снижена
+_rates = {}
+_rates_lock = threading.Lock()
+
+
+def _known_rate(host):
+    with _rates_lock:
+        return _rates.get(host, settings.HOST_RATE)
+
+def _remember_rate(host, rate):
+    with _rates_lock:
+        _rates[host] = float(rate)
+
+def acquire(host, lease_id):
+    """
+    Ждёт токен и свободное место среди запросов к сайту, общие для всех воркеров.
+    Возвращает True, если место занято (его нужно освободить release), и False, если ограничение
+    не применилось: Redis недоступен или ожидание дольше HOST_SLOT_TIMEOUT.
+    """
+    started = time.monotonic()
+    throttled = False
+    while True:
+        try:
+            answer = _acquire(keys=[f"{KEY_HOST_BUCKET}:{host}", f"{KEY_HOST_INFLIGHT}:{host}"],
+                              args=[time.time(), settings.HOST_RATE, settings.HOST_BURST,
+                                    settings.HOST_MAX_INFLIGHT, lease_id, settings.HOST_LEASE_TTL])
+        except Exception as e:
+            logger.warning(f"[host_governor] Ограничение запросов к {host} не применено: {e}")
+            return False
+        _remember_rate(host, answer[-1])
+        if int(answer[0]) == 1:
+            break
+        throttled = True
+        wait = float(answer[1])
+        if time.monotonic() - started + wait > settings.HOST_SLOT_TIMEOUT:
+            logger.warning(f"[host_governor] Ожидание очереди к {host} дольше {settings.HOST_SLOT_TIMEOUT} с, запрос выполняется без неё")
+            incr_worker_counter(f"host_slot_timeouts_total:{host}")
+            return False
+        sleep(min(wait, MAX_POLL_INTERVAL))
+    waited = time.monotonic() - started
+    observe_worker_histogram("host_queue_wait_seconds", waited, buckets=WAIT_BUCKETS)
+    if throttled:
+        incr_worker_counter(f"host_throttled_total:{host}")
+        incr_worker_counter(f"host_queue_wait_seconds_total:{host}", waited)
+    return True
+
+def release(host, lease_id):
+    try:
+        r.zrem(f"{KEY_HOST_INFLIGHT}:{host}", lease_id)
+    except Exception as e:
+        logger.warning(f"[host_governor] Не удалось освободить место запроса к {host}: {e}")
+
+@contextmanager
+def host_slot(url):
+    """
+    Обёртка для каждого перехода и HTTP-запроса к сайту суда. Если выключатель сайта
+    разомкнут, сразу выбрасывает CourtUnavailable (circuit_breaker)
+    """
+    ensure_available(url)
+    if not settings.HOST_GOVERNOR_ENABLED:
+        yield
+        return
+    host = court_host(url)
+    lease_id = uuid.uuid4().hex
+    acquired = acquire(host, lease_id)
+    try:
+        yield
+    finally:
+        if acquired:
+            release(host, lease_id)
+
+@asynccontextmanager
+async def host_slot_async(url):
+    """host_slot для AsyncBrowserRuntime: ожидание выполняется вне цикла событий"""
+    await asyncio.to_thread(ensure_available, url)
+    if not settings.HOST_GOVERNOR_ENABLED:
+        yield
+        return
+    host = court_host(url)
+    lease_id = uuid.uuid4().hex
+    acquired = await asyncio.to_thread(acquire, host, lease_id)
+    try:
+        yield
+    finally:
+        if acquired:
+            await asyncio.to_thread(release, host, lease_id)
+
+def report_response(url, ok):
+    """
+    Ответ сайта: ошибки (502/503, 429, "Информация временно недоступна") снижают допустимую скорость
+    запросов, успешные — постепенно возвращают. Ответ учитывается и выключателем сайта (circuit_breaker)
+    """
+    if settings.HOST_GOVERNOR_ENABLED:
+        adjust_rate(court_host(url), ok)
+    record_result(url, ok)
+
+def adjust_rate(host, ok):
+    if ok and _known_rate(host) >= settings.HOST_RATE:
+        return
+    try:
+        rate = _adjust(keys=[f"{KEY_HOST_BUCKET}:{host}"],
+                       args=[1 if ok else 0, settings.HOST_RATE, settings.HOST_RATE_INCREASE,
+                             settings.HOST_RATE_MIN, settings.HOST_RATE_DECREASE])
+    except Exception as e:
+        logger.warning(f"[host_governor] Не удалось обновить скорость запросов к {host}: {e}")
+        return
+    _remember_rate(host, rate)
+    if not ok:
+        logger.warning(f"[host_governor] Сайт {host} вернул ошибку, скорость снижена до {float(rate):.2f} запросов/с")
+        incr_worker_counter(f"host_backoff_total:{host}")
+
+def report_status(url, status_code):
+    """report_response для HTTP-ответа: ошибкой считаются 5xx и 429"""
+    report_response(url, status_code < 500 and status_code != 429)
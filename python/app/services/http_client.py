@@ -0,0 +1,95 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from urllib.parse import urlparse
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from fake_useragent import UserAgent
+
+from app.config.settings import settings
+from app.utils.logger import logger
+
+# Сайты судов часто отдают просроченные сертификаты, браузер тоже запускается с --ignore-certificate-errors
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+_adapter = None
+_adapter_lock = threading.Lock()
+
+# Ограничение одновременных запросов страниц к одному сайту, общее для всех задач воркера
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+def get_shared_adapter():
+    """
+    Общий для всех сессий воркера пул keep-alive соединений.
+    Cookies у каждой сессии свои, а TCP/TLS-соединения к сайтам судов переиспользуются.
+    """
+    global _adapter
+    with _adapter_lock:
+        if _adapter is None:
+            _adapter = HTTPAdapter(
+                pool_connections=settings.BLUE_HTTP_POOL_SIZE,
+                pool_maxsize=settings.BLUE_HTTP_POOL_SIZE,
+                max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504), allowed_methods=None),
+            )
+        return _adapter
+
+def make_session(user_agent=None):
+    session = requests.Session()
+    adapter = get_shared_adapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = user_agent or UserAgent().random
+    session.verify = False
+    return session
+
+def decode_response(response):
+    """Возвращает текст страницы с учётом кодировки из заголовка или <meta charset>"""
+    if "charset" not in response.headers.get("Content-Type", "").lower():
+        match = re.search(rb'charset=["\']?([\w-]+)', response.content[:2048], re.I)
+        response.encoding = match.group(1).decode("ascii") if match else "utf-8"
+    return response.text
+
+def session_from_driver(driver):
+    """HTTP-сессия с cookies и User-Agent браузера — запросы идут от имени той же сессии сайта"""
+    session = make_session(driver.execute_script("return navigator.userAgent"))
+    for cookie in driver.get_cookies():
+        session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+    return session
+
+def host_semaphore(url):
+    host = urlparse(url).netloc
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(max(settings.PAGE_FETCH_PER_HOST, 1))
+        return _host_semaphores[host]
+
+def fetch_pages(urls, fetch):
+    """
+    Вызывает fetch(url) для адресов пачками по PAGE_FETCH_PER_HOST параллельно, не больше PAGE_FETCH_PER_HOST
+    запросов к одному сайту. Результаты отдаются в порядке urls; если fetch упал — None на его месте.
+    Следующая пачка запрашивается, только когда вызывающий дочитал предыдущую: если он остановился
+    (например, дальше только известные дела), лишние страницы не загружаются.
+    Потоки получают копию контекста вызывающего: паузы в них учитываются в SleepMeter задачи
+    """
+    def fetch_limited(url):
+        with host_semaphore(url):
+            try:
+                return fetch(url)
+            except Exception as e:
+                logger.warning(f"[fetch_pages] Не удалось загрузить {url}: {e}")
+                return None
+
+    if not urls:
+        return
+    batch_size = max(settings.PAGE_FETCH_PER_HOST, 1)
+    with ThreadPoolExecutor(max_workers=min(len(urls), batch_size)) as executor:
+        for start in range(0, len(urls), batch_size):
+            batch = urls[start:start + batch_size]
+            # Одну копию контекста нельзя запустить в двух потоках сразу — своя копия на каждый адрес
+            contexts = [copy_context() for _ in batch]
+            yield from executor.map(lambda context, url: context.run(fetch_limited, url), contexts, batch)
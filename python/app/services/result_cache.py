@@ -0,0 +1,88 @@
+import hashlib
+import json
+import re
+import time
+
+from app.parsers.courts.records import is_records
+from app.services.court_registry import court_host
+from app.metrics.redis_client import r, incr_worker_counter, observe_worker_histogram
+from app.config.settings import settings
+from app.utils.logger import logger
+
+KEY_RESULT_CACHE = "courts:results"
+UNIT_SEPARATOR = "\x1f"
+CHECKED_AT = "__checked_at__"
+AGE_BUCKETS = (60, 300, 900, 3600, 3 * 3600, 6 * 3600, 12 * 3600, 24 * 3600)
+
+def normalize_part(value):
+    """Часть ФИО для ключа кэша: регистр, ё/е, пробелы и дефисы не различаются"""
+    value = (value or "").lower().replace("ё", "е")
+    value = re.sub(r"\s*[-‐‑‒–—]\s*", "-", value)
+    return " ".join(value.split())
+
+def person_key(fullname_data):
+    parts = [normalize_part(fullname_data.get(field)) for field in ("surname", "name", "patronymic")]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+def cache_key(address, fullname_data):
+    return f"{KEY_RESULT_CACHE}:{court_host(address)}:{person_key(fullname_data)}"
+
+def flatten_units(result, path=()):
+    """Результат parse_courts в виде {(суд, ФИО, категория[, подкатегория]): таблица}"""
+    units = {}
+    for key, value in result.items():
+        if isinstance(value, dict) and not is_records(value):
+            units.update(flatten_units(value, path + (key,)))
+        else:
+            units[path + (key,)] = value
+    return units
+
+def unflatten_units(units):
+    result = {}
+    for path, value in units.items():
+        node = result
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = value
+    return result
+
+def store_result(address, fullname_data, result):
+    """Сохраняет результат успешной проверки суда. Ошибки сайта ("__error__") не кэшируются"""
+    if not settings.RESULT_CACHE_ENABLED:
+        return
+    units = flatten_units(result)
+    if not units or any(path[-1] == "__error__" for path in units):
+        return
+    key = cache_key(address, fullname_data)
+    try:
+        pipe = r.pipeline()
+        pipe.delete(key)
+        pipe.hset(key, mapping={UNIT_SEPARATOR.join(path): json.dumps(value, ensure_ascii=False) for path, value in units.items()})
+        pipe.hset(key, CHECKED_AT, time.time())
+        pipe.expire(key, settings.RESULT_CACHE_TTL)
+        pipe.execute()
+        logger.info(f"[store_result] Результат проверки {court_host(address)} сохранён в кэш: {len(units)} единиц")
+    except Exception as e:
+        logger.warning(f"[store_result] Не удалось сохранить результат в кэш: {e}")
+
+def get_cached_result(address, fullname_data, max_age):
+    """
+    Результат проверки не старше max_age секунд и его возраст: (result, age).
+    (None, None), если подходящего результата нет.
+    """
+    if not settings.RESULT_CACHE_ENABLED or not max_age:
+        return None, None
+    try:
+        data = r.hgetall(cache_key(address, fullname_data))
+    except Exception as e:
+        logger.warning(f"[get_cached_result] Не удалось прочитать кэш результатов: {e}")
+        return None, None
+    checked_at = data.pop(CHECKED_AT, None)
+    age = time.time() - float(checked_at) if checked_at is not None else None
+    if age is None or age > max_age:
+        incr_worker_counter("result_cache_misses_total")
+        return None, None
+    incr_worker_counter("result_cache_hits_total")
+    observe_worker_histogram("result_cache_age_seconds", age, buckets=AGE_BUCKETS)
+    units = {tuple(field.split(UNIT_SEPARATOR)): json.loads(value) for field, value in data.items()}
+    return unflatten_units(units), age
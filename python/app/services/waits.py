@@ -0,0 +1,161 @@
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app.metrics.redis_client import r, incr_worker_counter, observe_worker_histogram
+from app.config.settings import settings
+from app.utils.logger import logger
+
+KEY_LATENCY = "courts:latency"
+LATENCY_TTL = 7 * 24 * 3600
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SLEEP_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Последние задержки сайтов по (хост, вид ожидания); при первом обращении дополняются из Redis
+_samples = {}
+_loaded = set()
+_lock = threading.Lock()
+
+_meter = ContextVar("sleep_meter", default=None)
+
+
+class SleepMeter:
+    """Суммарное время пауз одной задачи (вместе с потоками и корутинами, запущенными из неё)"""
+    def __init__(self):
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self.total += seconds
+
+
+@contextmanager
+def track_sleep(name):
+    """Считает паузы внутри блока и по выходе записывает их в гистограмму {name}_sleep_seconds"""
+    meter = SleepMeter()
+    token = _meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _meter.reset(token)
+        observe_worker_histogram(f"{name}_sleep_seconds", meter.total, buckets=SLEEP_BUCKETS)
+        incr_worker_counter(f"{name}_sleep_seconds_total", meter.total)
+
+def _account(seconds):
+    meter = _meter.get()
+    if meter is not None:
+        meter.add(seconds)
+
+def sleep(seconds):
+    """time.sleep с учётом паузы в SleepMeter текущей задачи"""
+    if seconds <= 0:
+        return
+    _account(seconds)
+    time.sleep(seconds)
+
+async def sleep_async(seconds):
+    if seconds <= 0:
+        return
+    _account(seconds)
+    await asyncio.sleep(seconds)
+
+def backoff_delays(base=None, cap=None):
+    """
+    Паузы между повторами: base, 2·base, 4·base... (не больше cap), каждая случайно
+    уменьшена до половины, чтобы воркеры не повторяли запросы к сайту одновременно
+    """
+    base = settings.WAIT_BACKOFF_BASE if base is None else base
+    cap = settings.WAIT_BACKOFF_CAP if cap is None else cap
+    delay = base
+    while True:
+        current = min(delay, cap)
+        yield current / 2 + random.uniform(0, current / 2)
+        delay *= 2
+
+def _window(host, kind):
+    key = (host, kind)
+    with _lock:
+        samples = _samples.setdefault(key, deque(maxlen=settings.WAIT_LATENCY_WINDOW))
+        if key in _loaded:
+            return samples
+        _loaded.add(key)
+    try:
+        stored = r.lrange(f"{KEY_LATENCY}:{kind}:{host}", 0, settings.WAIT_LATENCY_WINDOW - 1)
+    except Exception as e:
+        logger.warning(f"[waits] Не удалось прочитать задержки {host} ({kind}): {e}")
+        return samples
+    with _lock:
+        for value in reversed(stored):
+            samples.appendleft(float(value))
+    return samples
+
+def record_latency(host, kind, seconds):
+    """Запоминает задержку сайта: общий для воркеров список в Redis и окно в памяти процесса"""
+    samples = _window(host, kind)
+    with _lock:
+        samples.append(seconds)
+    observe_worker_histogram(f"wait_{kind}_seconds", seconds, buckets=LATENCY_BUCKETS)
+    try:
+        key = f"{KEY_LATENCY}:{kind}:{host}"
+        pipe = r.pipeline()
+        pipe.lpush(key, round(seconds, 3))
+        pipe.ltrim(key, 0, settings.WAIT_LATENCY_WINDOW - 1)
+        pipe.expire(key, LATENCY_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"[waits] Не удалось сохранить задержку {host} ({kind}): {e}")
+
+def latency_percentile(host, kind, percentile=None):
+    """Перцентиль задержек сайта или None, если их меньше WAIT_MIN_SAMPLES"""
+    percentile = settings.WAIT_PERCENTILE if percentile is None else percentile
+    samples = _window(host, kind)
+    with _lock:
+        values = sorted(samples)
+    if len(values) < settings.WAIT_MIN_SAMPLES:
+        return None
+    return values[max(math.ceil(percentile / 100 * len(values)) - 1, 0)]
+
+def adaptive_timeout(host, kind, default):
+    """
+    Таймаут ожидания: перцентиль WAIT_PERCENTILE задержек сайта, умноженный на WAIT_TIMEOUT_FACTOR,
+    в пределах WAIT_TIMEOUT_MIN..WAIT_TIMEOUT_MAX. Пока задержек мало — default
+    """
+    if not settings.ADAPTIVE_WAITS:
+        return default
+    latency = latency_percentile(host, kind)
+    if latency is None:
+        return default
+    return min(max(latency * settings.WAIT_TIMEOUT_FACTOR, settings.WAIT_TIMEOUT_MIN), settings.WAIT_TIMEOUT_MAX)
+
+def wait_until(condition, timeout, host=None, kind=None, ignored=()):
+    """
+    Опрашивает condition() с растущими паузами (backoff_delays от WAIT_POLL_INTERVAL до WAIT_POLL_MAX),
+    пока она не вернёт истинное значение, и возвращает его. Исключения ignored считаются ложным значением.
+    TimeoutError — не дождались за timeout секунд. С host и kind время ожидания записывается в задержки сайта,
+    и при таймауте тоже: иначе перцентиль занижен медленными ответами, которых не дождались, и таймаут сжимается
+    """
+    started = time.monotonic()
+    delays = backoff_delays(settings.WAIT_POLL_INTERVAL, settings.WAIT_POLL_MAX)
+    while True:
+        try:
+            value = condition()
+        except ignored:
+            value = None
+        if value:
+            if host and kind:
+                record_latency(host, kind, time.monotonic() - started)
+            return value
+        remaining = timeout - (time.monotonic() - started)
+        if remaining <= 0:
+            if host and kind:
+                record_latency(host, kind, time.monotonic() - started)
+            if kind:
+                incr_worker_counter(f"wait_timeouts_total:{kind}")
+            raise TimeoutError(f"Не дождались {kind or 'условия'} за {timeout:.1f} с")
+        sleep(min(next(delays), remaining))
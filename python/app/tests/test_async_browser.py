@@ -0,0 +1,144 @@
+import asyncio
+import base64
+import json
+import pytest
+import websockets
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.services.async_browser import AsyncBrowser, CDPConnection, CDPError, element_js, set_status_async
+from app.parsers.courts import async_utils
+
+async def fake_chromium(ws):
+    """Отвечает на команды DevTools и шлёт событие загрузки после Page.navigate"""
+    async for raw in ws:
+        message = json.loads(raw)
+        if message["method"] == "Broken.method":
+            await ws.send(json.dumps({"id": message["id"], "error": {"message": "method not found"}}))
+            continue
+        if message["method"] == "Page.navigate":
+            await ws.send(json.dumps({"method": "Page.domContentEventFired", "sessionId": message.get("sessionId"), "params": {}}))
+        await ws.send(json.dumps({"id": message["id"], "result": {"echo": message["method"]}}))
+
+def run_with_server(scenario):
+    async def main():
+        async with websockets.serve(fake_chromium, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            connection = CDPConnection()
+            await connection.connect(f"ws://127.0.0.1:{port}")
+            try:
+                return await scenario(connection)
+            finally:
+                await connection.close()
+    return asyncio.run(main())
+
+class TestCDPConnection:
+    """Тесты для CDPConnection"""
+
+    def test_concurrent_commands_get_own_results(self):
+        """Ответы сопоставляются с командами по id"""
+        async def scenario(connection):
+            return await asyncio.gather(*(connection.send(f"Test.method{i}") for i in range(20)))
+        results = run_with_server(scenario)
+        assert [r["echo"] for r in results] == [f"Test.method{i}" for i in range(20)]
+
+    def test_error_raises(self):
+        """Ошибка из ответа браузера превращается в CDPError"""
+        async def scenario(connection):
+            with pytest.raises(CDPError):
+                await connection.send("Broken.method")
+        run_with_server(scenario)
+
+    def test_events_routed_by_session(self):
+        """События доставляются только подписчикам своей сессии"""
+        received = []
+        async def scenario(connection):
+            connection.on("session-1", "Page.domContentEventFired", lambda params: received.append("session-1"))
+            connection.on("session-2", "Page.domContentEventFired", lambda params: received.append("session-2"))
+            await connection.send("Page.navigate", {"url": "about:blank"}, session_id="session-1")
+        run_with_server(scenario)
+        assert received == ["session-1"]
+
+class TestElementJs:
+    """Тесты для element_js"""
+
+    def test_css_and_xpath(self):
+        """CSS-селектор ищется через querySelector, XPath — через document.evaluate"""
+        assert element_js("#tablcont") == 'document.querySelector("#tablcont")'
+        assert element_js("//a[@title='x']").startswith('document.evaluate("//a[@title=\'x\']"')
+
+class TestCaptchaImageAsync:
+    """Тесты для captcha_image_bytes_async"""
+
+    @pytest.fixture(autouse=True)
+    def no_metrics(self):
+        with patch.object(async_utils, "incr_worker_counter"), \
+             patch.object(async_utils, "observe_worker_histogram") as histogram, \
+             patch.object(async_utils.settings, "HOST_GOVERNOR_ENABLED", False), \
+             patch.object(async_utils.settings, "BREAKER_ENABLED", False):
+            self.histogram = histogram
+            yield
+
+    def test_fetched_from_page(self):
+        page = AsyncMock()
+        page.evaluate.side_effect = ["https://court.test/captcha.php", base64.b64encode(b"png").decode()]
+        assert asyncio.run(async_utils.captcha_image_bytes_async(page, 'img[src="/captcha.php"]')) == b"png"
+        page.screenshot_element.assert_not_called()
+        assert page.evaluate.call_args.kwargs == {"await_promise": True}
+        assert self.histogram.call_args.args[0] == "captcha_image_fetch_seconds"
+
+    def test_screenshot_fallback(self):
+        page = AsyncMock()
+        page.evaluate.side_effect = ["https://court.test/captcha.php", CDPError("TypeError: Failed to fetch")]
+        page.screenshot_element.return_value = b"screenshot"
+        assert asyncio.run(async_utils.captcha_image_bytes_async(page, 'img[src="/captcha.php"]')) == b"screenshot"
+        assert self.histogram.call_args.args[0] == "captcha_image_screenshot_seconds"
+
+class TestAsyncBrowserPage:
+    """Тесты для AsyncBrowser.page"""
+
+    def make_browser(self, attach_error=None):
+        connection = CDPConnection()
+        async def send(method, params=None, session_id=None, timeout=60):
+            if method == "Target.attachToTarget" and attach_error:
+                raise attach_error
+            return {"browserContextId": "ctx-1", "targetId": "target-1", "sessionId": "session-1"}
+        connection.send = AsyncMock(side_effect=send)
+        browser = AsyncBrowser(shared_browser=Mock(resource_policy=None))
+        browser.connection = connection
+        browser.connect = AsyncMock()
+        return browser, connection
+
+    def test_session_listeners_removed(self):
+        browser, connection = self.make_browser()
+        connection.on(None, "Target.targetCrashed", print)
+        async def scenario():
+            async with browser.page() as page:
+                connection.on(page.session_id, "Page.loadEventFired", print)
+        asyncio.run(scenario())
+        assert list(connection._listeners) == [(None, "Target.targetCrashed")]
+        connection.send.assert_any_call("Target.disposeBrowserContext", {"browserContextId": "ctx-1"})
+
+    def test_attach_failure_keeps_browser_listeners(self):
+        """Сессия не создана: подписки браузера остаются, контекст удаляется"""
+        browser, connection = self.make_browser(attach_error=CDPError("нет вкладки"))
+        connection.on(None, "Target.targetCrashed", print)
+        async def scenario():
+            async with browser.page():
+                pass
+        with pytest.raises(CDPError):
+            asyncio.run(scenario())
+        assert list(connection._listeners) == [(None, "Target.targetCrashed")]
+        connection.send.assert_any_call("Target.disposeBrowserContext", {"browserContextId": "ctx-1"})
+
+class TestSetStatusAsync:
+    """Тесты для set_status_async"""
+
+    def test_status_written_under_task_id(self):
+        """Статус из асинхронного движка пишется под id задачи, а не None"""
+        from app.celery.celery_app import celery_app, progress_reporter
+        task = Mock(request=Mock(id="task-1"))
+        set_status = progress_reporter(task)
+        task.request.id = None
+        asyncio.run(set_status_async(set_status, "Проверка категории", "Суд"))
+        task.update_state.assert_called_once_with(task_id="task-1", state="PROGRESS",
+                                                  meta={"status": "Проверка категории", "court_name": "Суд"})
@@ -0,0 +1,134 @@
+import pytest
+from unittest.mock import Mock, patch
+from fnmatch import fnmatch
+from app.services.browser import DriverPool, ResourcePolicy, RESOURCE_POLICIES, collect_resource_stats, open_tab, close_tabs
+
+@pytest.fixture(autouse=True)
+def no_redis_metrics():
+    with patch("app.services.browser.set_worker_gauge"), \
+         patch("app.services.browser.observe_worker_histogram"), \
+         patch("app.services.browser.incr_worker_counter"):
+        yield
+
+def make_driver():
+    driver = Mock()
+    driver.window_handles = ["main"]
+    return driver
+
+class TestDriverPool:
+    """Тесты для DriverPool"""
+
+    def test_driver_reused_between_leases(self):
+        """Драйвер возвращается в пул и выдаётся повторно"""
+        factory = Mock(side_effect=make_driver)
+        pool = DriverPool(size=2, max_uses=5, max_age=3600, factory=factory)
+        with pool.lease() as first:
+            pass
+        with pool.lease() as second:
+            pass
+        assert first is second
+        assert factory.call_count == 1
+        first.execute_cdp_cmd.assert_called_with("Network.clearBrowserCookies", {})
+
+    def test_driver_recycled_after_max_uses(self):
+        """Драйвер пересоздаётся после max_uses выдач"""
+        factory = Mock(side_effect=make_driver)
+        pool = DriverPool(size=1, max_uses=1, max_age=3600, factory=factory)
+        with pool.lease() as first:
+            pass
+        with pool.lease() as second:
+            pass
+        assert first is not second
+        first.quit.assert_called_once()
+
+    def test_unhealthy_driver_replaced(self):
+        """Неотвечающий драйвер не выдаётся задаче"""
+        factory = Mock(side_effect=make_driver)
+        pool = DriverPool(size=1, max_uses=5, max_age=3600, factory=factory)
+        with pool.lease() as first:
+            pass
+        first.execute_script.side_effect = Exception("session deleted")
+        with pool.lease() as second:
+            pass
+        assert first is not second
+        first.quit.assert_called_once()
+
+    def test_lease_timeout_when_pool_exhausted(self):
+        """Если все драйверы заняты, lease ждёт и завершается ошибкой по таймауту"""
+        pool = DriverPool(size=1, max_uses=5, max_age=3600, factory=make_driver)
+        with pool.lease():
+            with pytest.raises(RuntimeError):
+                with pool.lease(timeout=0.1):
+                    pass
+
+    def test_warm_prelaunches_drivers(self):
+        """Прогрев запускает драйверы заранее"""
+        factory = Mock(side_effect=make_driver)
+        pool = DriverPool(size=3, max_uses=5, max_age=3600, factory=factory)
+        pool.warm(2)
+        assert factory.call_count == 2
+        pool.close()
+
+
+class TestResourcePolicy:
+    """Тесты для ResourcePolicy"""
+
+    def test_captcha_never_blocked(self):
+        """Изображение капчи blue не попадает под блокировку"""
+        patterns = ResourcePolicy().patterns()
+        assert not any(fnmatch("https://4len.nsk.msudrf.ru/captcha.php", p) for p in patterns)
+        assert any(fnmatch("https://4len.nsk.msudrf.ru/images/banner.png", p) for p in patterns)
+        assert any(fnmatch("https://mc.yandex.ru/watch/123", p) for p in patterns)
+
+    def test_css_blocked_only_by_strict(self):
+        """Стили по умолчанию загружаются, блокирует их только политика strict"""
+        assert not any(fnmatch("https://court.ru/style.css", p) for p in RESOURCE_POLICIES["default"].patterns())
+        assert any(fnmatch("https://court.ru/style.css", p) for p in RESOURCE_POLICIES["strict"].patterns())
+
+    @patch("app.services.browser.incr_worker_counter")
+    def test_blocked_requests_counted_by_type(self, mock_incr):
+        """Заблокированные запросы считаются по типам ресурсов"""
+        driver = Mock()
+        driver.collect_resource_stats = True
+        driver.get_log.return_value = [
+            {"message": '{"message": {"method": "Network.requestWillBeSent", "params": {"requestId": "1", "type": "Image"}}}'},
+            {"message": '{"message": {"method": "Network.loadingFailed", "params": {"requestId": "1", "type": "Image", "blockedReason": "inspector"}}}'},
+            {"message": '{"message": {"method": "Network.requestWillBeSent", "params": {"requestId": "2", "type": "Document"}}}'},
+            {"message": '{"message": {"method": "Network.loadingFinished", "params": {"requestId": "2", "encodedDataLength": 512}}}'},
+        ]
+        collect_resource_stats(driver)
+        mock_incr.assert_any_call("blocked_requests_total:Image", 1)
+        mock_incr.assert_any_call("loaded_bytes_total:Document", 512)
+
+class TestTabs:
+    """Тесты для open_tab и close_tabs"""
+
+    def test_tab_created_in_task_context(self):
+        """В режиме shared вкладка создаётся в контексте задачи"""
+        driver = make_driver()
+        driver.browser_context_id = "ctx-1"
+        driver.execute_cdp_cmd.return_value = {"targetId": "tab-2"}
+        open_tab(driver)
+        driver.execute_cdp_cmd.assert_any_call("Target.createTarget", {"url": "about:blank", "browserContextId": "ctx-1"})
+        driver.switch_to.window.assert_called_with("tab-2")
+        driver.switch_to.new_window.assert_not_called()
+
+    def test_tab_gets_user_agent_and_blocking(self):
+        """Новая вкладка получает User-Agent контекста и блокировку ресурсов, как основная"""
+        driver = make_driver()
+        driver.browser_context_id = "ctx-1"
+        driver.tab_user_agent = "Mozilla/5.0 test"
+        driver.resource_policy = RESOURCE_POLICIES["default"]
+        driver.execute_cdp_cmd.return_value = {"targetId": "tab-2"}
+        open_tab(driver)
+        methods = [call.args[0] for call in driver.execute_cdp_cmd.call_args_list]
+        assert methods == ["Target.createTarget", "Network.setUserAgentOverride", "Network.enable", "Network.setBlockedURLs"]
+        driver.execute_cdp_cmd.assert_any_call("Network.setUserAgentOverride", {"userAgent": "Mozilla/5.0 test"})
+        driver.execute_cdp_cmd.assert_any_call("Network.setBlockedURLs", {"urls": RESOURCE_POLICIES["default"].patterns()})
+
+    def test_close_tabs_keeps_main(self):
+        """Закрываются только открытые вкладки, основная остаётся активной"""
+        driver = make_driver()
+        close_tabs(driver, ["main", "tab-2", "tab-3"], "main")
+        assert driver.close.call_count == 2
+        driver.switch_to.window.assert_called_with("main")
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import threading
+import pytest
+from unittest.mock import patch
+
+from app.captcha import inference
+from app.captcha.inference import CaptchaBatcher, CaptchaClient, CaptchaResult, ctc_decode, create_server, predict
+
+CHARS = "0123456789"
+BLANK = len(CHARS)
+
+
+class FakeModel:
+    """predict_batch без torch: текст — содержимое картинки, пустая картинка не читается"""
+    def __init__(self):
+        self.batches = []
+
+    def predict_batch(self, images):
+        self.batches.append(len(images))
+        return [CaptchaResult(image.decode(), [0.9] * len(image)) if image else ValueError("пустая картинка")
+                for image in images]
+
+
+@pytest.fixture
+def metrics():
+    with patch.object(inference, "observe_worker_histogram") as observe, \
+         patch.object(inference, "incr_worker_counter") as incr:
+        yield observe, incr
+
+@pytest.fixture
+def batcher(metrics):
+    model = FakeModel()
+    batcher = CaptchaBatcher("test", model.predict_batch, max_batch=8, window=0.1)
+    with patch.object(inference, "_batchers", {"yellow": batcher}):
+        yield model
+
+class TestCtcDecode:
+    """Тесты для ctc_decode"""
+
+    def test_collapses_repeats_and_blanks(self):
+        preds = [1, 1, BLANK, 1, 2, 2, BLANK, BLANK, 3]
+        probs = [0.5, 0.9, 0.99, 0.7, 0.6, 0.8, 0.99, 0.99, 0.95]
+        result = ctc_decode(preds, probs, CHARS)
+        assert result.text == "1123"
+        assert result.confidence == [0.9, 0.7, 0.8, 0.95]
+
+    def test_only_blanks(self):
+        assert ctc_decode([BLANK, BLANK], [0.9, 0.9], CHARS) == CaptchaResult("", [])
+
+class TestCaptchaBatcher:
+    """Тесты для CaptchaBatcher"""
+
+    def test_concurrent_requests_share_batch(self, batcher, metrics):
+        results = {}
+        def run(text):
+            results[text] = predict("yellow", text.encode())
+        threads = [threading.Thread(target=run, args=(str(n) * 4,)) for n in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert batcher.batches == [5]
+        assert {text: result.text for text, result in results.items()} == {text: text for text in results}
+        observe, _ = metrics
+        observe.assert_any_call("captcha_test_batch_size", 5, buckets=inference.BATCH_BUCKETS)
+        observe.assert_any_call("captcha_yellow_confidence", 0.9, buckets=inference.CONFIDENCE_BUCKETS)
+
+    def test_error_only_for_failed_image(self, batcher):
+        bad = inference._batchers["yellow"].submit(b"")
+        good = inference._batchers["yellow"].submit(b"42")
+        with pytest.raises(ValueError):
+            bad.result(5)
+        assert good.result(5).text == "42"
+
+    def test_survives_fatal_batch(self, metrics):
+        """Ошибка вне Exception достаётся запросам пакета, следующие пакеты распознаются"""
+        class Fatal(BaseException):
+            pass
+        calls = []
+        def predict_batch(images):
+            calls.append(images)
+            if len(calls) == 1:
+                raise Fatal("сбой модели")
+            return [CaptchaResult(image.decode()) for image in images]
+        batcher = CaptchaBatcher("test", predict_batch, window=0)
+        with pytest.raises(RuntimeError):
+            batcher.submit(b"1").result(5)
+        assert batcher.submit(b"2").result(5).text == "2"
+        metrics[1].assert_called_once_with("captcha_test_batch_errors_total")
+
+class TestSocketServer:
+    """Тесты для сервера распознавания на сокете"""
+
+    def test_round_trip_and_errors(self, batcher):
+        path = os.path.join(tempfile.mkdtemp(), "captcha.sock")
+        server = create_server(path)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            client = CaptchaClient(path)
+            assert client.predict("yellow", b"1234") == CaptchaResult("1234", [0.9] * 4)
+            with pytest.raises(RuntimeError):
+                client.predict("yellow", b"")
+            assert client.predict("yellow", b"5678").text == "5678"
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_falls_back_to_local_without_server(self, batcher, metrics):
+        with patch.object(inference.settings, "CAPTCHA_INFERENCE", "socket"), \
+             patch.object(inference, "_client", CaptchaClient(os.path.join(tempfile.mkdtemp(), "missing.sock"))):
+            assert predict("yellow", b"77").text == "77"
+        metrics[1].assert_called_once_with("captcha_socket_fallback_total")
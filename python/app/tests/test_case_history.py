@@ -0,0 +1,85 @@
+import time
+import pytest
+from unittest.mock import patch
+
+from app.services import case_history, checkpoints
+from app.services.case_history import CaseHistory
+from app.services.checkpoints import Checkpoint
+from app.parsers.courts.records import CaseRecord, CASE_FIELDS
+
+class FakeRedis:
+    """Минимальный Redis в памяти: хэши и pipeline"""
+    def __init__(self):
+        self.data = {}
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def hset(self, key, field, value):
+        self.data.setdefault(key, {})[field] = value
+
+    def expire(self, key, seconds):
+        pass
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+@pytest.fixture
+def redis():
+    fake = FakeRedis()
+    with patch.object(case_history, "r", fake), \
+         patch.object(checkpoints, "r", fake), \
+         patch.object(case_history, "incr_worker_counter"), \
+         patch.object(checkpoints, "incr_worker_counter"), \
+         patch.object(case_history.settings, "INCREMENTAL_CHECKS", True), \
+         patch.object(case_history.settings, "RESULT_FORMAT", "records"), \
+         patch.object(case_history.settings, "INCREMENTAL_FULL_RECHECK", 3600):
+        yield fake
+
+FULLNAME = {"surname": "Иванов", "name": "Иван", "patronymic": "Иванович"}
+UNIT = ("Суд", "Иванов И.И.", "Гражданские дела")
+RECORDS = {"columns": CASE_FIELDS, "rows": [CaseRecord("2-1/2024", "15.03.2024", "Иванов И.И.", "", "", None)]}
+
+class TestCaseHistory:
+    """Тесты для CaseHistory"""
+
+    def test_known_after_previous_check(self, redis):
+        Checkpoint.for_check("https://court.test", FULLNAME).save(*UNIT, result=RECORDS)
+        known = Checkpoint.for_check("https://www.court.test/", {**FULLNAME, "surname": "иванов"}).known(*UNIT)
+        assert known.date_from == "15.03.2024"
+        assert known.rows == RECORDS["rows"]
+
+    def test_titles_kept(self, redis):
+        """Заголовки сайта сохраняются в истории вместе с делами"""
+        result = {**RECORDS, "titles": {"number": "№ дела"}, "extra": ["Судья"]}
+        CaseHistory.for_check("https://court.test", FULLNAME).update(*UNIT, result=result)
+        known = CaseHistory.for_check("https://court.test", FULLNAME).known(*UNIT)
+        assert known.empty_result("нет")["titles"] == {"number": "№ дела"}
+        assert known.empty_result("нет")["extra"] == ["Судья"]
+
+    def test_full_recheck_when_stale(self, redis):
+        CaseHistory.for_check("https://court.test", FULLNAME).update(*UNIT, result=RECORDS)
+        with patch.object(case_history.time, "time", return_value=time.time() + 7200):
+            assert CaseHistory.for_check("https://court.test", FULLNAME).known(*UNIT) is None
+
+    def test_incremental_keeps_full_check_time(self, redis):
+        """Инкрементальная проверка не продлевает срок до следующей полной"""
+        CaseHistory.for_check("https://court.test", FULLNAME).update(*UNIT, result=RECORDS)
+        with patch.object(case_history.time, "time", return_value=time.time() + 3000):
+            history = CaseHistory.for_check("https://court.test", FULLNAME)
+            assert history.known(*UNIT) is not None
+            history.update(*UNIT, result=RECORDS)
+        with patch.object(case_history.time, "time", return_value=time.time() + 4000):
+            assert CaseHistory.for_check("https://court.test", FULLNAME).known(*UNIT) is None
+
+    def test_placeholders_and_html_format_not_stored(self, redis):
+        CaseHistory.for_check("https://court.test", FULLNAME).update(*UNIT, result="<div class='placeholder'>Дела не найдены</div>")
+        assert redis.data == {}
+        with patch.object(case_history.settings, "RESULT_FORMAT", "html"):
+            assert CaseHistory.for_check("https://court.test", FULLNAME).key is None
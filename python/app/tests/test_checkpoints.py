@@ -0,0 +1,84 @@
+import pytest
+from unittest.mock import Mock, patch
+
+from app.services import checkpoints
+from app.services.checkpoints import Checkpoint, input_hash
+from app.parsers.courts.records import CaseRecord, CASE_FIELDS
+
+class FakeRedis:
+    """Минимальный Redis в памяти: хэши и pipeline"""
+    def __init__(self):
+        self.data = {}
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def hset(self, key, field, value):
+        self.data.setdefault(key, {})[field] = value
+
+    def expire(self, key, seconds):
+        pass
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+@pytest.fixture
+def redis():
+    fake = FakeRedis()
+    with patch.object(checkpoints, "r", fake), \
+         patch.object(checkpoints, "incr_worker_counter"), \
+         patch.object(checkpoints.settings, "CHECKPOINT_ENABLED", True), \
+         patch.object(checkpoints.settings, "INCREMENTAL_CHECKS", False):
+        yield fake
+
+FULLNAME = {"surname": "Иванов", "name": "Иван", "patronymic": "Иванович"}
+
+class TestInputHash:
+    """Тесты для input_hash"""
+
+    def test_same_for_equivalent_address(self):
+        assert input_hash("https://court.test/", FULLNAME) == input_hash("https://COURT.test", dict(reversed(FULLNAME.items())))
+
+    def test_differs_by_name(self):
+        assert input_hash("https://court.test", FULLNAME) != input_hash("https://court.test", {**FULLNAME, "name": "Пётр"})
+
+class TestCheckpoint:
+    """Тесты для Checkpoint"""
+
+    def test_units_survive_retry(self, redis):
+        records = {"columns": CASE_FIELDS, "rows": [CaseRecord("2-1/2024", "", "Иванов И.И.", "", "", None)]}
+        first = Checkpoint.for_check("https://court.test", FULLNAME)
+        first.save("Суд", "Иванов И.И.", "Гражданские дела", result=records)
+        first.save("Суд", "Иванов И.И.", "Уголовные дела", "Первая инстанция", result="<div class='placeholder'>Дела не найдены</div>")
+
+        retried = Checkpoint.for_check("https://court.test/", FULLNAME)
+        assert retried.get("Суд", "Иванов И.И.", "Гражданские дела") == {
+            "columns": CASE_FIELDS, "rows": [["2-1/2024", "", "Иванов И.И.", "", "", None, None]]}
+        assert retried.get("Суд", "Иванов И.И.", "Уголовные дела", "Первая инстанция") == "<div class='placeholder'>Дела не найдены</div>"
+        assert retried.get("Суд", "Иванов И.И.", "Уголовные дела") is None
+
+    def test_clear_after_success(self, redis):
+        checkpoint = Checkpoint.for_check("https://court.test", FULLNAME)
+        checkpoint.save("Суд", "Иванов И.И.", "Гражданские дела", result="x")
+        checkpoint.clear()
+        assert Checkpoint.for_check("https://court.test", FULLNAME).units == {}
+
+    def test_without_key_nothing_stored(self, redis):
+        checkpoint = Checkpoint()
+        checkpoint.save("Суд", "Иванов И.И.", "Гражданские дела", result="x")
+        assert redis.data == {}
+        with patch.object(checkpoints.settings, "CHECKPOINT_ENABLED", False):
+            assert Checkpoint.for_check("https://court.test", FULLNAME).key is None
+
+    def test_redis_error_does_not_break_check(self, redis):
+        with patch.object(checkpoints, "r", Mock(hgetall=Mock(side_effect=ConnectionError("down")),
+                                                  pipeline=Mock(side_effect=ConnectionError("down")))):
+            checkpoint = Checkpoint.for_check("https://court.test", FULLNAME)
+            checkpoint.save("Суд", "Иванов И.И.", "Гражданские дела", result="x")
+        assert checkpoint.get("Суд", "Иванов И.И.", "Гражданские дела") == "x"
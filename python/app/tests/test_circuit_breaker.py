@@ -0,0 +1,110 @@
+import time
+import pytest
+from unittest.mock import patch
+
+from app.services import circuit_breaker
+from app.services.circuit_breaker import CourtUnavailable, ensure_available, record_result, get_breaker_states
+
+class FakeRedis:
+    """Минимальный Redis в памяти: строки, счётчики и pipeline"""
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        value = self.data.get(key)
+        return None if value is None else str(value)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    def expire(self, key, seconds):
+        pass
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, pattern):
+        return [key for key in list(self.data) if key.startswith(pattern.rstrip("*"))]
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+@pytest.fixture
+def redis():
+    fake = FakeRedis()
+    with patch.object(circuit_breaker, "r", fake), \
+         patch.object(circuit_breaker, "incr_worker_counter") as counter, \
+         patch.object(circuit_breaker, "_failing", set()), \
+         patch.object(circuit_breaker, "_probing", set()), \
+         patch.object(circuit_breaker.settings, "BREAKER_ENABLED", True), \
+         patch.object(circuit_breaker.settings, "BREAKER_THRESHOLD", 3), \
+         patch.object(circuit_breaker.settings, "BREAKER_COOLDOWN", 300):
+        fake.counter = counter
+        yield fake
+
+URL = "https://court.test/modules.php?name=sud_delo"
+
+def trip(url=URL):
+    for _ in range(3):
+        record_result(url, False)
+
+class TestCircuitBreaker:
+    """Тесты для выключателя сайта"""
+
+    def test_trips_after_threshold(self, redis):
+        trip()
+        with pytest.raises(CourtUnavailable) as error:
+            ensure_available("http://www.court.test/")
+        assert error.value.host == "court.test"
+        redis.counter.assert_any_call("breaker_trips_total:court.test")
+        redis.counter.assert_any_call("breaker_fast_fail_total:court.test")
+        assert get_breaker_states() == {"court.test": "open"}
+
+    def test_success_resets_failures(self, redis):
+        record_result(URL, False)
+        record_result(URL, False)
+        record_result(URL, True)
+        record_result(URL, False)
+        ensure_available(URL)
+
+    def test_single_probe_after_cooldown(self, redis):
+        trip()
+        with patch.object(circuit_breaker.time, "time", return_value=time.time() + 301):
+            ensure_available(URL)
+            assert get_breaker_states() == {"court.test": "half_open"}
+            with patch.object(circuit_breaker, "WORKER_ID", "other-worker"):
+                with pytest.raises(CourtUnavailable):
+                    ensure_available(URL)
+            record_result(URL, True)
+        ensure_available(URL)
+        assert get_breaker_states() == {}
+
+    def test_failed_probe_reopens(self, redis):
+        trip()
+        with patch.object(circuit_breaker.time, "time", return_value=time.time() + 301):
+            ensure_available(URL)
+            record_result(URL, False)
+            with pytest.raises(CourtUnavailable):
+                ensure_available(URL)
+
+    def test_trip_does_not_raise(self, redis):
+        """Ответ сайта только размыкает выключатель: ошибку получают следующие запросы, её ловит except Exception"""
+        trip()
+        assert get_breaker_states() == {"court.test": "open"}
+        try:
+            ensure_available(URL)
+        except Exception as e:
+            assert isinstance(e, CourtUnavailable)
+        else:
+            pytest.fail("выключатель не разомкнут")
@@ -0,0 +1,84 @@
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from app.services import court_registry
+from app.services.court_registry import court_host, get_court_meta, update_court_meta, CourtMeta
+
+class FakeRedis:
+    """Минимальный Redis в памяти: get/set/delete"""
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+@pytest.fixture
+def redis():
+    fake = FakeRedis()
+    with patch.object(court_registry, "r", fake), \
+         patch.object(court_registry, "incr_worker_counter"), \
+         patch.object(court_registry.settings, "COURT_REGISTRY_ENABLED", True):
+        yield fake
+
+class TestCourtHost:
+    """Тесты для court_host"""
+
+    @pytest.mark.parametrize("address", [
+        "https://k-h2.ros.msudrf.ru", "http://WWW.k-h2.ros.msudrf.ru/", "k-h2.ros.msudrf.ru",
+        "https://k-h2.ros.msudrf.ru:443/modules.php?name=sud_delo",
+    ])
+    def test_same_host(self, address):
+        assert court_host(address) == "k-h2.ros.msudrf.ru"
+
+class TestRegistry:
+    """Тесты реестра судов"""
+
+    def test_update_and_get(self, redis):
+        update_court_meta("https://court.test", type="yellow", name="Суд")
+        update_court_meta("http://www.court.test/", layout="multi", servers=[{"name": "1", "url": "http://s1"}])
+        meta = get_court_meta("court.test")
+        assert (meta.type, meta.name, meta.layout) == ("yellow", "Суд", "multi")
+        assert meta.servers == [{"name": "1", "url": "http://s1"}]
+
+    def test_categories_kept_per_server(self, redis):
+        categories = {"1": {"Уголовные дела": [{"name": "Первая инстанция", "delo_id": "1540006", "onclick": "select_delo_id_new('1540006')"}]}}
+        update_court_meta("https://court.test", layout="regular", categories=categories)
+        update_court_meta("https://court.test", type="yellow", name="Суд")
+        assert get_court_meta("https://court.test").categories == categories
+
+    def test_missing(self, redis):
+        assert get_court_meta("https://unknown.test") is None
+
+    def test_stale_entry_revalidated_once(self, redis):
+        update_court_meta("https://court.test", type="blue", name="Суд")
+        with patch.object(court_registry.time, "time", return_value=time.time() + 10 ** 7), \
+             patch("app.celery.celery_app.celery_app.send_task") as send_task:
+            assert get_court_meta("https://court.test").type == "blue"
+            get_court_meta("https://court.test")
+        send_task.assert_called_once_with("revalidate_court", args=["https://court.test"], queue="court_verifications")
+
+    def test_redis_error_is_miss(self, redis):
+        with patch.object(court_registry, "r", Mock(get=Mock(side_effect=ConnectionError("down")))):
+            assert get_court_meta("https://court.test") is None
+
+class TestGetCourtInfo:
+    """get_court_info берёт сведения из реестра, не открывая сайт"""
+
+    def test_registry_hit_without_driver(self):
+        from app.parsers.courts import utils
+        meta = CourtMeta(type="blue", name="Суд")
+        with patch.object(utils, "get_court_meta", return_value=meta), \
+             patch.object(utils, "lease_driver") as lease_driver:
+            info = utils.get_court_info("https://court.test", None)
+        assert (info.supported, info.type, info.name) == (True, "blue", "Суд")
+        lease_driver.assert_not_called()
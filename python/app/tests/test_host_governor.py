@@ -0,0 +1,68 @@
+import pytest
+from unittest.mock import Mock, patch
+
+from app.services import host_governor
+from app.services.host_governor import host_slot, report_response, report_status
+
+@pytest.fixture
+def governor():
+    """Скрипты Redis заменены моками, метрики и ожидание не выполняются"""
+    with patch.object(host_governor, "_acquire") as acquire, \
+         patch.object(host_governor, "_adjust") as adjust, \
+         patch.object(host_governor, "r") as redis, \
+         patch.object(host_governor, "incr_worker_counter") as counter, \
+         patch.object(host_governor, "observe_worker_histogram") as histogram, \
+         patch.object(host_governor, "sleep") as sleep, \
+         patch.object(host_governor, "_rates", {}), \
+         patch.object(host_governor, "ensure_available"), \
+         patch.object(host_governor, "record_result"), \
+         patch.object(host_governor.settings, "HOST_GOVERNOR_ENABLED", True), \
+         patch.object(host_governor.settings, "HOST_RATE", 5.0):
+        yield Mock(acquire=acquire, adjust=adjust, redis=redis, counter=counter, histogram=histogram, sleep=sleep)
+
+class TestHostSlot:
+    """Тесты для host_slot"""
+
+    def test_waits_for_token_and_releases(self, governor):
+        governor.acquire.side_effect = [[0, "0.4", "5"], [1, "5"]]
+        with host_slot("https://www.court.test/modules.php?name=sud_delo"):
+            lease_id = governor.acquire.call_args.kwargs["args"][4]
+        assert governor.acquire.call_args.kwargs["keys"] == ["courts:governor:bucket:court.test", "courts:governor:inflight:court.test"]
+        governor.sleep.assert_called_once_with(0.4)
+        governor.redis.zrem.assert_called_once_with("courts:governor:inflight:court.test", lease_id)
+        governor.counter.assert_any_call("host_throttled_total:court.test")
+        assert governor.histogram.call_args.args[0] == "host_queue_wait_seconds"
+
+    def test_redis_down_does_not_block(self, governor):
+        governor.acquire.side_effect = ConnectionError("down")
+        with host_slot("https://court.test"):
+            pass
+        governor.redis.zrem.assert_not_called()
+
+    def test_gives_up_after_timeout(self, governor):
+        governor.acquire.return_value = [0, "30", "0.2"]
+        with patch.object(host_governor.settings, "HOST_SLOT_TIMEOUT", 10):
+            with host_slot("https://court.test"):
+                pass
+        governor.counter.assert_any_call("host_slot_timeouts_total:court.test")
+        governor.redis.zrem.assert_not_called()
+
+class TestReportResponse:
+    """AIMD-подстройка скорости запросов"""
+
+    def test_error_lowers_rate(self, governor):
+        governor.adjust.return_value = "2.5"
+        report_status("https://court.test/page", 503)
+        assert governor.adjust.call_args.kwargs["args"][0] == 0
+        governor.counter.assert_any_call("host_backoff_total:court.test")
+        assert host_governor._known_rate("court.test") == 2.5
+
+    def test_success_at_full_rate_skips_redis(self, governor):
+        report_response("https://court.test", True)
+        governor.adjust.assert_not_called()
+
+    def test_success_restores_lowered_rate(self, governor):
+        host_governor._remember_rate("court.test", 1.0)
+        governor.adjust.return_value = "1.1"
+        report_status("https://court.test", 200)
+        assert governor.adjust.call_args.kwargs["args"][0] == 1
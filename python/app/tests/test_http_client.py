@@ -0,0 +1,79 @@
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from app.services.http_client import fetch_pages, session_from_driver
+
+@pytest.fixture(autouse=True)
+def per_host_limit():
+    with patch("app.services.http_client.settings.PAGE_FETCH_PER_HOST", 2), \
+         patch("app.services.http_client._host_semaphores", {}):
+        yield
+
+class TestFetchPages:
+    """Тесты для fetch_pages"""
+
+    def test_results_in_url_order(self):
+        urls = [f"http://court.test/?page={n}" for n in range(5)]
+        def fetch(url):
+            # Последние страницы отвечают быстрее первых
+            time.sleep(0.01 * (5 - int(url[-1])))
+            return url
+        assert list(fetch_pages(urls, fetch)) == urls
+
+    def test_error_gives_none(self):
+        def fetch(url):
+            if url.endswith("1"):
+                raise RuntimeError("timeout")
+            return url
+        assert list(fetch_pages(["http://a/0", "http://a/1", "http://a/2"], fetch)) == ["http://a/0", None, "http://a/2"]
+
+    def test_per_host_limit(self):
+        """К одному сайту одновременно не больше PAGE_FETCH_PER_HOST запросов"""
+        active, peak = [0], [0]
+        lock = threading.Lock()
+        def fetch(url):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+        list(fetch_pages([f"http://court.test/?page={n}" for n in range(6)], fetch))
+        assert peak[0] == 2
+
+    def test_stops_after_consumer(self):
+        """Следующая пачка не загружается, если вызывающий перестал читать результаты"""
+        fetched = []
+        lock = threading.Lock()
+        def fetch(url):
+            with lock:
+                fetched.append(url)
+            return url
+        pages = fetch_pages([f"http://court.test/?page={n}" for n in range(6)], fetch)
+        assert next(pages) == "http://court.test/?page=0"
+        pages.close()
+        assert set(fetched) <= {"http://court.test/?page=0", "http://court.test/?page=1"}
+
+    def test_sleep_counted_in_task(self):
+        """Паузы в потоках загрузки учитываются в SleepMeter задачи"""
+        from app.services import waits
+        with patch.object(waits.time, "sleep"), patch.object(waits, "observe_worker_histogram"), \
+             patch.object(waits, "incr_worker_counter"), waits.track_sleep("check_court") as meter:
+            list(fetch_pages([f"http://court.test/?page={n}" for n in range(3)], lambda url: waits.sleep(0.5)))
+        assert meter.total == 1.5
+
+    def test_no_urls(self):
+        assert list(fetch_pages([], Mock())) == []
+
+class TestSessionFromDriver:
+    """Тесты для session_from_driver"""
+
+    def test_cookies_and_user_agent(self):
+        driver = Mock()
+        driver.execute_script.return_value = "Mozilla/5.0 Test"
+        driver.get_cookies.return_value = [{"name": "PHPSESSID", "value": "abc", "domain": "court.test", "path": "/"}]
+        session = session_from_driver(driver)
+        assert session.headers["User-Agent"] == "Mozilla/5.0 Test"
+        assert session.cookies.get("PHPSESSID", domain="court.test") == "abc"
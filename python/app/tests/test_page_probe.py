@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import Mock, patch
+from selenium.common.exceptions import UnexpectedAlertPresentException
+
+from app.parsers.courts import utils
+from app.services.court_registry import CourtMeta
+from app.parsers.courts.utils import CourtInfo, get_court_info_http, probe_page, verify_page
+
+def probe_result(**overrides):
+    result = {
+        "title": "Суд",
+        "bad_gateway": False,
+        "service_unavailable": False,
+        "unavailable_message": False,
+        "captcha": False,
+        "elements": {},
+        "html_length": 50000,
+    }
+    result.update(overrides)
+    return result
+
+@pytest.fixture
+def counters():
+    with patch("app.parsers.courts.utils.incr_worker_counter") as counter, \
+         patch("app.parsers.courts.utils.sleep"):
+        yield counter
+
+class TestProbePage:
+    """Тесты для probe_page и verify_page"""
+
+    def test_single_script_call(self, counters):
+        """Состояние страницы получается одним вызовом скрипта без page_source"""
+        driver = Mock()
+        driver.execute_script.return_value = probe_result(elements={"table": True})
+        status = probe_page(driver, {"table": "#tablcont"})
+        assert driver.execute_script.call_count == 1
+        assert status.elements == {"table": True}
+        assert not status.server_error
+        counters.assert_any_call("page_probe_page_bytes_total", 50000)
+
+    def test_alert_reported(self, counters):
+        """Открытый alert не ломает проверку"""
+        driver = Mock()
+        driver.execute_script.side_effect = UnexpectedAlertPresentException()
+        assert probe_page(driver).alert
+
+    def test_verify_page_refreshes_on_502(self, counters):
+        """При 502 страница обновляется до получения нормального ответа"""
+        driver = Mock(current_url="https://court.test/")
+        # Проверка, метка документа перед обновлением, готовность новой страницы, повторная проверка
+        driver.execute_script.side_effect = [probe_result(bad_gateway=True), None, True, probe_result()]
+        with patch("app.parsers.courts.utils.report_response") as report, \
+             patch("app.parsers.courts.scripts.record_latency"), \
+             patch("app.parsers.courts.scripts.adaptive_timeout", return_value=1), \
+             patch("app.services.host_governor.settings.HOST_GOVERNOR_ENABLED", False), \
+             patch("app.services.circuit_breaker.settings.BREAKER_ENABLED", False):
+            status = verify_page(driver)
+        assert driver.refresh.call_count == 1
+        assert not status.server_error
+        assert [c.args for c in report.call_args_list] == [("https://court.test/", False), ("https://court.test/", True)]
+
+class TestCourtInfoHttp:
+    """Тесты для get_court_info_http: тип суда без браузера"""
+
+    @pytest.fixture(autouse=True)
+    def no_site(self):
+        with patch.object(utils, "host_slot"), patch.object(utils, "report_status"), \
+             patch.object(utils, "update_court_meta") as update, \
+             patch.object(utils, "get_court_meta", return_value=None) as meta, \
+             patch.object(utils, "make_session") as session:
+            self.update, self.meta, self.session = update, meta, session
+            yield
+
+    def respond(self, html):
+        self.session.return_value.get.return_value = Mock(url="https://court.test/", status_code=200, text=html, headers={},
+                                                          content=html.encode(), encoding="utf-8")
+
+    def test_registry_first(self):
+        self.meta.return_value = CourtMeta(type="blue", name="Районный суд")
+        assert get_court_info_http("https://court.test/") == CourtInfo(supported=True, type="blue", name="Районный суд")
+        self.session.assert_not_called()
+
+    def test_blue_home_page(self):
+        self.respond('<div id="court_name">  Районный\n суд </div>')
+        assert get_court_info_http("https://court.test/") == CourtInfo(supported=True, type="blue", name="Районный суд")
+        self.update.assert_called_once_with("https://court.test/", type="blue", name="Районный суд")
+
+    def test_unknown_page_needs_browser(self):
+        """Страница без признаков суда (например, заглушка для ботов) — тип определяется через Selenium"""
+        self.respond("<html><body>Проверка браузера</body></html>")
+        assert get_court_info_http("https://court.test/") is None
+        self.update.assert_not_called()
@@ -0,0 +1,33 @@
+import threading
+from unittest.mock import patch
+
+from app.celery.celery_app import celery_app, progress_reporter
+
+@celery_app.task(bind=True, name="test_progress")
+def progress_task(self):
+    pass
+
+class TestProgressReporter:
+    """Тесты для progress_reporter"""
+
+    def test_status_from_worker_thread(self):
+        """Статус из другого потока (проверка серверов, асинхронный движок) пишется под id задачи"""
+        progress_task.push_request(id="task-1")
+        try:
+            set_status = progress_reporter(progress_task)
+        finally:
+            progress_task.pop_request()
+        seen = {}
+        def worker():
+            seen["request_id"] = progress_task.request.id
+            set_status("Проверка сервера 2", "Суд")
+        # backend Celery свой у каждого потока, поэтому подменяется метод класса
+        with patch.object(type(celery_app.backend), "store_result") as store:
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+        assert seen["request_id"] is None
+        store.assert_called_once()
+        assert store.call_args.args[0] == "task-1"
+        assert store.call_args.args[1] == {"status": "Проверка сервера 2", "court_name": "Суд"}
+        assert store.call_args.args[2] == "PROGRESS"
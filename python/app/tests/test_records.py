@@ -0,0 +1,165 @@
+import json
+import pytest
+from unittest.mock import patch
+
+from app.parsers.courts.records import (CaseRecord, RecordAccumulator, KnownCases, result_accumulator,
+                                        render_records, render_results, map_columns, newest_date, cell_text,
+                                        own_rows, CASE_FIELDS)
+from app.parsers.courts.tables import TableAccumulator, NO_DATA, parse_table
+
+BLUE_PAGE = '''<table id="tablcont"><tbody>
+<tr><th>№ п/п</th><th>Номер дела</th><th>Дата поступления</th><th>Информация по делу</th><th>Судья</th><th>Дата решения</th><th>Решение</th></tr>
+<tr><td>{n}</td><td><a href="/modules.php?name=sud_delo&amp;id={n}">2-{n}/2024</a></td><td>0{n}.02.2024</td>
+<td>ИСТЕЦ: Иванов И.И.<br>ОТВЕТЧИК: ООО &laquo;Ромашка&raquo;</td><td>Петров П.П.</td><td>01.03.2024</td><td>Иск удовлетворен</td></tr>
+</tbody></table>'''
+
+SPB_PAGE = '''<table class="rwd-table"><tbody>
+<tr><th>Номер</th><th>Судебный участок</th><th>Стороны</th><th>Статус</th></tr>
+<tr><td data-th="Номер"><a href="/cases/{n}">2-{n}</a></td><td>Участок № {n}</td><td>Сидоров С.С.</td><td>Рассмотрено</td></tr>
+</tbody></table>'''
+
+# Таблицы результатов в вёрстке сайтов: blue (msudrf), yellow (sudrf, раздел "Судебное делопроизводство")
+# и spb (mirsud.spb.ru) — все колонки, включая те, что не попадают в поля CaseRecord
+BLUE_FULL = '''<table id="tablcont"><tbody>
+<tr><th>№ п/п</th><th>Номер дела</th><th>Дата поступления</th><th>Информация по делу</th><th>Судья</th>
+<th>Дата решения</th><th>Решение</th><th>Дата вступления решения в законную силу</th><th>Судебные акты</th></tr>
+<tr><td>1</td><td><a href="/modules.php?name=sud_delo&amp;op=cs&amp;case_id=101">2-15/2024</a></td><td>10.01.2024</td>
+<td>ИСТЕЦ: Иванов И.И.<br>ОТВЕТЧИК: ПАО «Банк»<br>О взыскании задолженности</td><td>Петрова А.В.</td>
+<td>12.02.2024</td><td>Иск удовлетворен</td><td>15.03.2024</td><td><a href="/act/1">Решение</a></td></tr>
+</tbody></table>'''
+
+YELLOW_FULL = '''<table id="tablcont"><tbody>
+<tr><th>№ дела</th><th>Дата поступления</th><th>Категория / Стороны / Суть дела</th><th>Судья</th>
+<th>Дата решения</th><th>Решение</th><th>Дата вступления в законную силу</th><th>Судебные акты</th></tr>
+<tr><td><a href="/modules.php?name=sud_delo&amp;srv_num=1&amp;case_id=7">2-301/2023 ~ М-250/2023</a></td>
+<td>05.05.2023</td><td>Иски о взыскании сумм по договору займа<br>ИСТЕЦ: ООО «МКК»<br>ОТВЕТЧИК: Иванов И.И.</td>
+<td>Смирнов Д.Д.</td><td>01.06.2023</td><td>ИСК (ЗАЯВЛЕНИЕ) УДОВЛЕТВОРЕН</td><td>04.07.2023</td><td></td></tr>
+</tbody></table>'''
+
+SPB_FULL = '''<table class="rwd-table"><tbody>
+<tr><th>Номер дела</th><th>Судебный участок</th><th>Стороны</th><th>Судья</th><th>Дата поступления</th><th>Статус</th></tr>
+<tr><td data-th="Номер дела"><a href="/cases/detail/12/?id=5">2-44/2024-12</a></td><td data-th="Судебный участок">Судебный участок № 12</td>
+<td data-th="Стороны">Иванов И.И., ООО «УК»</td><td data-th="Судья">Кузнецова Е.Е.</td><td data-th="Дата поступления">20.02.2024</td>
+<td data-th="Статус">Рассмотрено</td></tr>
+</tbody></table>'''
+
+@pytest.fixture(autouse=True)
+def no_redis_metrics():
+    with patch("app.parsers.courts.records.incr_worker_counter"):
+        yield
+
+class TestRecordAccumulator:
+    """Тесты для RecordAccumulator"""
+
+    def test_blue_rows(self):
+        records = RecordAccumulator()
+        for n in (1, 2):
+            records.add(BLUE_PAGE.format(n=n))
+        result = records.result()
+        assert result["columns"] == CASE_FIELDS
+        assert result["rows"] == [
+            CaseRecord("2-1/2024", "01.02.2024", "ИСТЕЦ: Иванов И.И. ОТВЕТЧИК: ООО «Ромашка»", "Петров П.П.",
+                       "Иск удовлетворен", "/modules.php?name=sud_delo&id=1", {"№ п/п": "1", "Дата решения": "01.03.2024"}),
+            CaseRecord("2-2/2024", "02.02.2024", "ИСТЕЦ: Иванов И.И. ОТВЕТЧИК: ООО «Ромашка»", "Петров П.П.",
+                       "Иск удовлетворен", "/modules.php?name=sud_delo&id=2", {"№ п/п": "2", "Дата решения": "01.03.2024"}),
+        ]
+
+    def test_spb_rows(self):
+        records = RecordAccumulator(table_class="rwd-table")
+        records.add(f"<div>{SPB_PAGE.format(n=7)}</div>")
+        assert records.result()["rows"] == [CaseRecord("2-7", "", "Сидоров С.С.", "", "Рассмотрено", "/cases/7",
+                                                       {"Судебный участок": "Участок № 7"})]
+
+    def test_placeholder_without_table(self):
+        records = RecordAccumulator()
+        records.add("<div class='placeholder'>Нет данных</div>")
+        assert records.result() == "<div class='placeholder'>Нет данных</div>"
+        assert RecordAccumulator().result() == NO_DATA
+
+    def test_rows_serialized_as_lists(self):
+        """Записи в JSON — списки значений, без имён полей"""
+        records = RecordAccumulator()
+        records.add(BLUE_PAGE.format(n=1))
+        encoded = json.loads(json.dumps(records.result(), ensure_ascii=False))
+        assert encoded["rows"][0][0] == "2-1/2024"
+
+class TestKnownCases:
+    """Объединение с делами прошлых проверок"""
+
+    def known(self, *numbers):
+        return KnownCases([["2-%d/2024" % n, "0%d.02.2024" % n, "", "", "", None] for n in numbers])
+
+    def test_caught_up_on_known_page(self):
+        records = RecordAccumulator(known=self.known(2, 3))
+        records.add(BLUE_PAGE.format(n=1))
+        assert not records.caught_up
+        records.add(BLUE_PAGE.format(n=2))
+        assert records.caught_up
+        assert [row.number for row in records.result()["rows"]] == ["2-1/2024", "2-2/2024", "2-3/2024"]
+
+    def test_new_row_takes_fresh_status(self):
+        """Найденное заново дело берётся из новой страницы, а не из истории"""
+        records = RecordAccumulator(known=self.known(1))
+        records.add(BLUE_PAGE.format(n=1))
+        assert records.result()["rows"] == [
+            CaseRecord("2-1/2024", "01.02.2024", "ИСТЕЦ: Иванов И.И. ОТВЕТЧИК: ООО «Ромашка»", "Петров П.П.",
+                       "Иск удовлетворен", "/modules.php?name=sud_delo&id=1", {"№ п/п": "1", "Дата решения": "01.03.2024"})]
+
+    def test_date_from_and_empty_result(self):
+        assert self.known(3, 1).date_from == "03.02.2024"
+        assert newest_date([CaseRecord("1", "31.12.2023", "", "", "", None), CaseRecord("2", "01.01.2024 10:00", "", "", "", None)]) == "01.01.2024"
+        assert self.known(1).empty_result("нет")["rows"][0].number == "2-1/2024"
+        assert KnownCases([["2-1", "", "", "", "", None]]).empty_result("нет") == "нет"
+
+    def test_empty_result_keeps_titles(self):
+        """Прежний результат выводится с заголовками и дополнительными колонками сайта"""
+        known = KnownCases([["2-1/2024", "01.02.2024", "", "", "", None, {"№ п/п": "1"}]],
+                           titles={"number": "Номер дела"}, extra=["№ п/п"])
+        result = known.empty_result("нет")
+        assert result["titles"] == {"number": "Номер дела"}
+        assert result["extra"] == ["№ п/п"]
+        assert "<th>Номер дела</th>" in render_records(result) and "<td>1</td>" in render_records(result)
+
+class TestRenderKeepsCells:
+    """Вывод записей таблицей не теряет ячеек исходной таблицы сайта"""
+
+    @pytest.mark.parametrize("html, table_class", [(BLUE_FULL, None), (YELLOW_FULL, None), (SPB_FULL, "rwd-table")],
+                             ids=["blue", "yellow", "spb"])
+    def test_all_cells_rendered(self, html, table_class):
+        records = RecordAccumulator(table_class=table_class)
+        records.add(html)
+        stored = json.loads(json.dumps(records.result(), ensure_ascii=False))
+        rendered = parse_table(render_records(stored))
+        rendered_cells = [cell_text(cell) for row in own_rows(rendered) for cell in row]
+        for row in own_rows(parse_table(html, table_class)):
+            for cell in row:
+                if cell_text(cell):
+                    assert cell_text(cell) in rendered_cells
+
+class TestMapColumns:
+    """Тесты для map_columns"""
+
+    def test_decision_date_not_taken_as_status(self):
+        columns = map_columns(["Номер дела", "Дата решения", "Решение"])
+        assert columns == {"number": 0, "date": 1, "status": 2}
+
+class TestResultFormat:
+    """Выбор накопителя и вывод записей HTML-таблицей"""
+
+    def test_accumulator_by_setting(self):
+        with patch("app.parsers.courts.records.settings.RESULT_FORMAT", "html"):
+            assert isinstance(result_accumulator(), TableAccumulator)
+        with patch("app.parsers.courts.records.settings.RESULT_FORMAT", "records"):
+            assert isinstance(result_accumulator(), RecordAccumulator)
+
+    def test_render_results(self):
+        records = RecordAccumulator()
+        records.add(BLUE_PAGE.format(n=1))
+        task_result = [{"address": "a", "result": {"Суд": {"Иванов": {"Гражданские": records.result(),
+                                                                      "Уголовные": NO_DATA}}}}]
+        rendered = render_results(task_result)
+        html = rendered[0]["result"]["Суд"]["Иванов"]["Гражданские"]
+        assert html.startswith("<table>")
+        assert '<a href="/modules.php?name=sud_delo&amp;id=1">2-1/2024</a>' in html
+        assert "ООО «Ромашка»" in html
+        assert rendered[0]["result"]["Суд"]["Иванов"]["Уголовные"] == NO_DATA
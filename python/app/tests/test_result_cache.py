@@ -0,0 +1,87 @@
+import time
+import pytest
+from unittest.mock import patch
+
+from app.services import result_cache
+from app.services.result_cache import person_key, store_result, get_cached_result, flatten_units, unflatten_units
+
+class FakeRedis:
+    """Минимальный Redis в памяти: хэши и pipeline"""
+    def __init__(self):
+        self.data = {}
+
+    def hgetall(self, key):
+        return {field: str(value) for field, value in self.data.get(key, {}).items()}
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        fields = self.data.setdefault(key, {})
+        if mapping:
+            fields.update(mapping)
+        if field is not None:
+            fields[field] = value
+
+    def expire(self, key, seconds):
+        pass
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+@pytest.fixture
+def redis():
+    fake = FakeRedis()
+    with patch.object(result_cache, "r", fake), \
+         patch.object(result_cache, "incr_worker_counter"), \
+         patch.object(result_cache, "observe_worker_histogram"), \
+         patch.object(result_cache.settings, "RESULT_CACHE_ENABLED", True):
+        yield fake
+
+FULLNAME = {"surname": "Семёнов-Тян-Шанский", "name": "Пётр", "patronymic": None}
+RESULT = {"Суд": {"Семёнов-Тян-Шанский П": {
+    "Гражданские дела": {"columns": ["number"], "rows": [["2-1/2024"]]},
+    "Уголовные дела": {"Первая инстанция": "<div class='placeholder'>Дела не найдены</div>"},
+}}}
+
+class TestPersonKey:
+    """Тесты для person_key"""
+
+    def test_normalized(self):
+        assert person_key(FULLNAME) == person_key({"surname": " семенов – тян-шанский ", "name": "ПЁТР", "patronymic": ""})
+
+    def test_different_people(self):
+        assert person_key(FULLNAME) != person_key({**FULLNAME, "name": "Павел"})
+
+class TestUnits:
+    """Разбиение результата на единицы и обратная сборка"""
+
+    def test_round_trip(self):
+        units = flatten_units(RESULT)
+        assert ("Суд", "Семёнов-Тян-Шанский П", "Уголовные дела", "Первая инстанция") in units
+        assert unflatten_units(units) == RESULT
+
+class TestResultCache:
+    """Тесты для store_result и get_cached_result"""
+
+    def test_hit_within_max_age(self, redis):
+        store_result("https://court.test/", FULLNAME, RESULT)
+        result, age = get_cached_result("http://www.court.test", {**FULLNAME, "surname": "семенов-тян-шанский"}, 3600)
+        assert result == RESULT
+        assert 0 <= age < 5
+
+    def test_miss_when_older_than_max_age(self, redis):
+        store_result("https://court.test", FULLNAME, RESULT)
+        with patch.object(result_cache.time, "time", return_value=time.time() + 7200):
+            assert get_cached_result("https://court.test", FULLNAME, 3600) == (None, None)
+
+    def test_no_max_age_means_no_cache(self, redis):
+        store_result("https://court.test", FULLNAME, RESULT)
+        assert get_cached_result("https://court.test", FULLNAME, 0) == (None, None)
+
+    def test_errors_not_cached(self, redis):
+        store_result("https://court.test", FULLNAME, {"Сайт https://court.test": {"__error__": "Сайт не поддерживается"}})
+        assert redis.data == {}
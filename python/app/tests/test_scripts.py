@@ -0,0 +1,184 @@
+import pytest
+from bs4 import BeautifulSoup
+from unittest.mock import Mock, patch
+import base64
+from selenium.common.exceptions import JavascriptException
+
+from app.parsers.courts import scripts
+from app.parsers.courts.scripts import (get_element_html, get_category_descriptors, fill_input, fetch_bytes, navigate,
+                                        click_and_wait, register_page_ready, CATEGORY_DIVS_JS, NAVIGATION_MARK_JS,
+                                        NAVIGATION_STARTED_JS, PAGE_READY, PAGE_READY_JS, IN_PAGE_READY_JS)
+
+TABLE = '<table id="tablcont"><tbody><tr><th>Номер дела</th></tr><tr><td><a href="/case?id=1">1-1/2024</a><br></td></tr></tbody></table>'
+PAGE = f'<html><head><title>Суд</title></head><body><div id="search_results">{TABLE}</div></body></html>'
+
+@pytest.fixture(autouse=True)
+def no_redis_metrics():
+    with patch("app.parsers.courts.scripts.incr_worker_counter"), \
+         patch("app.parsers.courts.scripts.observe_worker_histogram"):
+        yield
+
+class TestGetElementHtml:
+    """Тесты для get_element_html"""
+
+    def test_same_result_as_page_source(self):
+        """Скрипт возвращает outerHTML как есть, разбор даёт ту же таблицу, что и в page_source"""
+        driver = Mock()
+        driver.execute_script.return_value = TABLE
+        driver.page_source = PAGE
+        from_script = get_element_html(driver, "table#tablcont")
+        with patch("app.parsers.courts.scripts.settings.IN_PAGE_EXTRACTION", False):
+            from_page_source = get_element_html(driver, "table#tablcont")
+        assert from_script == TABLE
+        assert str(BeautifulSoup(from_script, "html.parser")) == from_page_source
+
+    def test_fallback_to_page_source(self):
+        """При ошибке скрипта используется page_source"""
+        driver = Mock()
+        driver.execute_script.side_effect = JavascriptException("boom")
+        driver.page_source = PAGE
+        assert get_element_html(driver, "table#tablcont").startswith('<table id="tablcont">')
+
+    def test_missing_element(self):
+        driver = Mock()
+        driver.execute_script.return_value = None
+        assert get_element_html(driver, "table#tablcont") is None
+
+class TestGetCategoryDescriptors:
+    """Тесты для get_category_descriptors"""
+
+    def test_descriptors_grouped_by_category(self):
+        """Описания из скрипта собираются в {категория: [подкатегории]}"""
+        driver = Mock()
+        element = Mock()
+        driver.execute_script.return_value = [
+            {"category": "Гражданские дела", "name": None, "element": None},
+            {"category": "Гражданские дела", "name": "Первая инстанция", "element": element},
+            {"category": "Уголовные дела", "name": None, "element": None},
+        ]
+        result = get_category_descriptors(driver, CATEGORY_DIVS_JS)
+        assert result == {
+            "Гражданские дела": [{"name": "Первая инстанция", "element": element}],
+            "Уголовные дела": [],
+        }
+
+    def test_script_error_returns_none(self):
+        driver = Mock()
+        driver.execute_script.side_effect = JavascriptException("boom")
+        assert get_category_descriptors(driver, CATEGORY_DIVS_JS) is None
+
+class TestFillInput:
+    """Тесты для fill_input"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_keystroke_fields(self):
+        with patch("app.parsers.courts.scripts._keystroke_fields", set()):
+            yield
+
+    def test_single_script_call(self):
+        driver, element = Mock(), Mock()
+        driver.execute_script.return_value = "Иванов И.И."
+        fill_input(driver, element, "Иванов И.И.", "blue", "G1_PARTS__NAMESS")
+        driver.execute_script.assert_called_once()
+        element.send_keys.assert_not_called()
+
+    def test_rejected_value_typed_and_remembered(self):
+        """Поле с маской не приняло значение — ввод с клавиатуры, в следующий раз сразу"""
+        driver, element = Mock(), Mock()
+        driver.execute_script.return_value = ""
+        fill_input(driver, element, "01.01.1991", "spb", "id_date_from")
+        assert [c.args[0] for c in element.send_keys.call_args_list] == list("01.01.1991")
+        driver.execute_script.reset_mock()
+        fill_input(driver, element, "01.01.1991", "spb", "id_date_from")
+        driver.execute_script.assert_not_called()
+
+    def test_keystrokes_from_profile(self):
+        driver, element = Mock(), Mock()
+        with patch("app.parsers.courts.scripts.settings.FORM_FILL_KEYSTROKES", ["nalog.inn"]):
+            fill_input(driver, element, "1234", "nalog", "inn")
+        driver.execute_script.assert_not_called()
+        element.clear.assert_called_once()
+        assert element.send_keys.call_count == 4
+
+class TestPageReady:
+    """Тесты для navigate и click_and_wait с условиями готовности страниц"""
+
+    @pytest.fixture(autouse=True)
+    def no_governor(self):
+        with patch.object(scripts, "host_slot"), \
+             patch.object(scripts, "record_latency") as latency, \
+             patch.object(scripts, "adaptive_timeout", side_effect=lambda host, kind, default: default), \
+             patch("app.services.waits.time.sleep"):
+            self.latency = latency
+            yield
+
+    def test_navigate_waits_for_page_condition(self):
+        """Переход возвращается сразу (PAGE_LOAD_STRATEGY=none), готовность проверяется условием страницы"""
+        driver = Mock()
+        driver.execute_script.side_effect = [None, False, False, True]
+        assert navigate(driver, "https://court.test/modules.php?page=2", "blue_results")
+        driver.get.assert_called_once_with("https://court.test/modules.php?page=2")
+        assert driver.execute_script.call_args_list[0].args[0] == NAVIGATION_MARK_JS
+        assert PAGE_READY["blue_results"] in driver.execute_script.call_args.args[0]
+        assert self.latency.call_args.args[:2] == ("court.test", "page")
+
+    def test_timeout_does_not_raise(self):
+        driver = Mock(current_url="https://court.test/")
+        driver.execute_script.side_effect = lambda script, *args: script == NAVIGATION_STARTED_JS
+        with patch.object(scripts.settings, "PAGE_READY_TIMEOUT", 0.05):
+            assert not click_and_wait(driver, Mock(), "yellow_results")
+        scripts.incr_worker_counter.assert_any_call("page_ready_timeouts_total:yellow_results")
+        # Таймаут тоже попадает в задержки сайта, иначе перцентиль занижен
+        assert self.latency.call_args.args[:2] == ("court.test", "page")
+        assert self.latency.call_args.args[2] >= 0.05
+
+    def test_document_marked_before_click(self):
+        driver, element = Mock(current_url="https://court.test/"), Mock()
+        calls = Mock()
+        calls.attach_mock(driver.execute_script, "execute_script")
+        calls.attach_mock(element.click, "click")
+        driver.execute_script.side_effect = [None, True, True]
+        with patch.dict(PAGE_READY):
+            register_page_ready("custom", "document.getElementById('custom')")
+            assert click_and_wait(driver, element, "custom")
+        assert [c[0] for c in calls.mock_calls] == ["execute_script", "click", "execute_script", "execute_script"]
+        assert driver.execute_script.call_args_list[1].args[0] == NAVIGATION_STARTED_JS
+        assert driver.execute_script.call_args.args[0] == PAGE_READY_JS % "document.getElementById('custom')"
+
+    def test_click_without_navigation(self):
+        """Клик без перехода не ждёт исчезновения метки: проверяется условие на текущей странице"""
+        driver = Mock(current_url="https://court.test/")
+        driver.execute_script.side_effect = lambda script, *args: script != NAVIGATION_STARTED_JS
+        with patch.object(scripts.settings, "CLICK_NAVIGATION_TIMEOUT", 0.05):
+            assert click_and_wait(driver, Mock(), "yellow_results")
+        assert driver.execute_script.call_args.args[0] == IN_PAGE_READY_JS % PAGE_READY["yellow_results"]
+        scripts.incr_worker_counter.assert_any_call("click_without_navigation_total")
+
+    def test_click_without_wait(self):
+        driver, element = Mock(current_url="https://court.test/"), Mock()
+        assert click_and_wait(driver, element, None)
+        element.click.assert_called_once_with()
+        driver.execute_script.assert_not_called()
+
+class TestFetchBytes:
+    """Тесты для fetch_bytes"""
+
+    @pytest.fixture(autouse=True)
+    def no_governor(self):
+        with patch.object(scripts, "host_slot"):
+            yield
+
+    def test_bytes_from_page(self):
+        """Ресурс загружается одним скриптом в странице и приходит base64"""
+        driver = Mock()
+        driver.execute_script.return_value = base64.b64encode(b"GIF89a").decode()
+        assert fetch_bytes(driver, "https://court.test/captcha.php") == b"GIF89a"
+        assert driver.execute_script.call_args.args[1:] == ("https://court.test/captcha.php", "image/")
+
+    def test_failure_returns_none(self):
+        """Ошибка скрипта или ответ не того типа — None, вызывающий использует запасной путь"""
+        driver = Mock()
+        driver.execute_script.return_value = None
+        assert fetch_bytes(driver, "https://court.test/captcha.php") is None
+        driver.execute_script.side_effect = JavascriptException("fetch is not defined")
+        assert fetch_bytes(driver, "https://court.test/captcha.php") is None
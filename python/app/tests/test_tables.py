@@ -0,0 +1,116 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from app.parsers.courts.tables import TableAccumulator, merge_tables, find_table_html, NO_DATA
+from app.parsers.courts.utils import clean_table
+
+def bs4_merge(html_list):
+    """Прежняя реализация merge_html_tables на BeautifulSoup"""
+    if not html_list:
+        return NO_DATA
+    soup = BeautifulSoup(html_list[0], "html.parser")
+    base_table = soup.find("table")
+    if base_table is None:
+        return "".join(html_list)
+    base_body = base_table.find("tbody")
+    for html in html_list[1:]:
+        table = BeautifulSoup(html, "html.parser").find("table")
+        if not table or not table.find("tbody"):
+            continue
+        for row in table.find("tbody").find_all("tr"):
+            base_body.append(row)
+    return str(base_table)
+
+def bs4_merge_spb(html_list):
+    """Прежняя реализация spb.merge_html_tables на BeautifulSoup"""
+    if not html_list:
+        return NO_DATA
+    base_table = BeautifulSoup(html_list[0], "html.parser").find("table", class_="rwd-table")
+    if not base_table:
+        return NO_DATA
+    base_tbody = base_table.find("tbody")
+    header_tr = base_tbody.find("tr", recursive=False)
+    rows = base_tbody.find_all("tr", recursive=False)[1:] if header_tr else base_tbody.find_all("tr", recursive=False)
+    for html in html_list[1:]:
+        table = BeautifulSoup(html, "html.parser").find("table", class_="rwd-table")
+        if not table or not table.find("tbody"):
+            continue
+        tr_list = table.find("tbody").find_all("tr", recursive=False)
+        if tr_list and tr_list[0].find("th"):
+            tr_list = tr_list[1:]
+        rows.extend(tr_list)
+    base_tbody.clear()
+    if header_tr:
+        base_tbody.append(header_tr)
+    for row in rows:
+        base_tbody.append(row)
+    return str(base_table)
+
+def page(n):
+    return f'''<table id="tablcont" class="x  y" width="100%" cellpadding="2">
+<tbody><tr><th style="a">№&nbsp;дела</th><th nowrap="">Дата &amp; время</th></tr>
+<tr onclick="go({n})" valign="top"><td><a href="/modules.php?name=sud_delo&amp;op=cs&amp;id={n}" title='say "hi"'>1-{n}/2024</a><br>Иванов &lt;И.И.&gt;<img src="/images/arow.gif" alt="x"></td>
+<td class="c">{n}.01.2024<!-- note & c --></td></tr>
+<tr><td colspan="2"><table class="inner"><tbody><tr><td>вложенная {n}</td></tr>
+</tbody></table></td></tr>
+</tbody>
+</table>'''
+
+def spb_page(n):
+    return f'''<div><table class="rwd-table"><tbody>
+<tr><th>Номер</th><th>Суд</th></tr>
+<tr class="ng-scope"><td data-th="Номер">2-{n}</td><td>Участок &#8470; {n}</td></tr>
+<tr><td>{n}b</td><td><span>x</span></td></tr>
+</tbody></table></div>'''
+
+PAGES = [page(n) for n in range(1, 5)]
+SPB_PAGES = [spb_page(n) for n in range(3)]
+
+class TestMergeTables:
+    """Результат merge_tables совпадает с прежней реализацией на BeautifulSoup"""
+
+    @pytest.mark.parametrize("html_list", [
+        PAGES,
+        PAGES[:1],
+        PAGES[:1] + ["<div class='placeholder'>Нет данных</div>"] + PAGES[1:],
+        ["<div class='placeholder'>Нет данных</div>"] + PAGES,
+        [],
+    ])
+    def test_same_as_bs4(self, html_list):
+        assert merge_tables(html_list) == bs4_merge(html_list)
+
+    def test_clean_same_as_clean_table(self):
+        """clean=True равносильно clean_table для каждой страницы перед объединением"""
+        expected = bs4_merge([str(clean_table(html)) for html in PAGES])
+        assert merge_tables(PAGES, clean=True) == expected
+
+    @pytest.mark.parametrize("html_list", [SPB_PAGES, ["<div>нет</div>"] + SPB_PAGES, []])
+    def test_spb_same_as_bs4(self, html_list):
+        assert merge_tables(html_list, table_class="rwd-table", header_row=True) == bs4_merge_spb(html_list)
+
+    def test_first_table_without_tbody(self):
+        """Раньше падало с AttributeError, теперь возвращается первая таблица"""
+        first = "<table><tr><td>1</td></tr></table>"
+        assert merge_tables([first, PAGES[0]]) == "<table><tr><td>1</td></tr></table>"
+
+class TestTableAccumulator:
+    """Тесты для TableAccumulator"""
+
+    def test_incremental_same_as_merge(self):
+        tables = TableAccumulator()
+        for html in PAGES:
+            tables.add(html)
+        assert tables.result() == merge_tables(PAGES)
+
+    def test_result_without_pages(self):
+        assert TableAccumulator().result() == NO_DATA
+
+class TestFindTableHtml:
+    """Тесты для find_table_html"""
+
+    def test_table_by_id(self):
+        html = f"<html><body><table class='layout'><tr><td>меню</td></tr></table>{PAGES[0]}</body></html>"
+        assert merge_tables([find_table_html(html, "tablcont")]) == merge_tables(PAGES[:1])
+
+    def test_missing_table(self):
+        assert find_table_html("<div>Капча</div>", "tablcont") is None
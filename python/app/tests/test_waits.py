@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import pytest
+from contextvars import copy_context
+from unittest.mock import patch
+
+from app.services import waits
+from app.services.waits import adaptive_timeout, backoff_delays, record_latency, sleep, sleep_async, track_sleep, wait_until
+
+class FakeRedis:
+    """Минимальный Redis в памяти: списки и pipeline"""
+    def __init__(self):
+        self.data = {}
+
+    def lpush(self, key, value):
+        self.data.setdefault(key, []).insert(0, str(value))
+
+    def ltrim(self, key, start, end):
+        self.data[key] = self.data.get(key, [])[start:end + 1]
+
+    def lrange(self, key, start, end):
+        return self.data.get(key, [])[start:end + 1]
+
+    def expire(self, key, seconds):
+        pass
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+@pytest.fixture
+def redis():
+    fake = FakeRedis()
+    with patch.object(waits, "r", fake), \
+         patch.object(waits, "_samples", {}), \
+         patch.object(waits, "_loaded", set()), \
+         patch.object(waits, "incr_worker_counter"), \
+         patch.object(waits, "observe_worker_histogram"), \
+         patch.object(waits.settings, "ADAPTIVE_WAITS", True), \
+         patch.object(waits.settings, "WAIT_MIN_SAMPLES", 5), \
+         patch.object(waits.settings, "WAIT_PERCENTILE", 95), \
+         patch.object(waits.settings, "WAIT_TIMEOUT_FACTOR", 3), \
+         patch.object(waits.settings, "WAIT_TIMEOUT_MIN", 1), \
+         patch.object(waits.settings, "WAIT_TIMEOUT_MAX", 60):
+        yield fake
+
+class TestBackoff:
+    """Тесты для backoff_delays"""
+
+    def test_grows_with_jitter_up_to_cap(self):
+        delays = backoff_delays(1, 8)
+        for limit in (1, 2, 4, 8, 8, 8):
+            assert limit / 2 <= next(delays) <= limit
+
+class TestAdaptiveTimeout:
+    """Тесты для adaptive_timeout"""
+
+    def test_default_until_enough_samples(self, redis):
+        for _ in range(4):
+            record_latency("court.test", "page", 2.0)
+        assert adaptive_timeout("court.test", "page", 30) == 30
+
+    def test_percentile_of_recorded_latencies(self, redis):
+        for latency in (1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 4.0):
+            record_latency("court.test", "page", latency)
+        assert adaptive_timeout("court.test", "page", 30) == 12.0
+        assert adaptive_timeout("other.test", "page", 30) == 30
+
+    def test_bounded(self, redis):
+        for _ in range(5):
+            record_latency("fast.test", "page", 0.01)
+            record_latency("slow.test", "page", 50.0)
+        assert adaptive_timeout("fast.test", "page", 30) == 1
+        assert adaptive_timeout("slow.test", "page", 30) == 60
+
+    def test_shared_between_workers(self, redis):
+        """Другой процесс (пустое окно в памяти) берёт задержки из Redis"""
+        for _ in range(5):
+            record_latency("court.test", "page", 2.0)
+        with patch.object(waits, "_samples", {}), patch.object(waits, "_loaded", set()):
+            assert adaptive_timeout("court.test", "page", 30) == 6.0
+
+class TestWaitUntil:
+    """Тесты для wait_until"""
+
+    def test_polls_until_ready(self, redis):
+        answers = iter([None, False, "ready"])
+        with patch.object(waits.time, "sleep") as pause:
+            assert wait_until(lambda: next(answers), 5, host="court.test", kind="page") == "ready"
+        assert pause.call_count == 2
+        assert len(redis.data["courts:latency:page:court.test"]) == 1
+
+    def test_ignored_exceptions_and_timeout(self, redis):
+        def condition():
+            raise KeyError("нет элемента")
+        with pytest.raises(TimeoutError):
+            wait_until(condition, 0.05, kind="page", ignored=(KeyError,))
+        waits.incr_worker_counter.assert_called_once_with("wait_timeouts_total:page")
+
+    def test_timeout_recorded(self, redis):
+        """Время ожидания без ответа записывается в задержки: перцентиль не занижен"""
+        with pytest.raises(TimeoutError):
+            wait_until(lambda: None, 0.05, host="court.test", kind="page")
+        assert float(redis.data["courts:latency:page:court.test"][0]) >= 0.05
+
+class TestTrackSleep:
+    """Тесты для track_sleep"""
+
+    def test_counts_threads_and_coroutines(self, redis):
+        with patch.object(waits.time, "sleep"), track_sleep("check_court") as meter:
+            sleep(0.5)
+            thread = threading.Thread(target=copy_context().run, args=(sleep, 1.0))
+            thread.start()
+            thread.join()
+            asyncio.run(sleep_async(0.25))
+            with track_sleep("other"):
+                sleep(2.0)
+            sleep(0.25)
+        assert meter.total == 2.0
+        waits.observe_worker_histogram.assert_called_with("check_court_sleep_seconds", 2.0, buckets=waits.SLEEP_BUCKETS)
@@ -102,6 +102,16 @@ async function addCourt() {
         showToast("Ошибка при проверке суда. Сайт не поддерживает парсинг.");
         eventSource.close();
       }
+      else if (data.status === "unavailable") {
+        checkBtn.disabled = false;
+        addBtn.disabled = false;
+        input.placeholder = "URL для проверки";
+        input.disabled = false;
+        addBtn.querySelector('.btn-text').classList.remove('hidden');
+        addBtn.querySelector('.btn-loader').classList.add('hidden');
+        showToast(data.result || "Сайт суда временно недоступен. Попробуйте позже.");
+        eventSource.close();
+      }
     };
 
     eventSource.onerror = (err) => {